@@ -0,0 +1,252 @@
+import asyncio
+import json
+import re
+import time
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timezone
+from typing import Optional
+
+from prometheus_client import Gauge, Histogram
+from shared import get_logger
+
+from app.analytics.clickhouse_client import get_clickhouse_client
+from app.config import settings
+
+logger = get_logger(__name__)
+
+PRODUCT_PATHNAME_RE = re.compile(r"^/product/([0-9]+)")
+
+EVENTS_COLUMNS = (
+    "event_time",
+    "event_type",
+    "session_id",
+    "page_view_id",
+    "url",
+    "pathname",
+    "product_id",
+    "referrer",
+    "user_agent",
+    "click_x",
+    "click_y",
+    "click_type",
+    "element_tag",
+    "element_id",
+    "element_class",
+    "element_text",
+    "payload_json",
+)
+
+INSERT_EVENTS_SQL = f"INSERT INTO analytics.events ({', '.join(EVENTS_COLUMNS)}) VALUES"
+
+# Фиксация оффсетов Kafka пакета, строки которого попали в буфер
+OffsetCommit = Callable[[], Awaitable[None]]
+
+FLUSH_LATENCY = Histogram(
+    "analytics_clickhouse_flush_seconds",
+    "Длительность пакетной вставки событий в ClickHouse",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+BATCH_SIZE = Histogram(
+    "analytics_clickhouse_batch_size",
+    "Количество строк в одной пакетной вставке в ClickHouse",
+    buckets=(1, 10, 50, 100, 250, 500, 1000, 2500, 5000, 10000),
+)
+QUEUE_DEPTH = Gauge(
+    "analytics_clickhouse_queue_depth",
+    "Количество строк, ожидающих вставки в ClickHouse",
+)
+
+
+def _to_event_time(ts_ms: Optional[int]) -> datetime:
+    """Переводит timestamp трекера (мс) в naive UTC datetime для DateTime64."""
+    if ts_ms is None:
+        event_time = datetime.now(timezone.utc)
+    else:
+        event_time = datetime.fromtimestamp(ts_ms / 1000, tz=timezone.utc)
+    return event_time.replace(tzinfo=None)
+
+
+def extract_product_id(pathname: Optional[str]) -> int:
+    """Извлекает id товара из пути страницы товара (/product/{id}), иначе 0."""
+    if not pathname:
+        return 0
+    match = PRODUCT_PATHNAME_RE.match(pathname)
+    return int(match.group(1)) if match else 0
+
+
+def build_event_row(event: dict) -> tuple:
+    """Формирует строку таблицы analytics.events из события трекера."""
+    element = event.get("element") or {}
+    return (
+        _to_event_time(event.get("timestamp")),
+        event.get("eventType") or "",
+        event.get("sessionId") or "",
+        event.get("pageViewId") or "",
+        event.get("url") or "",
+        event.get("pathname") or "",
+        extract_product_id(event.get("pathname")),
+        event.get("referrer") or "",
+        event.get("userAgent") or "",
+        event.get("x"),
+        event.get("y"),
+        event.get("clickType"),
+        element.get("tagName"),
+        element.get("id"),
+        element.get("className"),
+        element.get("text"),
+        json.dumps(event, ensure_ascii=False),
+    )
+
+
+def build_order_row(order: dict) -> tuple:
+    """Формирует строку таблицы analytics.events из события order_created."""
+    return (
+        _to_event_time(None),
+        "order_created",
+        str(order.get("user_id", "")),
+        "",
+        "",
+        "",
+        0,
+        "",
+        "",
+        None,
+        None,
+        None,
+        None,
+        None,
+        None,
+        None,
+        json.dumps(order, ensure_ascii=False),
+    )
+
+
+class ClickHouseBatchWriter:
+    """
+    Буферизованная запись событий в ClickHouse.
+
+    Строки от всех подписчиков копятся в общем буфере и вставляются одним
+    многострочным INSERT при достижении max_batch_size или по истечении
+    flush_interval. Вызов write только ставит строки в буфер, поэтому
+    подписчик не ждёт вставки и сразу забирает из Kafka следующий пакет.
+
+    Гарантию доставки дают оффсеты: вместе со строками пакета передаётся
+    функция фиксации его оффсетов, и она вызывается только после успешной
+    вставки. При ошибке вставки строки остаются в буфере до следующей
+    попытки, а если сервис упадёт раньше, Kafka отдаст пакеты заново.
+    Буфер ограничен max_pending_rows: пока ClickHouse не принимает вставки,
+    write ждёт освобождения места и чтение из Kafka приостанавливается.
+    """
+
+    def __init__(self, max_batch_size: int, flush_interval: float, max_pending_rows: int):
+        self._max_batch_size = max_batch_size
+        self._flush_interval = flush_interval
+        self._max_pending_rows = max_pending_rows
+        self._rows: list[tuple] = []
+        self._commits: list[OffsetCommit] = []
+        self._flush_lock = asyncio.Lock()
+        self._batch_full = asyncio.Event()
+        self._space_available = asyncio.Event()
+        self._flush_task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_periodically())
+            logger.debug("ClickHouse batch writer started")
+
+    async def stop(self) -> None:
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        if not await self.flush():
+            logger.warning(
+                f"{len(self._rows)} events were not inserted to ClickHouse on shutdown, "
+                f"their Kafka offsets are not committed and will be redelivered"
+            )
+        logger.debug("ClickHouse batch writer stopped")
+
+    async def write(self, rows: list[tuple], commit: OffsetCommit) -> None:
+        """
+        Ставит строки пакета в буфер, не дожидаясь вставки.
+
+        Ждёт только когда буфер переполнен, пока ClickHouse не принимает вставки.
+
+        Args:
+            rows: Строки в порядке колонок EVENTS_COLUMNS (могут быть пустыми)
+            commit: Фиксация оффсетов пакета, вызывается после вставки его строк
+        """
+        while len(self._rows) >= self._max_pending_rows:
+            self._space_available.clear()
+            await self._space_available.wait()
+
+        # Пакет без строк тоже встаёт в очередь: его оффсеты нельзя фиксировать раньше предыдущих пакетов
+        self._rows.extend(rows)
+        self._commits.append(commit)
+        QUEUE_DEPTH.set(len(self._rows))
+
+        if len(self._rows) >= self._max_batch_size:
+            self._batch_full.set()
+
+    async def flush(self) -> bool:
+        """
+        Вставляет накопленные строки одним запросом и фиксирует оффсеты вошедших в него пакетов.
+
+        Returns:
+            False, если вставка не удалась и строки остались в буфере
+        """
+        async with self._flush_lock:
+            if not self._commits:
+                return True
+            rows, self._rows = self._rows, []
+            commits, self._commits = self._commits, []
+
+            if rows:
+                started = time.perf_counter()
+                try:
+                    ch = await get_clickhouse_client()
+                    await ch.execute(INSERT_EVENTS_SQL, *rows)
+                except Exception as e:
+                    logger.error(f"Error inserting batch of {len(rows)} events to ClickHouse: {e}", exc_info=True)
+                    # Строки возвращаются в начало буфера, чтобы пакеты вставлялись и фиксировались по порядку
+                    self._rows[:0] = rows
+                    self._commits[:0] = commits
+                    QUEUE_DEPTH.set(len(self._rows))
+                    return False
+                finally:
+                    FLUSH_LATENCY.observe(time.perf_counter() - started)
+                    BATCH_SIZE.observe(len(rows))
+                logger.debug(f"Inserted batch of {len(rows)} events to ClickHouse")
+
+            QUEUE_DEPTH.set(len(self._rows))
+            self._space_available.set()
+            for commit in commits:
+                try:
+                    await commit()
+                except Exception as e:
+                    logger.warning(f"Failed to commit Kafka offsets after ClickHouse insert: {e}")
+            return True
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._batch_full.wait(), timeout=self._flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._batch_full.clear()
+            try:
+                if not await self.flush():
+                    # Повтор не раньше следующего интервала, чтобы не забрасывать недоступный ClickHouse
+                    await asyncio.sleep(self._flush_interval)
+            except Exception as e:
+                logger.error(f"Unexpected error in ClickHouse flush loop: {e}", exc_info=True)
+
+
+clickhouse_writer = ClickHouseBatchWriter(
+    max_batch_size=settings.CLICKHOUSE_BATCH_MAX_SIZE,
+    flush_interval=settings.CLICKHOUSE_BATCH_FLUSH_INTERVAL,
+    max_pending_rows=settings.CLICKHOUSE_BATCH_MAX_PENDING_ROWS,
+)
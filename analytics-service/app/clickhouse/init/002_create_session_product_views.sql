@@ -0,0 +1,35 @@
+-- Идентификатор товара извлекается при записи события, а не при чтении
+ALTER TABLE analytics.events
+    ADD COLUMN IF NOT EXISTS product_id UInt64 DEFAULT 0 AFTER pathname;
+
+-- Последний просмотр товара в сессии, ключ совпадает с запросом /analytics/viewed-products
+CREATE TABLE IF NOT EXISTS analytics.session_product_views
+(
+    session_id   String,
+    product_id   UInt64,
+    last_seen    SimpleAggregateFunction(max, DateTime64(3, 'UTC'))
+)
+ENGINE = AggregatingMergeTree
+ORDER BY (session_id, product_id);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS analytics.session_product_views_mv
+TO analytics.session_product_views
+AS
+SELECT
+    session_id,
+    product_id,
+    max(event_time) AS last_seen
+FROM analytics.events
+WHERE product_id > 0
+GROUP BY session_id, product_id;
+
+-- Перенос уже накопленных просмотров (повторный запуск безопасен: max идемпотентен)
+INSERT INTO analytics.session_product_views
+SELECT
+    session_id,
+    toUInt64OrZero(replaceRegexpOne(pathname, '^/product/([0-9]+).*', '\\1')) AS product_id,
+    max(event_time) AS last_seen
+FROM analytics.events
+WHERE pathname LIKE '/product/%'
+GROUP BY session_id, product_id
+HAVING product_id > 0;
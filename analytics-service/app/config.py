@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -9,12 +9,21 @@ class Settings(BaseSettings):
     KAFKA_HOST: str
     KAFKA_INTERNAL_PORT: int
     KAFKA_EXTERNAL_PORT: int
+    KAFKA_CONSUMER_MAX_RECORDS: int = 500
+    KAFKA_CONSUMER_BATCH_TIMEOUT_MS: int = 200
+
+    TRACKER_PUBLISH_QUEUE_SIZE: int = 10000
+    TRACKER_PUBLISH_BATCH_SIZE: int = 500
+    TRACKER_PUBLISH_OVERFLOW_POLICY: Literal["drop", "reject"] = "drop"
 
     CLICKHOUSE_HOST: str
     CLICKHOUSE_INTERNAL_PORT: int
     CLICKHOUSE_EXTERNAL_PORT: int
     CLICKHOUSE_INTERNAL_NATIVE_PORT: int
     CLICKHOUSE_EXTERNAL_NATIVE_PORT: int
+    CLICKHOUSE_BATCH_MAX_SIZE: int = 1000
+    CLICKHOUSE_BATCH_FLUSH_INTERVAL: float = 0.5
+    CLICKHOUSE_BATCH_MAX_PENDING_ROWS: int = 20000
 
     ANALYTICS_SERVICE_EXTERNAL_PORT: int
     ANALYTICS_SERVICE_INTERNAL_PORT: int
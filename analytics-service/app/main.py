@@ -10,17 +10,25 @@ from app.config import settings
 from app.api.analytics import router as router_analytics
 from app.messaging.broker import broker
 from app.messaging.handlers import router as kafka_router
+from app.messaging.publisher import tracker_publisher
 from app.analytics.clickhouse_client import close_clickhouse_client
+from app.analytics.clickhouse_writer import clickhouse_writer
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    await clickhouse_writer.start()
     broker.include_router(kafka_router)
     await broker.start()
+    await tracker_publisher.start()
 
     yield
 
+    await tracker_publisher.stop()
+    # Буфер вставляется, пока консьюмеры живы и могут зафиксировать оффсеты
+    await clickhouse_writer.flush()
     await broker.stop()
+    await clickhouse_writer.stop()
     await close_clickhouse_client()
 
 
@@ -1,210 +1,145 @@
-import json
-from datetime import datetime, timezone
-
-from faststream.kafka import KafkaRouter
+from faststream import AckPolicy
+from faststream.kafka import KafkaRouter, TopicPartition
+from faststream.kafka.annotations import KafkaMessage
+from pydantic import ValidationError
 from shared import get_logger
 
-from app.analytics.clickhouse_client import get_clickhouse_client
+from app.analytics.clickhouse_writer import OffsetCommit, build_event_row, build_order_row, clickhouse_writer
+from app.config import settings
+from app.schemas.analytics import TrackerEvent
 
 router = KafkaRouter()
 logger = get_logger(__name__)
 
+batch_subscriber_options = {
+    "group_id": "analytics",
+    "batch": True,
+    "max_records": settings.KAFKA_CONSUMER_MAX_RECORDS,
+    "batch_timeout_ms": settings.KAFKA_CONSUMER_BATCH_TIMEOUT_MS,
+    # Оффсеты фиксирует ClickHouseBatchWriter после вставки пакета, см. offsets_commit
+    "ack_policy": AckPolicy.MANUAL,
+}
 
-async def insert_event_to_clickhouse(event: dict) -> None:
-    """Функция для вставки события в ClickHouse."""
-    event_type = event.get("eventType", "unknown")
-    logger.debug(f"Inserting event to ClickHouse: {event_type}")
-    try:
-        ch = await get_clickhouse_client()
-
-        ts_ms = event.get("timestamp")
-        if ts_ms is None:
-            event_time = datetime.now(timezone.utc)
-        else:
-            event_time = datetime.fromtimestamp(ts_ms / 1000, tz=timezone.utc)
-
-        element = event.get("element") or {}
-
-        click_x = event.get("x")
-        click_y = event.get("y")
-        click_type = event.get("clickType")
-        element_tag = element.get("tagName")
-        element_id = element.get("id")
-        element_class = element.get("className")
-        element_text = element.get("text")
-
-        event_time_naive = event_time.replace(tzinfo=None)
-        event_time_str = event_time_naive.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-
-        def escape_sql_string(s):
-            if s is None:
-                return "NULL"
-            return f"'{str(s).replace("'", "''")}'"
-
-        sql = f"""
-            INSERT INTO analytics.events (
-                event_time,
-                event_type,
-                session_id,
-                page_view_id,
-                url,
-                pathname,
-                referrer,
-                user_agent,
-                click_x,
-                click_y,
-                click_type,
-                element_tag,
-                element_id,
-                element_class,
-                element_text,
-                payload_json
-            ) VALUES (
-                '{event_time_str}',
-                {escape_sql_string(event.get("eventType", ""))},
-                {escape_sql_string(event.get("sessionId", ""))},
-                {escape_sql_string(event.get("pageViewId", ""))},
-                {escape_sql_string(event.get("url", ""))},
-                {escape_sql_string(event.get("pathname", ""))},
-                {escape_sql_string(event.get("referrer", ""))},
-                {escape_sql_string(event.get("userAgent", ""))},
-                {click_x if click_x is not None else "NULL"},
-                {click_y if click_y is not None else "NULL"},
-                {escape_sql_string(click_type)},
-                {escape_sql_string(element_tag)},
-                {escape_sql_string(element_id)},
-                {escape_sql_string(element_class)},
-                {escape_sql_string(element_text)},
-                {escape_sql_string(json.dumps(event, ensure_ascii=False))}
-            )
-        """
-        
-        await ch.execute(sql)
-        logger.debug(f"Event {event_type} inserted successfully to ClickHouse")
-    except Exception as e:
-        logger.error(f"Error inserting event {event_type} to ClickHouse: {e}", exc_info=True)
-        raise
 
+def offsets_commit(message: KafkaMessage) -> OffsetCommit:
+    """
+    Фиксация оффсетов пакета Kafka для вызова после вставки его строк в ClickHouse.
+
+    Оффсеты передаются явно (последний оффсет + 1 по каждой партиции):
+    consumer.commit() без аргументов зафиксировал бы и пакеты, прочитанные
+    позже, строки которых ещё не вставлены.
+    """
+    # Пакет - кортеж записей (TestKafkaBroker отдаёт список), одиночное сообщение - одна запись
+    raw = message.raw_message
+    records = raw if isinstance(raw, (tuple, list)) else (raw,)
+    offsets: dict[TopicPartition, int] = {}
+    for record in records:
+        partition = TopicPartition(record.topic, record.partition)
+        offsets[partition] = max(offsets.get(partition, 0), record.offset + 1)
+    consumer = message.consumer
+
+    async def commit() -> None:
+        await consumer.commit(offsets)
+
+    return commit
 
-@router.subscriber("clicks_topic", group_id="analytics")
-async def handle_click_event(event: dict) -> None:
-    logger.info("Processing click event from Kafka")
+
+def validate_tracker_events(events: list[dict]) -> list[dict]:
+    """
+    Отбрасывает события, не проходящие валидацию схемы трекера.
+
+    Невалидное сообщение не должно блокировать весь пакет: при NACK
+    пакет был бы перечитан с того же оффсета бесконечно.
+    """
+    valid_events = []
+    for event in events:
+        try:
+            TrackerEvent.model_validate(event)
+        except ValidationError as e:
+            logger.warning(f"Skipping invalid tracker event: {e}")
+            continue
+        valid_events.append(event)
+    return valid_events
+
+
+async def insert_events_to_clickhouse(events: list[dict], message: KafkaMessage) -> None:
+    """Ставит события трекера из пакета в буфер вставки ClickHouse."""
+    rows = [build_event_row(event) for event in validate_tracker_events(events)]
+    logger.debug(f"Queueing {len(rows)} events for ClickHouse")
+    await clickhouse_writer.write(rows, offsets_commit(message))
+
+
+@router.subscriber("clicks_topic", **batch_subscriber_options)
+async def handle_click_events(events: list[dict], message: KafkaMessage) -> None:
+    logger.debug(f"Processing batch of {len(events)} click events from Kafka")
     try:
-        await insert_event_to_clickhouse(event)
-        logger.info("Click event processed successfully")
+        await insert_events_to_clickhouse(events, message)
     except Exception as e:
-        logger.error(f"Error processing click event: {e}", exc_info=True)
+        logger.error(f"Error processing click events: {e}", exc_info=True)
+        await message.nack()
         raise
 
 
-@router.subscriber("page_views_topic", group_id="analytics")
-async def handle_page_view_event(event: dict) -> None:
-    logger.info("Processing page_view event from Kafka")
+@router.subscriber("page_views_topic", **batch_subscriber_options)
+async def handle_page_view_events(events: list[dict], message: KafkaMessage) -> None:
+    logger.debug(f"Processing batch of {len(events)} page_view events from Kafka")
     try:
-        await insert_event_to_clickhouse(event)
-        logger.info("Page view event processed successfully")
+        await insert_events_to_clickhouse(events, message)
     except Exception as e:
-        logger.error(f"Error processing page_view event: {e}", exc_info=True)
+        logger.error(f"Error processing page_view events: {e}", exc_info=True)
+        await message.nack()
         raise
 
 
-@router.subscriber("scrolls_topic", group_id="analytics")
-async def handle_scroll_event(event: dict) -> None:
-    logger.info("Processing scroll event from Kafka")
+@router.subscriber("scrolls_topic", **batch_subscriber_options)
+async def handle_scroll_events(events: list[dict], message: KafkaMessage) -> None:
+    logger.debug(f"Processing batch of {len(events)} scroll events from Kafka")
     try:
-        await insert_event_to_clickhouse(event)
-        logger.info("Scroll event processed successfully")
+        await insert_events_to_clickhouse(events, message)
     except Exception as e:
-        logger.error(f"Error processing scroll event: {e}", exc_info=True)
+        logger.error(f"Error processing scroll events: {e}", exc_info=True)
+        await message.nack()
         raise
 
 
-@router.subscriber("custom_events_topic", group_id="analytics")
-async def handle_custom_event(event: dict) -> None:
-    logger.info("Processing custom event from Kafka")
+@router.subscriber("custom_events_topic", **batch_subscriber_options)
+async def handle_custom_events(events: list[dict], message: KafkaMessage) -> None:
+    logger.debug(f"Processing batch of {len(events)} custom events from Kafka")
     try:
-        await insert_event_to_clickhouse(event)
-        logger.info("Custom event processed successfully")
+        await insert_events_to_clickhouse(events, message)
     except Exception as e:
-        logger.error(f"Error processing custom event: {e}", exc_info=True)
+        logger.error(f"Error processing custom events: {e}", exc_info=True)
+        await message.nack()
         raise
 
 
-@router.subscriber("other_events_topic", group_id="analytics")
-async def handle_other_event(event: dict) -> None:
-    logger.info("Processing other event from Kafka")
+@router.subscriber("other_events_topic", **batch_subscriber_options)
+async def handle_other_events(events: list[dict], message: KafkaMessage) -> None:
+    logger.debug(f"Processing batch of {len(events)} other events from Kafka")
     try:
-        await insert_event_to_clickhouse(event)
-        logger.info("Other event processed successfully")
+        await insert_events_to_clickhouse(events, message)
     except Exception as e:
-        logger.error(f"Error processing other event: {e}", exc_info=True)
+        logger.error(f"Error processing other events: {e}", exc_info=True)
+        await message.nack()
         raise
 
 
-@router.subscriber("order_created", group_id="analytics")
-async def handle_order_created(order: dict) -> None:
+@router.subscriber("order_created", **batch_subscriber_options)
+async def handle_order_created(orders: list[dict], message: KafkaMessage) -> None:
     """
-    Обработчик события создания заказа - сохраняет в аналитику.
-    
+    Обработчик событий создания заказа - ставит их в буфер вставки в аналитику пакетом.
+
     Args:
-        order: Словарь с данными заказа
+        orders: Список словарей с данными заказов
+        message: Пакет Kafka, оффсеты которого фиксируются после вставки
     """
-    order_id = order.get("order_id", "unknown")
-    user_id = order.get("user_id", "unknown")
-    logger.info(f"Processing order_created event from Kafka, order_id: {order_id}, user_id: {user_id}")
+    order_ids = [order.get("order_id", "unknown") for order in orders]
+    logger.info(f"Processing {len(orders)} order_created events from Kafka, order_ids: {order_ids}")
     try:
-        ch = await get_clickhouse_client()
-        
-        event_time = datetime.now(timezone.utc)
-        event_time_naive = event_time.replace(tzinfo=None)
-        event_time_str = event_time_naive.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-        
-        def escape_sql_string(s):
-            if s is None:
-                return "NULL"
-            return f"'{str(s).replace("'", "''")}'"
-        
-        # Сохраняем как событие типа "order_created" в общую таблицу events
-        sql = f"""
-            INSERT INTO analytics.events (
-                event_time,
-                event_type,
-                session_id,
-                page_view_id,
-                url,
-                pathname,
-                referrer,
-                user_agent,
-                click_x,
-                click_y,
-                click_type,
-                element_tag,
-                element_id,
-                element_class,
-                element_text,
-                payload_json
-            ) VALUES (
-                '{event_time_str}',
-                'order_created',
-                {escape_sql_string(str(order.get("user_id", "")))},
-                '',
-                '',
-                '',
-                '',
-                '',
-                NULL,
-                NULL,
-                NULL,
-                NULL,
-                NULL,
-                NULL,
-                NULL,
-                {escape_sql_string(json.dumps(order, ensure_ascii=False))}
-            )
-        """
-        
-        await ch.execute(sql)
-        logger.info(f"Order_created event inserted successfully to ClickHouse, order_id: {order_id}")
+        # Сохраняем как события типа "order_created" в общую таблицу events
+        await clickhouse_writer.write([build_order_row(order) for order in orders], offsets_commit(message))
+        logger.info(f"Order_created events queued for ClickHouse, order_ids: {order_ids}")
     except Exception as e:
-        logger.error(f"Error processing order_created event for order {order_id}: {e}", exc_info=True)
+        logger.error(f"Error processing order_created events for orders {order_ids}: {e}", exc_info=True)
+        await message.nack()
         raise
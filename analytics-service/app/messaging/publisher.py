@@ -1,10 +1,164 @@
+import asyncio
+from collections import defaultdict
+from typing import Optional
+
+from prometheus_client import Counter, Gauge
+from shared import get_logger
+
+from app.config import settings
 from app.messaging.broker import broker
 
+logger = get_logger(__name__)
+
+PUBLISH_QUEUE_DEPTH = Gauge(
+    "analytics_tracker_publish_queue_depth",
+    "Количество событий трекера, ожидающих публикации в Kafka",
+)
+DROPPED_EVENTS = Counter(
+    "analytics_tracker_events_dropped_total",
+    "Количество событий трекера, отброшенных из-за переполнения очереди",
+)
+
+
+class PublishQueueFull(Exception):
+    """Очередь публикации событий переполнена."""
+
+
+def get_tracker_topic(event_type: str) -> str:
+    """Возвращает Kafka-топик для типа события трекера."""
+    if event_type == "page_view":
+        return "page_views_topic"
+    if event_type == "click":
+        return "clicks_topic"
+    if event_type == "scroll":
+        return "scrolls_topic"
+    if event_type.startswith("custom_"):
+        return "custom_events_topic"
+    return "other_events_topic"
+
+
+async def publish_tracker_events(events: list[dict]) -> None:
+    """
+    Пакетная публикация событий трекера.
+
+    События группируются по топику; внутри топика все записи уходят
+    в аккумулятор продюсера без ожидания подтверждения и подтверждаются
+    одним ожиданием на топик. Ключ записи - sessionId, поэтому события
+    одной сессии попадают в одну партицию и сохраняют порядок.
+    """
+    events_by_topic: dict[str, list[dict]] = defaultdict(list)
+    for event in events:
+        events_by_topic[get_tracker_topic(event.get("eventType", ""))].append(event)
+
+    for topic, topic_events in events_by_topic.items():
+        futures = [
+            await broker.publish(
+                message=event,
+                topic=topic,
+                key=(event.get("sessionId") or "").encode() or None,
+                no_confirm=True,
+            )
+            for event in topic_events
+        ]
+        # TestKafkaBroker возвращает результат сразу, а не Future
+        await asyncio.gather(*(future for future in futures if asyncio.isfuture(future)))
+        logger.debug(f"Published {len(topic_events)} events to {topic}")
+
+
+class TrackerEventPublisher:
+    """
+    Фоновая публикация событий трекера через ограниченную очередь.
+
+    HTTP-обработчик только кладёт события в очередь и сразу отвечает,
+    а фоновая задача вычитывает до max_batch_size событий и публикует
+    их пакетно. При переполнении очереди политика overflow_policy
+    определяет поведение: "drop" - лишние события отбрасываются,
+    "reject" - весь запрос отклоняется, чтобы трекер повторил отправку.
+    """
+
+    def __init__(self, max_queue_size: int, max_batch_size: int, overflow_policy: str):
+        self._queue: asyncio.Queue[dict] = asyncio.Queue(maxsize=max_queue_size)
+        self._max_batch_size = max_batch_size
+        self._overflow_policy = overflow_policy
+        self._publish_task: Optional[asyncio.Task] = None
+        # Публикация пакета, уже вынутого из очереди
+        self._in_flight: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._publish_task is None:
+            self._publish_task = asyncio.create_task(self._publish_forever())
+            logger.debug("Tracker event publisher started")
+
+    async def stop(self) -> None:
+        if self._publish_task is not None:
+            self._publish_task.cancel()
+            try:
+                await self._publish_task
+            except asyncio.CancelledError:
+                pass
+            self._publish_task = None
+        # Пакет, который фоновая задача уже вынула из очереди, публикуется до конца
+        if self._in_flight is not None:
+            await self._in_flight
+            self._in_flight = None
+        await self._publish_pending()
+        logger.debug("Tracker event publisher stopped")
+
+    def enqueue(self, events: list[dict]) -> int:
+        """
+        Кладёт события в очередь публикации.
+
+        Args:
+            events: События трекера
+
+        Returns:
+            Количество отброшенных событий
+
+        Raises:
+            PublishQueueFull: Если очередь не вмещает запрос и политика "reject"
+        """
+        free_slots = self._queue.maxsize - self._queue.qsize()
+        if len(events) > free_slots and self._overflow_policy == "reject":
+            raise PublishQueueFull(f"Publish queue is full, free slots: {free_slots}")
+
+        accepted = events[:free_slots]
+        for event in accepted:
+            self._queue.put_nowait(event)
+        PUBLISH_QUEUE_DEPTH.set(self._queue.qsize())
+
+        dropped = len(events) - len(accepted)
+        if dropped:
+            DROPPED_EVENTS.inc(dropped)
+            logger.warning(f"Publish queue is full, dropped {dropped} tracker events")
+        return dropped
+
+    def _drain(self, batch: list[dict]) -> list[dict]:
+        while len(batch) < self._max_batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        PUBLISH_QUEUE_DEPTH.set(self._queue.qsize())
+        return batch
+
+    async def _publish_pending(self) -> None:
+        while not self._queue.empty():
+            await self._publish_batch(self._drain([]))
+
+    async def _publish_batch(self, batch: list[dict]) -> None:
+        try:
+            await publish_tracker_events(batch)
+        except Exception as e:
+            logger.error(f"Error publishing {len(batch)} tracker events to Kafka: {e}", exc_info=True)
+
+    async def _publish_forever(self) -> None:
+        while True:
+            first_event = await self._queue.get()
+            # Отмена задачи при остановке не прерывает публикацию вынутого из очереди пакета
+            self._in_flight = asyncio.create_task(self._publish_batch(self._drain([first_event])))
+            await asyncio.shield(self._in_flight)
+            self._in_flight = None
 
-async def publish_tracker_event(event: dict, topic: str) -> None:
-    """Публикация события трекера в указанный Kafka-топик."""
-    await broker.publish(
-        message=event,
-        topic=topic,
-    )
 
+tracker_publisher = TrackerEventPublisher(
+    max_queue_size=settings.TRACKER_PUBLISH_QUEUE_SIZE,
+    max_batch_size=settings.TRACKER_PUBLISH_BATCH_SIZE,
+    overflow_policy=settings.TRACKER_PUBLISH_OVERFLOW_POLICY,
+)
@@ -19,6 +19,10 @@ class Settings(BaseSettings):
 
     LOG_LEVEL: str = "INFO"
 
+    # Локальный кэш снимков товаров для отображения корзины
+    PRODUCT_SNAPSHOT_CACHE_SIZE: int = 10000
+    PRODUCT_SNAPSHOT_TTL_SECONDS: float = 30.0
+
     @property
     def DATABASE_URL(self):
         """Возвращает URL БД в зависимости от MODE"""
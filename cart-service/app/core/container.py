@@ -4,6 +4,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.unit_of_work_factory import UnitOfWorkFactory
 from app.repositories.carts_repository import CartsRepository
 from app.services.cart_service import CartService
+from app.services.product_snapshot_cache import product_snapshot_cache
 
 
 class Container(containers.DeclarativeContainer):
@@ -21,9 +22,13 @@ class Container(containers.DeclarativeContainer):
         session=db
     )
 
+    # Один кэш снимков товаров на процесс
+    product_snapshots = providers.Object(product_snapshot_cache)
+
     cart_service = providers.Factory(
         CartService,
         carts_repository=carts_repository,
-        uow_factory=uow_factory
+        uow_factory=uow_factory,
+        product_snapshots=product_snapshots,
     )
 
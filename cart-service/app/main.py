@@ -5,6 +5,7 @@ from fastapi import FastAPI
 from prometheus_fastapi_instrumentator import Instrumentator
 
 from shared import setup_logging
+from shared.http_client import close_http_clients
 
 from app.config import settings
 from app.api.carts import router as router_carts
@@ -20,6 +21,7 @@ async def lifespan(app: FastAPI):
     yield
 
     await broker.stop()
+    await close_http_clients()
 
 
 sentry_sdk.init(
@@ -4,7 +4,9 @@ from app.domain.entities.cart import CartItem
 from app.domain.interfaces.carts_repo import ICartsRepository
 from app.domain.interfaces.unit_of_work import IUnitOfWorkFactory
 from app.schemas.carts import SCartItem, SCartItemWithProduct
-from app.services.product_client import get_product
+from app.config import settings
+from app.services.product_client import get_product, get_products_by_ids
+from app.services.product_snapshot_cache import ProductSnapshotCache
 from app.exceptions import CannotHaveLessThan1Product, NeedToHaveAProductToIncreaseItsQuantity
 
 logger = get_logger(__name__)
@@ -14,7 +16,8 @@ class CartService:
     def __init__(
             self,
             carts_repository: ICartsRepository,
-            uow_factory: IUnitOfWorkFactory
+            uow_factory: IUnitOfWorkFactory,
+            product_snapshots: ProductSnapshotCache | None = None
     ):
         """
         Сервис для управления корзиной покупок пользователя
@@ -22,9 +25,14 @@ class CartService:
         Args:
             carts_repository: Репозиторий для работы с корзиной в БД
             uow_factory: Фабрика для создания UnitOfWork
+            product_snapshots: Кэш снимков товаров (по умолчанию - собственный у сервиса)
         """
         self.cart_repository = carts_repository
         self.uow_factory = uow_factory
+        self.product_snapshots = product_snapshots or ProductSnapshotCache(
+            max_size=settings.PRODUCT_SNAPSHOT_CACHE_SIZE,
+            ttl_seconds=settings.PRODUCT_SNAPSHOT_TTL_SECONDS,
+        )
 
     async def get_user_cart(self, user_id: int) -> list[SCartItem]:
         """
@@ -166,25 +174,24 @@ class CartService:
             cart_items = await self.cart_repository.get_cart_items(user_id=user_id)
             logger.debug(f"Found {len(cart_items)} items in cart for user {user_id}")
             
-            # Получаем информацию о продуктах из product-service
+            products = await self._get_product_snapshots([item.product_id for item in cart_items])
             result = []
             for item in cart_items:
-                try:
-                    product = await get_product(item.product_id)
-                    result.append(SCartItemWithProduct(
-                        product_id=item.product_id,
-                        name=product["name"],
-                        description=product["description"],
-                        price=product["price"],
-                        quantity=item.quantity,
-                        total_cost=item.total_cost,
-                        product_quantity=product["product_quantity"],
-                        image=product.get("image"),
-                    ))
-                except Exception as e:
+                product = products.get(item.product_id)
+                if product is None:
                     # Если продукт не найден, пропускаем его
-                    logger.warning(f"Product {item.product_id} not found, skipping: {e}")
+                    logger.warning(f"Product {item.product_id} not found, skipping")
                     continue
+                result.append(SCartItemWithProduct(
+                    product_id=item.product_id,
+                    name=product["name"],
+                    description=product["description"],
+                    price=product["price"],
+                    quantity=item.quantity,
+                    total_cost=item.total_cost,
+                    product_quantity=product["product_quantity"],
+                    image=product.get("image"),
+                ))
             
             logger.debug(f"Returning {len(result)} cart items with product info for user {user_id}")
             return result
@@ -192,6 +199,27 @@ class CartService:
             logger.error(f"Error fetching cart items with products for user {user_id}: {e}", exc_info=True)
             raise
 
+    async def _get_product_snapshots(self, product_ids: list[int]) -> dict[int, dict]:
+        """
+        Данные товаров корзины: свежие снимки из кэша, остальные одним запросом /products/by_ids.
+
+        Товары, которых нет в ответе product-service, удаляются из кэша и в результат не попадают.
+        Если product-service недоступен, используются последние известные снимки.
+        """
+        products, missing = self.product_snapshots.get_many(product_ids)
+        if not missing:
+            return products
+        try:
+            fetched = await get_products_by_ids(missing)
+        except Exception as e:
+            logger.warning(f"Product-service unavailable, using stale product snapshots: {e}")
+            products.update(self.product_snapshots.get_stale(missing))
+            return products
+        self.product_snapshots.put_many(fetched)
+        self.product_snapshots.forget([product_id for product_id in missing if product_id not in fetched])
+        products.update(fetched)
+        return products
+
     async def update_quantity(self, user_id: int, product_id: int, quantity: int) -> int:
         """
         Обновляет количество конкретного товара в корзине
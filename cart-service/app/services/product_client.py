@@ -1,10 +1,16 @@
+import asyncio
+
 import httpx
 from app.config import settings
 from shared import get_logger
 from shared.constants import HttpTimeout
+from shared.http_client import get_http_client
 
 logger = get_logger(__name__)
 
+# Ограничение product-service на число ID в одном запросе /products/by_ids
+PRODUCTS_BY_IDS_LIMIT = 50
+
 
 async def get_product(product_id: int) -> dict:
     """
@@ -21,15 +27,15 @@ async def get_product(product_id: int) -> dict:
     """
     logger.debug(f"Fetching product {product_id} from product-service")
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{settings.PRODUCT_SERVICE_URL}/products/{product_id}",
-                timeout=HttpTimeout.DEFAULT.value
-            )
-            response.raise_for_status()
-            product = response.json()
-            logger.debug(f"Product {product_id} retrieved successfully")
-            return product
+        client = get_http_client(settings.PRODUCT_SERVICE_URL)
+        response = await client.get(
+            f"{settings.PRODUCT_SERVICE_URL}/products/{product_id}",
+            timeout=HttpTimeout.DEFAULT.value
+        )
+        response.raise_for_status()
+        product = response.json()
+        logger.debug(f"Product {product_id} retrieved successfully")
+        return product
     except httpx.HTTPStatusError as e:
         logger.warning(f"HTTP error fetching product {product_id}: {e.response.status_code}")
         raise
@@ -37,3 +43,49 @@ async def get_product(product_id: int) -> dict:
         logger.error(f"Error fetching product {product_id}: {e}", exc_info=True)
         raise
 
+
+async def get_products_by_ids(product_ids: list[int]) -> dict[int, dict]:
+    """
+    Получает товары по списку ID через /products/by_ids.
+
+    product-service отдаёт не больше PRODUCTS_BY_IDS_LIMIT товаров за запрос,
+    поэтому длинный список режется на части, которые запрашиваются параллельно.
+
+    Args:
+        product_ids: ID продуктов
+
+    Returns:
+        Словарь {product_id: данные продукта}; несуществующих товаров в нём нет
+
+    Raises:
+        httpx.HTTPStatusError: Если сервис недоступен
+    """
+    if not product_ids:
+        return {}
+    logger.debug(f"Fetching {len(product_ids)} products from product-service")
+    chunks = [
+        product_ids[i:i + PRODUCTS_BY_IDS_LIMIT]
+        for i in range(0, len(product_ids), PRODUCTS_BY_IDS_LIMIT)
+    ]
+    try:
+        client = get_http_client(settings.PRODUCT_SERVICE_URL)
+        responses = await asyncio.gather(*(
+            client.get(
+                f"{settings.PRODUCT_SERVICE_URL}/products/by_ids",
+                params={"ids": chunk},
+                timeout=HttpTimeout.DEFAULT.value
+            )
+            for chunk in chunks
+        ))
+        products = {}
+        for response in responses:
+            response.raise_for_status()
+            products.update({product["product_id"]: product for product in response.json()})
+        logger.debug(f"Retrieved {len(products)} of {len(product_ids)} products")
+        return products
+    except httpx.HTTPStatusError as e:
+        logger.warning(f"HTTP error fetching products by ids: {e.response.status_code}")
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching products by ids: {e}", exc_info=True)
+        raise
@@ -0,0 +1,75 @@
+import time
+from collections import OrderedDict
+
+from shared import get_logger
+
+from app.config import settings
+
+logger = get_logger(__name__)
+
+
+class ProductSnapshotCache:
+    """
+    Локальный кэш снимков товаров (название, описание, цена, остаток, картинка).
+
+    Корзину открывают многократно, а данные товаров меняются редко, поэтому
+    свежие снимки (моложе ttl_seconds) отдаются без похода в product-service.
+    Устаревшие снимки не удаляются сразу: если product-service недоступен,
+    корзина показывается по последнему известному снимку.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self._max_size = max_size
+        self._ttl_seconds = ttl_seconds
+        self._snapshots: OrderedDict[int, tuple[dict, float]] = OrderedDict()
+
+    def get_many(self, product_ids: list[int]) -> tuple[dict[int, dict], list[int]]:
+        """
+        Возвращает свежие снимки и ID товаров, которые нужно запросить.
+
+        Args:
+            product_ids: ID товаров
+
+        Returns:
+            Кортеж (свежие снимки {product_id: товар}, ID без свежего снимка)
+        """
+        now = time.monotonic()
+        fresh = {}
+        missing = []
+        for product_id in dict.fromkeys(product_ids):
+            cached = self._snapshots.get(product_id)
+            if cached is not None and now < cached[1]:
+                self._snapshots.move_to_end(product_id)
+                fresh[product_id] = cached[0]
+            else:
+                missing.append(product_id)
+        return fresh, missing
+
+    def get_stale(self, product_ids: list[int]) -> dict[int, dict]:
+        """Последние известные снимки товаров независимо от возраста"""
+        return {
+            product_id: self._snapshots[product_id][0]
+            for product_id in product_ids
+            if product_id in self._snapshots
+        }
+
+    def put_many(self, products: dict[int, dict]) -> None:
+        expires_at = time.monotonic() + self._ttl_seconds
+        for product_id, product in products.items():
+            self._snapshots[product_id] = (product, expires_at)
+            self._snapshots.move_to_end(product_id)
+        while len(self._snapshots) > self._max_size:
+            self._snapshots.popitem(last=False)
+
+    def forget(self, product_ids: list[int]) -> None:
+        """Удаляет снимки товаров, которых больше нет в product-service"""
+        for product_id in product_ids:
+            self._snapshots.pop(product_id, None)
+        if product_ids:
+            logger.debug(f"Forgot snapshots of {len(product_ids)} missing products")
+
+
+product_snapshot_cache = ProductSnapshotCache(
+    max_size=settings.PRODUCT_SNAPSHOT_CACHE_SIZE,
+    ttl_seconds=settings.PRODUCT_SNAPSHOT_TTL_SECONDS,
+)
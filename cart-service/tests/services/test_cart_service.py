@@ -2,6 +2,7 @@ import pytest
 
 from app.domain.entities.cart import CartItem
 from app.services.cart_service import CartService
+from app.services.product_snapshot_cache import ProductSnapshotCache
 from app.schemas.carts import SCartItem, SCartItemWithProduct
 from app.exceptions import CannotHaveLessThan1Product, NeedToHaveAProductToIncreaseItsQuantity
 
@@ -355,22 +356,22 @@ class TestCartServiceGetCartItemsWithProducts:
         ]
         
         mock_repository.get_cart_items = mocker.AsyncMock(return_value=cart_items)
-        mocker.patch(
-            'app.services.cart_service.get_product',
-            new=mocker.AsyncMock(side_effect=[
-                {
+        mock_get_products = mocker.patch(
+            'app.services.cart_service.get_products_by_ids',
+            new=mocker.AsyncMock(return_value={
+                1: {
                     "name": "Product 1",
                     "description": "Description 1",
                     "price": 1000,
                     "product_quantity": 10
                 },
-                {
+                2: {
                     "name": "Product 2",
                     "description": "Description 2",
                     "price": 1500,
                     "product_quantity": 5
                 }
-            ])
+            })
         )
         
         result = await cart_service.get_cart_items_with_products(user_id)
@@ -379,6 +380,7 @@ class TestCartServiceGetCartItemsWithProducts:
         assert result[0].product_id in [1, 2]
         assert result[1].product_id in [1, 2]
         assert all(isinstance(item, SCartItemWithProduct) for item in result)
+        mock_get_products.assert_awaited_once_with([1, 2])
     
     @pytest.mark.asyncio
     async def test_get_cart_items_with_products_empty(
@@ -413,23 +415,99 @@ class TestCartServiceGetCartItemsWithProducts:
         
         mock_repository.get_cart_items = mocker.AsyncMock(return_value=cart_items)
         mocker.patch(
-            'app.services.cart_service.get_product',
-            new=mocker.AsyncMock(side_effect=[
-                {
+            'app.services.cart_service.get_products_by_ids',
+            new=mocker.AsyncMock(return_value={
+                1: {
                     "name": "Product 1",
                     "description": "Description 1",
                     "price": 1000,
                     "product_quantity": 10
+                }
+                # Несуществующего товара 999 в ответе нет
+            })
+        )
+        
+        result = await cart_service.get_cart_items_with_products(user_id)
+        
+        # Должен вернуться только один товар (несуществующий пропущен)
+        assert len(result) == 1
+        assert result[0].product_id == 1
+
+    @pytest.mark.asyncio
+    async def test_get_cart_items_with_products_uses_snapshot_cache(
+        self,
+        cart_service: CartService,
+        mock_repository,
+        mocker
+    ):
+        """Тест: повторное открытие корзины берёт товары из кэша снимков, догружая только новые"""
+        user_id = 1
+        product = {
+            "name": "Product",
+            "description": "Description",
+            "price": 1000,
+            "product_quantity": 10
+        }
+        
+        mock_repository.get_cart_items = mocker.AsyncMock(side_effect=[
+            [SCartItem(product_id=1, quantity=1, total_cost=1000)],
+            [
+                SCartItem(product_id=2, quantity=1, total_cost=1000),
+                SCartItem(product_id=1, quantity=1, total_cost=1000)
+            ]
+        ])
+        mock_get_products = mocker.patch(
+            'app.services.cart_service.get_products_by_ids',
+            new=mocker.AsyncMock(side_effect=lambda ids: {product_id: product for product_id in ids})
+        )
+        
+        await cart_service.get_cart_items_with_products(user_id)
+        result = await cart_service.get_cart_items_with_products(user_id)
+        
+        # Порядок товаров корзины сохраняется
+        assert [item.product_id for item in result] == [2, 1]
+        assert mock_get_products.await_args_list == [mocker.call([1]), mocker.call([2])]
+
+    @pytest.mark.asyncio
+    async def test_get_cart_items_with_products_stale_snapshot_on_error(
+        self,
+        mock_repository,
+        mock_uow_factory,
+        mocker
+    ):
+        """Тест: при недоступности product-service используются последние известные снимки"""
+        user_id = 1
+        cart_service = CartService(
+            carts_repository=mock_repository,
+            uow_factory=mock_uow_factory,
+            product_snapshots=ProductSnapshotCache(max_size=10, ttl_seconds=0.0)
+        )
+        
+        mock_repository.get_cart_items = mocker.AsyncMock(return_value=[
+            SCartItem(product_id=1, quantity=1, total_cost=1000),
+            SCartItem(product_id=2, quantity=1, total_cost=1000)
+        ])
+        mocker.patch(
+            'app.services.cart_service.get_products_by_ids',
+            new=mocker.AsyncMock(side_effect=[
+                {
+                    1: {
+                        "name": "Product 1",
+                        "description": "Description 1",
+                        "price": 1000,
+                        "product_quantity": 10
+                    }
                 },
-                Exception("Product not found")  # Исключение для несуществующего товара
+                Exception("Service unavailable")
             ])
         )
         
+        await cart_service.get_cart_items_with_products(user_id)
         result = await cart_service.get_cart_items_with_products(user_id)
         
-        # Должен вернуться только один товар (несуществующий пропущен)
         assert len(result) == 1
         assert result[0].product_id == 1
+        assert result[0].name == "Product 1"
 
 
 class TestCartServiceUpdateQuantity:
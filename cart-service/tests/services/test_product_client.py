@@ -1,7 +1,7 @@
 import pytest
 import httpx
 
-from app.services.product_client import get_product
+from app.services.product_client import get_product, get_products_by_ids
 
 
 class TestProductClientGetProduct:
@@ -24,12 +24,10 @@ class TestProductClientGetProduct:
         mock_response.raise_for_status = mocker.Mock()
         
         mock_client = mocker.AsyncMock()
-        mock_client.__aenter__ = mocker.AsyncMock(return_value=mock_client)
-        mock_client.__aexit__ = mocker.AsyncMock(return_value=None)
         mock_client.get = mocker.AsyncMock(return_value=mock_response)
         
         mocker.patch(
-            'app.services.product_client.httpx.AsyncClient',
+            'app.services.product_client.get_http_client',
             return_value=mock_client
         )
         
@@ -55,12 +53,10 @@ class TestProductClientGetProduct:
         )
         
         mock_client = mocker.AsyncMock()
-        mock_client.__aenter__ = mocker.AsyncMock(return_value=mock_client)
-        mock_client.__aexit__ = mocker.AsyncMock(return_value=None)
         mock_client.get = mocker.AsyncMock(return_value=mock_response)
         
         mocker.patch(
-            'app.services.product_client.httpx.AsyncClient',
+            'app.services.product_client.get_http_client',
             return_value=mock_client
         )
         
@@ -82,14 +78,52 @@ class TestProductClientGetProduct:
         )
         
         mock_client = mocker.AsyncMock()
-        mock_client.__aenter__ = mocker.AsyncMock(return_value=mock_client)
-        mock_client.__aexit__ = mocker.AsyncMock(return_value=None)
         mock_client.get = mocker.AsyncMock(return_value=mock_response)
         
         mocker.patch(
-            'app.services.product_client.httpx.AsyncClient',
+            'app.services.product_client.get_http_client',
             return_value=mock_client
         )
         
         with pytest.raises(httpx.HTTPStatusError):
             await get_product(product_id)
+
+
+class TestProductClientGetProductsByIds:
+    """Тесты для функции get_products_by_ids"""
+    
+    @pytest.mark.asyncio
+    async def test_get_products_by_ids_splits_into_chunks(self, mocker):
+        """Тест: длинный список ID запрашивается частями по 50, ответы собираются в словарь"""
+        product_ids = list(range(1, 121))
+        
+        def make_response(url, params, timeout):
+            response = mocker.Mock()
+            response.raise_for_status = mocker.Mock()
+            # Товара 7 в product-service нет
+            response.json.return_value = [
+                {"product_id": product_id, "name": f"Product {product_id}"}
+                for product_id in params["ids"] if product_id != 7
+            ]
+            return response
+        
+        mock_client = mocker.AsyncMock()
+        mock_client.get = mocker.AsyncMock(side_effect=make_response)
+        
+        mocker.patch(
+            'app.services.product_client.get_http_client',
+            return_value=mock_client
+        )
+        
+        result = await get_products_by_ids(product_ids)
+        
+        assert sorted(result) == [product_id for product_id in product_ids if product_id != 7]
+        assert [len(call.kwargs["params"]["ids"]) for call in mock_client.get.call_args_list] == [50, 50, 20]
+    
+    @pytest.mark.asyncio
+    async def test_get_products_by_ids_empty(self, mocker):
+        """Тест: пустой список ID не делает запросов"""
+        mock_get_client = mocker.patch('app.services.product_client.get_http_client')
+        
+        assert await get_products_by_ids([]) == {}
+        mock_get_client.assert_not_called()
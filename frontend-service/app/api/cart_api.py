@@ -2,7 +2,7 @@ from fastapi import APIRouter, Request, Response, Body
 from fastapi.responses import JSONResponse
 from shared import get_logger
 
-from app.services.user_client import get_current_user
+from app.services.user_client import get_current_user_identity
 from app.services.cart_client import get_cart, add_to_cart, update_quantity, remove_from_cart
 from app.services.product_client import get_products_by_ids
 from app.services.recommend_client import get_recommendations_for_session
@@ -12,7 +12,7 @@ logger = get_logger(__name__)
 
 
 async def require_user(request: Request) -> dict | None:
-    user = await get_current_user(request.cookies)
+    user = get_current_user_identity(request.cookies)
     return user
 
 
@@ -1,10 +1,67 @@
+from typing import Iterable
+from urllib.parse import urlsplit, urlunsplit
+
 from fastapi import APIRouter, Request, Response
-import httpx
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+
 from app.config import settings
 from shared.constants import HttpTimeout
+from shared.http_client import get_http_client
 
 router = APIRouter(prefix="/api", tags=["API Gateway"])
 
+# Заголовки соединения (RFC 9110, 7.6.1), которые не передаются через прокси
+HOP_BY_HOP_HEADERS = frozenset({
+    "connection",
+    "keep-alive",
+    "proxy-authenticate",
+    "proxy-authorization",
+    "proxy-connection",
+    "te",
+    "trailer",
+    "transfer-encoding",
+    "upgrade",
+    "host",
+})
+
+
+def filter_hop_by_hop_headers(headers: Iterable[tuple[str, str]]) -> list[tuple[str, str]]:
+    """Убирает hop-by-hop заголовки, включая перечисленные в Connection."""
+    headers = list(headers)
+    connection_tokens = {
+        token.strip().lower()
+        for name, value in headers
+        if name.lower() == "connection"
+        for token in value.split(",")
+    }
+    return [
+        (name, value)
+        for name, value in headers
+        if name.lower() not in HOP_BY_HOP_HEADERS and name.lower() not in connection_tokens
+    ]
+
+
+def has_request_body(request: Request) -> bool:
+    """Есть ли у входящего запроса тело, которое нужно проксировать."""
+    return "content-length" in request.headers or "transfer-encoding" in request.headers
+
+
+def rewrite_location(location: str, base_url: str, service: str) -> str:
+    """
+    Переводит Location редиректа сервиса в путь шлюза.
+
+    Адрес сервиса недоступен браузеру, поэтому ссылки на сам сервис
+    (абсолютные и от корня) получают префикс /api/{service}; внешние
+    адреса и относительные пути остаются как есть.
+    """
+    parts = urlsplit(location)
+    if parts.netloc and parts.netloc != urlsplit(base_url).netloc:
+        return location
+    if not parts.netloc and not parts.path.startswith("/"):
+        return location
+    return urlunsplit(("", "", f"/api/{service}{parts.path}", parts.query, parts.fragment))
+
 
 @router.api_route("/{service}/{path:path}", methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"])
 async def proxy_request(service: str, path: str, request: Request):
@@ -31,43 +88,34 @@ async def proxy_request(service: str, path: str, request: Request):
     base_url = service_urls[service]
     target_url = f"{base_url}/{path}"
     
-    # Получаем тело запроса
-    body = await request.body()
-    
-    # Получаем заголовки (исключаем host и connection)
-    headers = dict(request.headers)
-    headers.pop("host", None)
-    headers.pop("connection", None)
-    
-    # Получаем cookies
-    cookies = dict(request.cookies)
-    
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.request(
-                method=request.method,
-                url=target_url,
-                headers=headers,
-                cookies=cookies,
-                content=body if body else None,
-                timeout=HttpTimeout.GATEWAY.value,
-                follow_redirects=True
-            )
-            
-            # Создаем ответ с теми же заголовками и cookies
-            response_headers = dict(response.headers)
-            response_headers.pop("content-encoding", None)
-            response_headers.pop("transfer-encoding", None)
-            
-            return Response(
-                content=response.content,
-                status_code=response.status_code,
-                headers=response_headers,
-                media_type=response.headers.get("content-type")
-            )
-        except Exception as e:
-            return Response(
-                status_code=500,
-                content=f"Gateway error: {str(e)}"
-            )
+    client = get_http_client(base_url)
+    upstream_request = client.build_request(
+        method=request.method,
+        url=target_url,
+        params=request.query_params.multi_items(),
+        headers=filter_hop_by_hop_headers(request.headers.items()),
+        content=request.stream() if has_request_body(request) else None,
+        timeout=HttpTimeout.GATEWAY.value,
+    )
+    try:
+        # Потоковое тело нельзя отправить повторно, поэтому редирект
+        # (например, 307 на путь со слешем) возвращается браузеру
+        upstream_response = await client.send(upstream_request, stream=True, follow_redirects=False)
+    except Exception as e:
+        return Response(
+            status_code=500,
+            content=f"Gateway error: {str(e)}"
+        )
 
+    # Тело отдаётся клиенту по мере получения от сервиса, без буферизации в памяти шлюза.
+    # Байты передаются как есть (aiter_raw), поэтому content-encoding и content-length остаются валидными.
+    response = StreamingResponse(
+        upstream_response.aiter_raw(),
+        status_code=upstream_response.status_code,
+        background=BackgroundTask(upstream_response.aclose),
+    )
+    for name, value in filter_hop_by_hop_headers(upstream_response.headers.multi_items()):
+        if name.lower() == "location":
+            value = rewrite_location(value, base_url, service)
+        response.headers.append(name, value)
+    return response
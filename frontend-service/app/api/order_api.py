@@ -3,9 +3,10 @@ from fastapi.responses import JSONResponse, Response
 import httpx
 
 from app.config import settings
-from app.services.user_client import get_current_user
+from app.services.user_client import get_current_user_identity
 from shared import get_logger
 from shared.constants import HttpHeaders, HttpTimeout
+from shared.http_client import get_http_client
 
 logger = get_logger(__name__)
 
@@ -18,16 +19,16 @@ def _order_base() -> str:
 
 @router.post("/orders/")
 async def create_order(request: Request):
-    user = await get_current_user(request.cookies)
+    user = get_current_user_identity(request.cookies)
     if not user:
         return JSONResponse(status_code=401, content={"detail": "Необходима авторизация"})
     try:
-        async with httpx.AsyncClient() as client:
-            r = await client.post(
-                f"{_order_base()}/orders/",
-                headers={HttpHeaders.X_USER_ID.value: str(user["id"])},
-                timeout=HttpTimeout.GATEWAY.value,
-            )
+        client = get_http_client(settings.ORDER_SERVICE_URL)
+        r = await client.post(
+            f"{_order_base()}/orders/",
+            headers={HttpHeaders.X_USER_ID.value: str(user["id"])},
+            timeout=HttpTimeout.GATEWAY.value,
+        )
         return Response(
             content=r.content,
             status_code=r.status_code,
@@ -41,16 +42,16 @@ async def create_order(request: Request):
 @router.get("/orders")
 @router.get("/orders/")
 async def list_orders(request: Request):
-    user = await get_current_user(request.cookies)
+    user = get_current_user_identity(request.cookies)
     if not user:
         return JSONResponse(status_code=401, content={"detail": "Необходима авторизация"})
     try:
-        async with httpx.AsyncClient() as client:
-            r = await client.get(
-                f"{_order_base()}/orders/",
-                headers={HttpHeaders.X_USER_ID.value: str(user["id"])},
-                timeout=HttpTimeout.GATEWAY.value,
-            )
+        client = get_http_client(settings.ORDER_SERVICE_URL)
+        r = await client.get(
+            f"{_order_base()}/orders/",
+            headers={HttpHeaders.X_USER_ID.value: str(user["id"])},
+            timeout=HttpTimeout.GATEWAY.value,
+        )
         return Response(
             content=r.content,
             status_code=r.status_code,
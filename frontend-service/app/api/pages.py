@@ -1,3 +1,4 @@
+import asyncio
 from math import ceil
 
 from fastapi import APIRouter, Depends, Request, Form
@@ -5,7 +6,9 @@ from shared import get_logger
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
 
-from app.services.user_client import get_current_user, login_user, register_user
+from app.config import settings
+from app.services.page_composer import fetch_fragment, fetch_required_fragment
+from app.services.user_client import get_current_user, get_current_user_identity, login_user, register_user
 from app.services.product_client import (
     get_all_products,
     get_product,
@@ -105,7 +108,7 @@ async def get_product_page(
 
 @router.get("/cart")
 async def get_cart_page(request: Request):
-    user = await get_current_user(request.cookies)
+    user = get_current_user_identity(request.cookies)
     if not user:
         return RedirectResponse(url="/login", status_code=302)
 
@@ -130,9 +133,28 @@ async def get_product_detail_page(
     request: Request,
     product_id: int
 ):
-    product = await get_product(product_id)
-    reviews = await get_reviews(product_id)
-    recommendations = await get_recommendations_for_product(product, limit=4)
+    page = "product_detail"
+    # Отзывы и похожие товары зависят только от id и запрашиваются параллельно с товаром
+    reviews_task = asyncio.create_task(
+        fetch_fragment(
+            page, "reviews", get_reviews(product_id),
+            deadline=settings.REVIEWS_FRAGMENT_DEADLINE, default=[],
+        )
+    )
+    recommendations_task = asyncio.create_task(
+        fetch_fragment(
+            page, "recommendations", get_recommendations_for_product(product_id, limit=4),
+            deadline=settings.RECOMMENDATIONS_FRAGMENT_DEADLINE, default=[],
+        )
+    )
+    try:
+        product = await fetch_required_fragment(page, "product", get_product(product_id))
+    except Exception:
+        reviews_task.cancel()
+        recommendations_task.cancel()
+        raise
+
+    reviews, recommendations = await asyncio.gather(reviews_task, recommendations_task)
     return templates.TemplateResponse(
         "product_detail.html",
         {
@@ -15,9 +15,22 @@ class Settings(BaseSettings):
     ANALYTICS_SERVICE_URL: str
     RECOMMENDATIONS_SERVICE_URL: str
 
+    KAFKA_HOST: str
+    KAFKA_INTERNAL_PORT: int
+
+    # Единственная граница устаревания названий при переименовании и удалении категорий
+    CATEGORY_CACHE_TTL_SECONDS: float = 300.0
+
+    # Бюджеты времени необязательных фрагментов страницы товара, в секундах
+    REVIEWS_FRAGMENT_DEADLINE: float = 0.15
+    RECOMMENDATIONS_FRAGMENT_DEADLINE: float = 0.15
+
     # Для аутентификации через cookies
     SECRET_KEY: str
     ALGORITHM: str
+    # Кэш локально проверенных access token
+    AUTH_TOKEN_CACHE_SIZE: int = 10000
+    AUTH_TOKEN_CACHE_TTL_SECONDS: float = 60.0
 
     LOG_LEVEL: str = "INFO"
 
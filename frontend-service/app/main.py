@@ -7,18 +7,27 @@ from fastapi.staticfiles import StaticFiles
 from prometheus_fastapi_instrumentator import Instrumentator
 
 from shared import setup_logging
+from shared.http_client import close_http_clients
 
 from app.config import settings
 from app.api.cart_api import router as router_cart_api
 from app.api.order_api import router as router_order_api
 from app.api.pages import router as router_pages
 from app.api.gateway import router as router_gateway
+from app.messaging.broker import broker
+from app.messaging.handlers import router as kafka_router
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    broker.include_router(kafka_router)
+    await broker.start()
+
     yield
 
+    await broker.stop()
+    await close_http_clients()
+
 
 sentry_sdk.init(
     dsn=settings.SENTRY_URL,
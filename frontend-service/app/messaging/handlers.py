@@ -0,0 +1,20 @@
+from faststream.kafka import KafkaRouter
+from shared import get_logger
+
+from app.services.category_cache import category_cache
+
+router = KafkaRouter()
+logger = get_logger(__name__)
+
+
+# Без group_id: каждый воркер шлюза держит свой кэш и должен получить событие сам
+@router.subscriber("category_updated")
+async def handle_category_updated(category: dict) -> None:
+    """
+    Обработчик события изменения категории - сбрасывает кэш названий категорий.
+
+    Args:
+        category: Словарь с данными категории
+    """
+    logger.info(f"Processing category_updated event, category_id: {category.get('category_id')}")
+    category_cache.invalidate()
@@ -2,6 +2,7 @@ import httpx
 from app.config import settings
 from shared import get_logger
 from shared.constants import HttpTimeout
+from shared.http_client import get_http_client
 
 logger = get_logger(__name__)
 
@@ -14,15 +15,15 @@ async def get_viewed_product_ids(session_id: str) -> list[int]:
     if not session_id or not session_id.strip():
         return []
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{settings.ANALYTICS_SERVICE_URL}/analytics/viewed-products",
-                params={"session_id": session_id.strip()},
-                timeout=HttpTimeout.DEFAULT.value,
-            )
-            response.raise_for_status()
-            data = response.json()
-            return list(data.get("product_ids") or [])
+        client = get_http_client(settings.ANALYTICS_SERVICE_URL)
+        response = await client.get(
+            f"{settings.ANALYTICS_SERVICE_URL}/analytics/viewed-products",
+            params={"session_id": session_id.strip()},
+            timeout=HttpTimeout.DEFAULT.value,
+        )
+        response.raise_for_status()
+        data = response.json()
+        return list(data.get("product_ids") or [])
     except httpx.TimeoutException as e:
         logger.warning("Timeout requesting viewed products from analytics: %s", e)
         return []
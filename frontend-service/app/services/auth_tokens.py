@@ -0,0 +1,94 @@
+import hashlib
+import time
+from collections import OrderedDict
+
+from jose import JWTError, jwt
+from shared import get_logger
+
+from app.config import settings
+
+logger = get_logger(__name__)
+
+
+def decode_access_token(token: str) -> tuple[dict, float] | None:
+    """
+    Проверяет подпись и срок действия access token локально.
+
+    Токен выпускается user-service с тем же SECRET_KEY/ALGORITHM,
+    поэтому для получения id пользователя поход в /auth/me не нужен.
+
+    Args:
+        token: JWT из cookie access_token
+
+    Returns:
+        Кортеж (личность {"id": user_id}, exp в unix-времени) или None, если токен невалиден
+    """
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, settings.ALGORITHM)
+    except JWTError:
+        return None
+
+    expire = payload.get("exp")
+    user_id = payload.get("sub")
+    if not expire or not user_id or int(expire) < time.time():
+        return None
+    try:
+        return {"id": int(user_id)}, float(expire)
+    except ValueError:
+        return None
+
+
+class AccessTokenCache:
+    """
+    LRU-кэш проверенных access token с коротким TTL.
+
+    Ключ - sha256 токена, сам токен в памяти не хранится. Запись живёт
+    не дольше ttl_seconds и не дольше срока действия токена, поэтому
+    повторные запросы одного пользователя не декодируют JWT заново.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self._max_size = max_size
+        self._ttl_seconds = ttl_seconds
+        self._identities: OrderedDict[str, tuple[dict, float]] = OrderedDict()
+
+    def get_identity(self, token: str) -> dict | None:
+        """
+        Возвращает личность пользователя по access token.
+
+        Args:
+            token: JWT из cookie access_token
+
+        Returns:
+            Словарь {"id": user_id} или None, если токен невалиден или истёк
+        """
+        key = hashlib.sha256(token.encode()).hexdigest()
+        now = time.time()
+
+        cached = self._identities.get(key)
+        if cached is not None:
+            identity, expires_at = cached
+            if now < expires_at:
+                self._identities.move_to_end(key)
+                return identity
+            del self._identities[key]
+
+        decoded = decode_access_token(token)
+        if decoded is None:
+            return None
+        identity, token_expires_at = decoded
+
+        self._identities[key] = (identity, min(now + self._ttl_seconds, token_expires_at))
+        if len(self._identities) > self._max_size:
+            self._identities.popitem(last=False)
+        return identity
+
+    def clear(self) -> None:
+        logger.debug("Access token cache cleared")
+        self._identities.clear()
+
+
+access_token_cache = AccessTokenCache(
+    max_size=settings.AUTH_TOKEN_CACHE_SIZE,
+    ttl_seconds=settings.AUTH_TOKEN_CACHE_TTL_SECONDS,
+)
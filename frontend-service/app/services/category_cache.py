@@ -0,0 +1,54 @@
+import time
+
+from shared import get_logger
+
+from app.config import settings
+
+logger = get_logger(__name__)
+
+
+class CategoryNameCache:
+    """
+    In-process кэш названий категорий с TTL.
+
+    Категории меняются редко, поэтому карта {category_id: name} живёт
+    до истечения TTL или до события category_updated из product-service.
+
+    product-service публикует category_updated только при создании категории:
+    событие сбрасывает пустые названия, закэшированные для ещё неизвестных ID.
+    Переименование и удаление категорий идут мимо API product-service
+    (миграции, правки в БД), поэтому для них устаревание ограничено только TTL.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self._ttl_seconds = ttl_seconds
+        self._names: dict[int, str] = {}
+        self._expires_at = 0.0
+
+    def get_many(self, category_ids: set[int]) -> tuple[dict[int, str], set[int]]:
+        """
+        Возвращает закэшированные названия и ID, которых в кэше нет.
+
+        Args:
+            category_ids: ID категорий
+
+        Returns:
+            Кортеж (найденные {category_id: name}, отсутствующие ID)
+        """
+        if time.monotonic() >= self._expires_at:
+            self._names = {}
+        found = {cid: self._names[cid] for cid in category_ids if cid in self._names}
+        return found, category_ids - found.keys()
+
+    def put_many(self, names: dict[int, str]) -> None:
+        if not self._names:
+            self._expires_at = time.monotonic() + self._ttl_seconds
+        self._names.update(names)
+
+    def invalidate(self) -> None:
+        logger.debug("Category name cache invalidated")
+        self._names = {}
+        self._expires_at = 0.0
+
+
+category_cache = CategoryNameCache(ttl_seconds=settings.CATEGORY_CACHE_TTL_SECONDS)
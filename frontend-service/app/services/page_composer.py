@@ -0,0 +1,70 @@
+import asyncio
+import time
+from typing import Awaitable, TypeVar
+
+from prometheus_client import Histogram
+from shared import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+FRAGMENT_LATENCY = Histogram(
+    "frontend_page_fragment_seconds",
+    "Время получения фрагмента страницы от upstream-сервиса",
+    labelnames=["page", "fragment", "outcome"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.15, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+
+async def fetch_fragment(
+    page: str,
+    fragment: str,
+    awaitable: Awaitable[T],
+    *,
+    deadline: float | None,
+    default: T,
+) -> T:
+    """
+    Получает фрагмент страницы с собственным бюджетом времени.
+
+    Если upstream не уложился в deadline или упал, фрагмент деградирует
+    до default, а страница рендерится без него.
+
+    Args:
+        page: Имя страницы (метка метрики)
+        fragment: Имя фрагмента (метка метрики)
+        awaitable: Корутина получения данных фрагмента
+        deadline: Бюджет времени в секундах, None - без ограничения
+        default: Значение фрагмента при таймауте или ошибке
+
+    Returns:
+        Данные фрагмента или default
+    """
+    started = time.perf_counter()
+    outcome = "ok"
+    try:
+        return await asyncio.wait_for(awaitable, timeout=deadline)
+    except asyncio.TimeoutError:
+        outcome = "timeout"
+        logger.warning(f"Fragment {fragment} of page {page} exceeded deadline {deadline}s, rendering without it")
+        return default
+    except Exception as e:
+        outcome = "error"
+        logger.warning(f"Fragment {fragment} of page {page} failed, rendering without it: {e}")
+        return default
+    finally:
+        FRAGMENT_LATENCY.labels(page=page, fragment=fragment, outcome=outcome).observe(time.perf_counter() - started)
+
+
+async def fetch_required_fragment(page: str, fragment: str, awaitable: Awaitable[T]) -> T:
+    """Получает обязательный фрагмент: ошибка пробрасывается, время пишется в метрику."""
+    started = time.perf_counter()
+    outcome = "ok"
+    try:
+        return await awaitable
+    except Exception:
+        outcome = "error"
+        raise
+    finally:
+        FRAGMENT_LATENCY.labels(page=page, fragment=fragment, outcome=outcome).observe(time.perf_counter() - started)
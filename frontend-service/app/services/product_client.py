@@ -1,18 +1,52 @@
-import httpx
 from app.config import settings
+from app.services.category_cache import category_cache
+from shared import get_logger
 from shared.constants import HttpTimeout
+from shared.http_client import get_http_client
 
+logger = get_logger(__name__)
 
-async def get_products_count() -> int:
-    """Получает общее количество продуктов через product-service"""
-    async with httpx.AsyncClient() as client:
+
+async def get_category_names(category_ids: set[int]) -> dict[int, str]:
+    """
+    Возвращает названия категорий {category_id: name}.
+
+    Берёт их из кэша, а отсутствующие запрашивает одним вызовом
+    /categories/by_ids. Ошибка product-service не ломает страницу:
+    для незагруженных категорий название будет пустым.
+    """
+    names, missing_ids = category_cache.get_many(category_ids)
+    if not missing_ids:
+        return names
+
+    client = get_http_client(settings.PRODUCT_SERVICE_URL)
+    try:
         response = await client.get(
-            f"{settings.PRODUCT_SERVICE_URL}/products/count",
+            f"{settings.PRODUCT_SERVICE_URL}/categories/by_ids",
+            params={"ids": sorted(missing_ids)},
             timeout=HttpTimeout.DEFAULT.value,
         )
         response.raise_for_status()
-        payload = response.json()
-        return int(payload.get("total", 0))
+    except Exception as e:
+        logger.warning(f"Failed to fetch categories {sorted(missing_ids)}: {e}")
+        return names
+
+    fetched = {category_id: "" for category_id in missing_ids}
+    fetched.update({category["id"]: category.get("name", "") for category in response.json()})
+    category_cache.put_many(fetched)
+    return {**names, **fetched}
+
+
+async def get_products_count() -> int:
+    """Получает общее количество продуктов через product-service"""
+    client = get_http_client(settings.PRODUCT_SERVICE_URL)
+    response = await client.get(
+        f"{settings.PRODUCT_SERVICE_URL}/products/count",
+        timeout=HttpTimeout.DEFAULT.value,
+    )
+    response.raise_for_status()
+    payload = response.json()
+    return int(payload.get("total", 0))
 
 
 async def get_all_products(
@@ -22,65 +56,42 @@ async def get_all_products(
     order: str = "DESC",
 ) -> list[dict]:
     """Получает продукты через product-service (с пагинацией)"""
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"{settings.PRODUCT_SERVICE_URL}/products/",
-            params={"page": page, "per_page": per_page, "order": order},
-            timeout=HttpTimeout.DEFAULT.value
-        )
-        response.raise_for_status()
-        products = response.json()
+    client = get_http_client(settings.PRODUCT_SERVICE_URL)
+    response = await client.get(
+        f"{settings.PRODUCT_SERVICE_URL}/products/",
+        params={"page": page, "per_page": per_page, "order": order},
+        timeout=HttpTimeout.DEFAULT.value
+    )
+    response.raise_for_status()
+    products = response.json()
         
-        # Получаем категории для всех продуктов
-        category_ids = {p.get("category_id") for p in products if p.get("category_id")}
-        categories_map = {}
-        
-        for category_id in category_ids:
-            try:
-                category_response = await client.get(
-                    f"{settings.PRODUCT_SERVICE_URL}/categories/{category_id}",
-                    timeout=HttpTimeout.DEFAULT.value
-                )
-                if category_response.status_code == 200:
-                    category = category_response.json()
-                    categories_map[category_id] = category.get("name", "")
-            except Exception:
-                pass
-        
-        # Добавляем category_name к каждому продукту
-        for product in products:
-            category_id = product.get("category_id")
-            product["category_name"] = categories_map.get(category_id, "")
-        
-        return products
+    # Названия категорий берём из кэша, недостающие - одним запросом
+    category_ids = {p.get("category_id") for p in products if p.get("category_id")}
+    categories_map = await get_category_names(category_ids)
+
+    # Добавляем category_name к каждому продукту
+    for product in products:
+        category_id = product.get("category_id")
+        product["category_name"] = categories_map.get(category_id, "")
+
+    return products
 
 
 async def get_product(product_id: int) -> dict:
     """Получает продукт по ID через product-service"""
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"{settings.PRODUCT_SERVICE_URL}/products/{product_id}",
-            timeout=HttpTimeout.DEFAULT.value
-        )
-        response.raise_for_status()
-        product = response.json()
+    client = get_http_client(settings.PRODUCT_SERVICE_URL)
+    response = await client.get(
+        f"{settings.PRODUCT_SERVICE_URL}/products/{product_id}",
+        timeout=HttpTimeout.DEFAULT.value
+    )
+    response.raise_for_status()
+    product = response.json()
         
-        # Получаем категорию если есть category_id
-        if product.get("category_id"):
-            try:
-                category_response = await client.get(
-                    f"{settings.PRODUCT_SERVICE_URL}/categories/{product['category_id']}",
-                    timeout=HttpTimeout.DEFAULT.value
-                )
-                if category_response.status_code == 200:
-                    category = category_response.json()
-                    product["category_name"] = category.get("name", "")
-            except Exception:
-                product["category_name"] = ""
-        else:
-            product["category_name"] = ""
-
-        return product
+    category_id = product.get("category_id")
+    categories_map = await get_category_names({category_id} if category_id else set())
+    product["category_name"] = categories_map.get(category_id, "")
+
+    return product
 
 
 async def get_products_by_ids(product_ids: list[int]) -> list[dict]:
@@ -88,12 +99,12 @@ async def get_products_by_ids(product_ids: list[int]) -> list[dict]:
     if not product_ids:
         return []
     ids = product_ids[:50]
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"{settings.PRODUCT_SERVICE_URL}/products/by_ids",
-            params={"ids": ids},
-            timeout=HttpTimeout.DEFAULT.value,
-        )
-        response.raise_for_status()
-        return response.json()
+    client = get_http_client(settings.PRODUCT_SERVICE_URL)
+    response = await client.get(
+        f"{settings.PRODUCT_SERVICE_URL}/products/by_ids",
+        params={"ids": ids},
+        timeout=HttpTimeout.DEFAULT.value,
+    )
+    response.raise_for_status()
+    return response.json()
 
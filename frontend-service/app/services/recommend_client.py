@@ -3,36 +3,12 @@ import httpx
 from app.config import settings
 from shared.constants import HttpTimeout
 from shared import get_logger
+from shared.http_client import get_http_client
 
 
 logger = get_logger(__name__)
 
 
-def build_query_from_product(product: dict) -> str:
-    """Формирует текстовый запрос для recommendations-service на основе данных товара"""
-    name = str(product.get("name") or "").strip()
-    description = str(product.get("description") or "").strip()
-    category_name = str(product.get("category_name") or "").strip()
-    features = product.get("features") or {}
-
-    features_text = " ".join(f"{k} {v}" for k, v in features.items()) if isinstance(features, dict) else ""
-    if len(description) > 400:
-        description = description[:400] + "…"
-
-    parts: list[str] = []
-    if name:
-        parts.append(f"Похожие товары на: {name}")
-    if category_name:
-        parts.append(f"категория: {category_name}")
-    if description:
-        parts.append(description)
-    if features_text:
-        parts.append(features_text)
-
-    query = " ".join(parts).strip()
-    return query or f"Похожие товары на продукт с id={product.get('product_id')}"
-
-
 def build_query_from_products(products: list[dict]) -> str:
     """Склеивает запросы по нескольким товарам"""
     parts: list[str] = []
@@ -48,23 +24,21 @@ def build_query_from_products(products: list[dict]) -> str:
     return " ".join(parts).strip() or "товары"
 
 
-async def get_recommendations_for_product(product: dict, limit: int = 4) -> list[dict]:
-    """Запрашивает похожие товары в recommendations-service по данным текущего товара
+async def get_recommendations_for_product(product_id: int, limit: int = 4) -> list[dict]:
+    """Запрашивает похожие товары в recommendations-service по id текущего товара
 
+    Сервис отдаёт предрасчитанный список соседей, поэтому запрос не зависит от данных товара.
     В случае ошибок отдаёт пустой список, чтобы не ломать страницу товара
     """
-    query = build_query_from_product(product)
-    product_id = product.get("product_id")
-
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{settings.RECOMMENDATIONS_SERVICE_URL}/recommend",
-                json={"query": query, "limit": limit + 1},
-                timeout=HttpTimeout.RECOMMENDATIONS.value,
-            )
-            response.raise_for_status()
-            items: list[dict] = response.json()
+        client = get_http_client(settings.RECOMMENDATIONS_SERVICE_URL)
+        response = await client.get(
+            f"{settings.RECOMMENDATIONS_SERVICE_URL}/recommend/similar/{product_id}",
+            params={"limit": limit},
+            timeout=HttpTimeout.RECOMMENDATIONS.value,
+        )
+        response.raise_for_status()
+        items: list[dict] = response.json()
     except httpx.TimeoutException as e:
         logger.warning(
             "Timeout while requesting recommendations for product %s from %s: %s",
@@ -90,10 +64,6 @@ async def get_recommendations_for_product(product: dict, limit: int = 4) -> list
         )
         return []
 
-    # Фильтруем сам товар из рекомендаций, если он попал в выдачу
-    if product_id is not None:
-        items = [item for item in items if item.get("product_id") != product_id]
-
     return items[:limit]
 
 
@@ -118,19 +88,18 @@ async def get_recommendations_for_session(
         basis_titles,
         len(query),
     )
-    exclude = exclude_product_ids or set()
-    # Запрашиваем с запасом, чтобы после исключения осталось limit
-    request_limit = min(limit + len(exclude) + 4, 50)
+    # Исключение применяется фильтром внутри поиска, поэтому запас под него не нужен
+    exclude_ids = sorted(exclude_product_ids or set())
 
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{settings.RECOMMENDATIONS_SERVICE_URL}/recommend",
-                json={"query": query, "limit": request_limit},
-                timeout=HttpTimeout.RECOMMENDATIONS.value,
-            )
-            response.raise_for_status()
-            items: list[dict] = response.json()
+        client = get_http_client(settings.RECOMMENDATIONS_SERVICE_URL)
+        response = await client.post(
+            f"{settings.RECOMMENDATIONS_SERVICE_URL}/recommend",
+            json={"query": query, "limit": limit, "exclude_ids": exclude_ids},
+            timeout=HttpTimeout.RECOMMENDATIONS.value,
+        )
+        response.raise_for_status()
+        items: list[dict] = response.json()
     except httpx.TimeoutException as e:
         logger.warning(
             "Timeout while requesting session recommendations from %s: %s",
@@ -153,6 +122,5 @@ async def get_recommendations_for_session(
         )
         return []
 
-    items = [item for item in items if item.get("product_id") not in exclude]
     return items[:limit]
 
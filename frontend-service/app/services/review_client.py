@@ -2,6 +2,7 @@ import httpx
 from app.config import settings
 from shared.constants import HttpTimeout
 from shared import get_logger
+from shared.http_client import get_http_client
 
 logger = get_logger(__name__)
 
@@ -13,15 +14,15 @@ async def get_reviews(product_id: int) -> list[dict]:
     а просто возвращаем пустой список.
     """
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{settings.REVIEW_SERVICE_URL}/reviews/{product_id}",
-                timeout=HttpTimeout.DEFAULT.value,
-            )
-            response.raise_for_status()
-            reviews = response.json()
-            logger.debug(f"Получено {len(reviews)} отзывов для продукта {product_id}")
-            return reviews
+        client = get_http_client(settings.REVIEW_SERVICE_URL)
+        response = await client.get(
+            f"{settings.REVIEW_SERVICE_URL}/reviews/{product_id}",
+            timeout=HttpTimeout.DEFAULT.value,
+        )
+        response.raise_for_status()
+        reviews = response.json()
+        logger.debug(f"Получено {len(reviews)} отзывов для продукта {product_id}")
+        return reviews
     except httpx.TimeoutException as e:
         logger.warning(
             f"Таймаут при получении отзывов для продукта {product_id} "
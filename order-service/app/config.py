@@ -21,6 +21,9 @@ class Settings(BaseSettings):
 
     LOG_LEVEL: str = "INFO"
 
+    # Общий бюджет времени на все проверки заказа
+    ORDER_VALIDATION_TIMEOUT_SECONDS: float = 5.0
+
     @property
     def DATABASE_URL(self):
         """Возвращает URL БД в зависимости от MODE"""
@@ -33,3 +33,8 @@ class UserIsNotPresentException(ShopException):
     status_code = status.HTTP_404_NOT_FOUND
     detail = "Пользователь не найден"
 
+
+
+class OrderValidationTimeout(ShopException):
+    status_code = status.HTTP_504_GATEWAY_TIMEOUT
+    detail = "Не удалось проверить заказ: сервисы не ответили вовремя"
@@ -6,6 +6,7 @@ from prometheus_fastapi_instrumentator import Instrumentator
 
 
 from shared import setup_logging
+from shared.http_client import close_http_clients
 
 from app.config import settings
 from app.api.orders import router as router_orders
@@ -21,6 +22,7 @@ async def lifespan(app: FastAPI):
     yield
 
     await broker.stop()
+    await close_http_clients()
 
 
 sentry_sdk.init(
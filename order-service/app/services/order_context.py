@@ -0,0 +1,51 @@
+import asyncio
+from dataclasses import dataclass
+
+from shared import get_logger
+
+from app.schemas.orders import SCartItemForOrder
+from app.services.cart_client import get_cart_items
+from app.services.user_client import UserSnapshot, get_user_snapshot
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class OrderCreationContext:
+    """
+    Данные для создания заказа, полученные из других сервисов один раз.
+
+    Передаётся в валидацию, подготовку заказа и уведомление вместо того,
+    чтобы каждый шаг заново запрашивал пользователя и корзину.
+    """
+    user_id: int
+    user: UserSnapshot | None  # None, если пользователя нет в user-service
+    cart_items: list[SCartItemForOrder]
+    total_cost: int
+
+
+async def load_order_context(user_id: int) -> OrderCreationContext:
+    """
+    Параллельно запрашивает пользователя (user-service) и корзину (cart-service).
+
+    Args:
+        user_id: ID пользователя
+
+    Returns:
+        Контекст создания заказа
+    """
+    user, cart_items_raw = await asyncio.gather(
+        get_user_snapshot(user_id),
+        get_cart_items(user_id),
+    )
+    total_cost = sum(item.get("total_cost", 0) for item in cart_items_raw)
+    logger.debug(f"Order context loaded for user {user_id}: {len(cart_items_raw)} items, total cost: {total_cost}")
+    return OrderCreationContext(
+        user_id=user_id,
+        user=user,
+        cart_items=[
+            SCartItemForOrder(product_id=item["product_id"], quantity=item["quantity"])
+            for item in cart_items_raw
+        ],
+        total_cost=total_cost,
+    )
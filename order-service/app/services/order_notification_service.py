@@ -1,21 +1,19 @@
 from app.domain.entities.orders import OrderItem
 from app.messaging.publisher import publish_order_confirmation
-from app.services.user_client import get_user_email
 
 
 class OrderNotificationService:
     def __init__(self):
         pass
 
-    async def send_order_confirmation(self, user_id: int, order: OrderItem) -> None:
+    async def send_order_confirmation(self, user_email: str | None, order: OrderItem) -> None:
         """
         Отправляет уведомление о создании заказа через Kafka.
 
         Args:
-            user_id: ID пользователя
+            user_email: Email пользователя (из снимка пользователя); без него уведомление не отправляется
             order: Доменная сущность заказа
         """
-        user_email = await get_user_email(user_id)
         if user_email:
             order_dict = {
                 "order_id": order.order_id,
@@ -6,13 +6,13 @@ from app.constants import OrderStatus
 from app.domain.entities.orders import OrderItem
 from app.domain.interfaces.orders_repo import IOrdersRepository
 from app.domain.interfaces.unit_of_work import IUnitOfWorkFactory
-from app.schemas.orders import SCartItemForOrder, SUserOrder, SOrderItemWithImage
-from app.services.cart_client import get_cart_items, get_cart_total
+from app.schemas.orders import SUserOrder, SOrderItemWithImage
+from app.services.order_context import OrderCreationContext, load_order_context
 from app.services.product_client import get_product
 from app.services.order_validator import OrderValidator
 from app.services.payment_service import PaymentService
 from app.services.order_notification_service import OrderNotificationService
-from app.services.user_client import get_user_delivery_address
+from app.services.user_client import get_user_snapshot
 from app.messaging.publisher import (
     publish_order_created,
     publish_order_processing_started,
@@ -42,23 +42,15 @@ class OrderService:
     async def create_order(self, user_id: int) -> OrderItem:
         logger.info(f"Creating order for user {user_id}")
         try:
-            async with self.uow_factory.create():
-                # Получаем корзину из cart-service
-                cart_items_raw = await get_cart_items(user_id)
-                total_cost = await get_cart_total(user_id)
-                logger.debug(f"Cart retrieved: {len(cart_items_raw)} items, total cost: {total_cost}")
-                
-                # Преобразуем в SCartItemForOrder для валидатора
-                cart_items = [
-                    SCartItemForOrder(product_id=item["product_id"], quantity=item["quantity"])
-                    for item in cart_items_raw
-                ]
+            # Пользователь и корзина запрашиваются один раз, параллельно, и дальше берутся из контекста
+            context = await load_order_context(user_id)
 
-                await self.validator.validate_order(user_id, cart_items, total_cost)
+            async with self.uow_factory.create():
+                await self.validator.validate_order(context)
                 logger.debug(f"Order validation passed for user {user_id}")
 
                 # Создаем заказ со статусом Pending
-                order_data = await self._prepare_order_data(user_id, cart_items, total_cost)
+                order_data = self._prepare_order_data(context)
                 order = await self.orders_repository.create_order(order_data)
                 logger.info(f"Order {order.order_id} created successfully")
 
@@ -126,7 +118,8 @@ class OrderService:
                 logger.info(f"Order confirmed event published for order {order_id}")
                 
                 # Отправляем уведомление
-                await self.notification.send_order_confirmation(order.user_id, order)
+                user = await get_user_snapshot(order.user_id)
+                await self.notification.send_order_confirmation(user.email if user else None, order)
                 logger.info(f"Order {order_id} confirmed successfully")
         except Exception as e:
             logger.error(f"Error confirming order {order_id}: {e}", exc_info=True)
@@ -165,26 +158,19 @@ class OrderService:
             logger.error(f"Error failing order {order_id}: {e}", exc_info=True)
             raise
 
-    async def _prepare_order_data(
-        self,
-        user_id: int,
-        cart_items: list[SCartItemForOrder],
-        total_cost: int
-    ) -> OrderItem:
-
-        delivery_address = await get_user_delivery_address(user_id)
+    def _prepare_order_data(self, context: OrderCreationContext) -> OrderItem:
         order_items = [
             {"product_id": item.product_id, "quantity": item.quantity}
-            for item in cart_items
+            for item in context.cart_items
         ]
 
         return OrderItem(
-            user_id=user_id,
+            user_id=context.user_id,
             created_at=datetime.now().date(),
             status=OrderStatus.PENDING,
-            delivery_address=delivery_address or "",
+            delivery_address=(context.user.delivery_address if context.user else None) or "",
             order_items=order_items,
-            total_cost=total_cost
+            total_cost=context.total_cost
         )
 
     async def get_user_orders(self, user_id: int) -> list[SUserOrder]:
@@ -1,17 +1,34 @@
+import asyncio
+import time
+from collections.abc import Awaitable
+
+from prometheus_client import Histogram
+
+from app.config import settings
 from app.exceptions import (
     CannotMakeOrderWithoutAddress,
     CannotMakeOrderWithoutItems,
     NotEnoughProductsInStock,
+    OrderValidationTimeout,
+    ShopException,
     UserIsNotPresentException,
     NotEnoughBalanceToMakeOrder
 )
 from app.schemas.orders import SCartItemForOrder
-from app.services.user_client import get_user_delivery_address, get_user_balance
+from app.services.order_context import OrderCreationContext
 from app.services.product_client import get_stock_by_ids
+from app.services.user_client import UserSnapshot
 from shared import get_logger
 
 logger = get_logger(__name__)
 
+ORDER_VALIDATION_RULE_SECONDS = Histogram(
+    "order_validation_rule_seconds",
+    "Время проверки заказа по каждому правилу (ok, violation, error, cancelled)",
+    labelnames=["rule", "outcome"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
 
 class OrderValidator:
     """
@@ -19,19 +36,20 @@ class OrderValidator:
 
     Проверяет наличие адреса доставки, товаров в корзине,
     достаточность остатков на складе и баланса пользователя.
+    Пользователь и корзина берутся из контекста создания заказа,
+    в user-service и cart-service валидатор не ходит.
+
+    Правила независимы и выполняются параллельно под общим дедлайном
+    ORDER_VALIDATION_TIMEOUT_SECONDS: время проверки - самое долгое правило,
+    а не их сумма. Первое нарушение отменяет остальные проверки.
     """
 
-    async def validate_order(self,
-                             user_id: int,
-                             cart_items: list[SCartItemForOrder],
-                             total_cost: int) -> None:
+    async def validate_order(self, context: OrderCreationContext) -> None:
         """
         Валидирует все условия для создания заказа.
 
         Args:
-            user_id: ID пользователя
-            cart_items: Список товаров в корзине
-            total_cost: Общая стоимость заказа
+            context: Контекст создания заказа (пользователь, корзина, стоимость)
 
         Raises:
             CannotMakeOrderWithoutAddress: Если у пользователя нет адреса доставки
@@ -39,30 +57,70 @@ class OrderValidator:
             NotEnoughProductsInStock: Если недостаточно товаров на складе
             UserIsNotPresentException: Если пользователь не найден
             NotEnoughBalanceToMakeOrder: Если недостаточно баланса
+            OrderValidationTimeout: Если проверки не уложились в дедлайн
         """
-        logger.debug(f"Validating order for user {user_id}, items: {len(cart_items)}, total: {total_cost}")
+        user_id = context.user_id
+        logger.debug(
+            f"Validating order for user {user_id}, items: {len(context.cart_items)}, total: {context.total_cost}"
+        )
+        rules = {
+            "address": self._validate_address(user_id, context.user),
+            "cart": self._validate_cart_not_empty(context.cart_items),
+            "stock": self._validate_stock(context.cart_items),
+            "balance": self._validate_balance(user_id, context.user, context.total_cost),
+        }
         try:
-            await self._validate_address(user_id)
-            await self._validate_cart_not_empty(cart_items)
-            await self._validate_stock(cart_items)
-            await self._validate_balance(user_id, total_cost)
+            async with asyncio.timeout(settings.ORDER_VALIDATION_TIMEOUT_SECONDS):
+                async with asyncio.TaskGroup() as group:
+                    for rule, check in rules.items():
+                        group.create_task(self._run_rule(rule, check))
             logger.debug(f"Order validation passed for user {user_id}")
-        except Exception as e:
-            logger.warning(f"Order validation failed for user {user_id}: {e}")
+        except TimeoutError:
+            logger.warning(
+                f"Order validation for user {user_id} exceeded {settings.ORDER_VALIDATION_TIMEOUT_SECONDS}s"
+            )
+            raise OrderValidationTimeout
+        except ExceptionGroup as group_error:
+            # TaskGroup отменяет остальные правила при первой ошибке; отдаём её вызывающему
+            error = group_error.exceptions[0]
+            logger.warning(f"Order validation failed for user {user_id}: {error}")
+            raise error
+
+    @staticmethod
+    async def _run_rule(rule: str, check: Awaitable[None]) -> None:
+        """Выполняет правило и пишет его время в метрику с исходом проверки."""
+        started = time.perf_counter()
+        outcome = "ok"
+        try:
+            await check
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        except ShopException:
+            outcome = "violation"
             raise
+        except Exception:
+            outcome = "error"
+            raise
+        finally:
+            ORDER_VALIDATION_RULE_SECONDS.labels(rule=rule, outcome=outcome).observe(time.perf_counter() - started)
 
-    async def _validate_address(self, user_id: int) -> None:
+    async def _validate_address(self, user_id: int, user: UserSnapshot | None) -> None:
         """
         Проверяет наличие адреса доставки у пользователя.
 
         Args:
             user_id: ID пользователя
+            user: Снимок пользователя (None, если пользователь не найден)
 
         Raises:
+            UserIsNotPresentException: Если пользователь не найден
             CannotMakeOrderWithoutAddress: Если адрес не указан
         """
-        delivery_address = await get_user_delivery_address(user_id)
-        if not delivery_address:
+        if user is None:
+            logger.warning(f"User {user_id} not found")
+            raise UserIsNotPresentException
+        if not user.delivery_address:
             logger.warning(f"User {user_id} has no delivery address")
             raise CannotMakeOrderWithoutAddress
         logger.debug(f"Address validation passed for user {user_id}")
@@ -92,6 +150,9 @@ class OrderValidator:
         Raises:
             NotEnoughProductsInStock: Если недостаточно товаров на складе
         """
+        if not cart_items:
+            # Пустую корзину отклоняет правило cart, в product-service идти незачем
+            return
         product_ids = [item.product_id for item in cart_items]
         stock_items = await get_stock_by_ids(product_ids)
         logger.debug(f"Stock data retrieved for {len(product_ids)} products")
@@ -103,19 +164,20 @@ class OrderValidator:
                 raise NotEnoughProductsInStock
         logger.debug("Stock validation passed")
 
-    async def _validate_balance(self, user_id: int, total_cost: int) -> None:
+    async def _validate_balance(self, user_id: int, user: UserSnapshot | None, total_cost: int) -> None:
         """
         Проверяет достаточность баланса пользователя для оплаты заказа.
 
         Args:
             user_id: ID пользователя
+            user: Снимок пользователя (None, если пользователь не найден)
             total_cost: Общая стоимость заказа
 
         Raises:
             UserIsNotPresentException: Если пользователь не найден
             NotEnoughBalanceToMakeOrder: Если недостаточно баланса
         """
-        current_balance = await get_user_balance(user_id)
+        current_balance = user.balance if user is not None else None
         if current_balance is None:
             logger.warning(f"User {user_id} not found")
             raise UserIsNotPresentException
@@ -1,6 +1,7 @@
 import httpx
 from app.config import settings
 from shared.constants import HttpTimeout
+from shared.http_client import get_http_client
 
 
 async def get_product(product_id: int) -> dict:
@@ -16,13 +17,13 @@ async def get_product(product_id: int) -> dict:
     Raises:
         httpx.HTTPStatusError: Если продукт не найден или сервис недоступен
     """
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"{settings.PRODUCT_SERVICE_URL}/products/{product_id}",
-            timeout=HttpTimeout.DEFAULT.value
-        )
-        response.raise_for_status()
-        return response.json()
+    client = get_http_client(settings.PRODUCT_SERVICE_URL)
+    response = await client.get(
+        f"{settings.PRODUCT_SERVICE_URL}/products/{product_id}",
+        timeout=HttpTimeout.DEFAULT.value
+    )
+    response.raise_for_status()
+    return response.json()
 
 
 async def get_stock_by_ids(product_ids: list[int]) -> dict[int, int]:
@@ -38,15 +39,15 @@ async def get_stock_by_ids(product_ids: list[int]) -> dict[int, int]:
     Raises:
         httpx.HTTPStatusError: Если сервис недоступен
     """
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f"{settings.PRODUCT_SERVICE_URL}/products/stock/batch",
-            json=product_ids,
-            timeout=HttpTimeout.DEFAULT.value
-        )
-        response.raise_for_status()
-        data = response.json()
-        return {int(k): int(v) for k, v in data.items()}
+    client = get_http_client(settings.PRODUCT_SERVICE_URL)
+    response = await client.post(
+        f"{settings.PRODUCT_SERVICE_URL}/products/stock/batch",
+        json=product_ids,
+        timeout=HttpTimeout.DEFAULT.value
+    )
+    response.raise_for_status()
+    data = response.json()
+    return {int(k): int(v) for k, v in data.items()}
 
 
 async def decrease_stock(product_id: int, quantity: int) -> None:
@@ -60,11 +61,11 @@ async def decrease_stock(product_id: int, quantity: int) -> None:
     Raises:
         httpx.HTTPStatusError: Если сервис недоступен
     """
-    async with httpx.AsyncClient() as client:
-        response = await client.patch(
-            f"{settings.PRODUCT_SERVICE_URL}/products/{product_id}/stock",
-            json={"quantity": -quantity},
-            timeout=HttpTimeout.DEFAULT.value
-        )
-        response.raise_for_status()
+    client = get_http_client(settings.PRODUCT_SERVICE_URL)
+    response = await client.patch(
+        f"{settings.PRODUCT_SERVICE_URL}/products/{product_id}/stock",
+        json={"quantity": -quantity},
+        timeout=HttpTimeout.DEFAULT.value
+    )
+    response.raise_for_status()
 
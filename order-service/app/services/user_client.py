@@ -1,54 +1,49 @@
+from dataclasses import dataclass
+
 import httpx
 from app.config import settings
 from shared.constants import HttpTimeout, HttpHeaders
+from shared.http_client import get_http_client
 
 
-async def get_user_delivery_address(user_id: int) -> str | None:
-    """
-    Получает адрес доставки пользователя из user-service.
-
-    Args:
-        user_id: ID пользователя
-
-    Returns:
-        Адрес доставки или None
-
-    Raises:
-        httpx.HTTPStatusError: Если сервис недоступен
-    """
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"{settings.USER_SERVICE_URL}/users/me",
-            headers={HttpHeaders.X_USER_ID.value: str(user_id)},
-            timeout=HttpTimeout.DEFAULT.value
-        )
-        response.raise_for_status()
-        user_data = response.json()
-        return user_data.get("delivery_address")
+@dataclass
+class UserSnapshot:
+    """Данные пользователя из user-service на момент запроса."""
+    user_id: int
+    email: str | None
+    delivery_address: str | None
+    balance: int | None
 
 
-async def get_user_balance(user_id: int) -> int | None:
+async def get_user_snapshot(user_id: int) -> UserSnapshot | None:
     """
-    Получает баланс пользователя из user-service.
+    Получает пользователя из user-service одним запросом /users/me.
 
     Args:
         user_id: ID пользователя
 
     Returns:
-        Баланс пользователя или None
+        Снимок пользователя или None, если пользователь не найден
 
     Raises:
         httpx.HTTPStatusError: Если сервис недоступен
     """
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"{settings.USER_SERVICE_URL}/users/me",
-            headers={HttpHeaders.X_USER_ID.value: str(user_id)},
-            timeout=HttpTimeout.DEFAULT.value
-        )
-        response.raise_for_status()
-        user_data = response.json()
-        return user_data.get("balance")
+    client = get_http_client(settings.USER_SERVICE_URL)
+    response = await client.get(
+        f"{settings.USER_SERVICE_URL}/users/me",
+        headers={HttpHeaders.X_USER_ID.value: str(user_id)},
+        timeout=HttpTimeout.DEFAULT.value
+    )
+    if response.status_code == httpx.codes.NOT_FOUND:
+        return None
+    response.raise_for_status()
+    user_data = response.json()
+    return UserSnapshot(
+        user_id=user_id,
+        email=user_data.get("email"),
+        delivery_address=user_data.get("delivery_address"),
+        balance=user_data.get("balance"),
+    )
 
 
 async def decrease_user_balance(user_id: int, amount: int) -> None:
@@ -62,36 +57,11 @@ async def decrease_user_balance(user_id: int, amount: int) -> None:
     Raises:
         httpx.HTTPStatusError: Если сервис недоступен
     """
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f"{settings.USER_SERVICE_URL}/users/balance/decrease",
-            headers={HttpHeaders.X_USER_ID.value: str(user_id)},
-            json={"amount": amount},
-            timeout=HttpTimeout.DEFAULT.value
-        )
-        response.raise_for_status()
-
-
-async def get_user_email(user_id: int) -> str | None:
-    """
-    Получает email пользователя из user-service.
-
-    Args:
-        user_id: ID пользователя
-
-    Returns:
-        Email пользователя или None
-
-    Raises:
-        httpx.HTTPStatusError: Если сервис недоступен
-    """
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"{settings.USER_SERVICE_URL}/users/me",
-            headers={HttpHeaders.X_USER_ID.value: str(user_id)},
-            timeout=HttpTimeout.DEFAULT.value
-        )
-        response.raise_for_status()
-        user_data = response.json()
-        return user_data.get("email")
-
+    client = get_http_client(settings.USER_SERVICE_URL)
+    response = await client.post(
+        f"{settings.USER_SERVICE_URL}/users/balance/decrease",
+        headers={HttpHeaders.X_USER_ID.value: str(user_id)},
+        json={"amount": amount},
+        timeout=HttpTimeout.DEFAULT.value
+    )
+    response.raise_for_status()
@@ -5,6 +5,7 @@ from datetime import date
 from app.constants import OrderStatus
 from app.models.orders import Orders
 from app.repositories.orders_repository import OrdersRepository
+from app.services.user_client import UserSnapshot
 
 
 
@@ -22,32 +23,25 @@ class TestCreateOrder:
         user_id = 1
         
         mocker.patch(
-            'app.services.order_service.get_cart_items',
+            'app.services.order_context.get_cart_items',
             new=mocker.AsyncMock(return_value=[
                 {"product_id": 1, "quantity": 2, "total_cost": 2000},
                 {"product_id": 2, "quantity": 1, "total_cost": 1500}
             ])
         )
         mocker.patch(
-            'app.services.order_service.get_cart_total',
-            new=mocker.AsyncMock(return_value=3500)
-        )
-        mocker.patch(
-            'app.services.order_service.get_user_delivery_address',
-            new=mocker.AsyncMock(return_value="Test Address")
-        )
-        mocker.patch(
-            'app.services.order_validator.get_user_delivery_address',
-            new=mocker.AsyncMock(return_value="Test Address")
+            'app.services.order_context.get_user_snapshot',
+            new=mocker.AsyncMock(return_value=UserSnapshot(
+                user_id=user_id,
+                email="test@example.com",
+                delivery_address="Test Address",
+                balance=5000
+            ))
         )
         mocker.patch(
             'app.services.order_validator.get_stock_by_ids',
             new=mocker.AsyncMock(return_value={1: 10, 2: 5})
         )
-        mocker.patch(
-            'app.services.order_validator.get_user_balance',
-            new=mocker.AsyncMock(return_value=5000)
-        )
         mocker.patch(
             'app.services.order_service.publish_order_created',
             new=mocker.AsyncMock(return_value=None),
@@ -4,7 +4,7 @@ from datetime import date
 from app.constants import OrderStatus
 from app.domain.entities.orders import OrderItem
 from app.services.order_service import OrderService
-from app.schemas.orders import SCartItemForOrder
+from app.services.user_client import UserSnapshot
 
 
 
@@ -70,20 +70,21 @@ class TestOrderServiceCreateOrder:
         """Тест успешного создания заказа"""
         user_id = 1
         
-        mocker.patch(
-            'app.services.order_service.get_cart_items',
-            return_value=[
-                {"product_id": 1, "quantity": 2},
-                {"product_id": 2, "quantity": 1}
-            ]
-        )
-        mocker.patch(
-            'app.services.order_service.get_cart_total',
-            return_value=3500
+        mock_get_cart_items = mocker.patch(
+            'app.services.order_context.get_cart_items',
+            new=mocker.AsyncMock(return_value=[
+                {"product_id": 1, "quantity": 2, "total_cost": 2000},
+                {"product_id": 2, "quantity": 1, "total_cost": 1500}
+            ])
         )
-        mocker.patch(
-            'app.services.order_service.get_user_delivery_address',
-            return_value="Test Address"
+        mock_get_user_snapshot = mocker.patch(
+            'app.services.order_context.get_user_snapshot',
+            new=mocker.AsyncMock(return_value=UserSnapshot(
+                user_id=user_id,
+                email="test@example.com",
+                delivery_address="Test Address",
+                balance=5000
+            ))
         )
         mocker.patch(
             'app.services.order_service.publish_order_created',
@@ -116,6 +117,15 @@ class TestOrderServiceCreateOrder:
         
         mock_validator.validate_order.assert_called_once()
         mock_repository.create_order.assert_called_once()
+        # Пользователь и корзина запрошены по одному разу и переданы дальше через контекст
+        mock_get_cart_items.assert_awaited_once_with(user_id)
+        mock_get_user_snapshot.assert_awaited_once_with(user_id)
+        context = mock_validator.validate_order.call_args.args[0]
+        assert context.total_cost == 3500
+        assert [item.product_id for item in context.cart_items] == [1, 2]
+        order_data = mock_repository.create_order.call_args.args[0]
+        assert order_data.delivery_address == "Test Address"
+        assert order_data.total_cost == 3500
         mock_uow_factory.create.assert_called_once()
         mock_uow.__aenter__.assert_called_once()
         mock_uow.__aexit__.assert_called_once()
@@ -315,12 +325,21 @@ class TestOrderServiceConfirmOrder:
             'app.services.order_service.publish_order_confirmed',
             return_value=None
         )
+        mocker.patch(
+            'app.services.order_service.get_user_snapshot',
+            new=mocker.AsyncMock(return_value=UserSnapshot(
+                user_id=user_id,
+                email="test@example.com",
+                delivery_address="Test Address",
+                balance=5000
+            ))
+        )
         
         await order_service.confirm_order(order_id)
         
         mock_repository.get_order_by_id.assert_called()
         mock_repository.update_order_status.assert_called_once_with(order_id, OrderStatus.CONFIRMED)
-        mock_notification_service.send_order_confirmation.assert_called_once()
+        mock_notification_service.send_order_confirmation.assert_called_once_with("test@example.com", confirmed_order)
         mock_uow_factory.create.assert_called_once()
     
     @pytest.mark.asyncio
@@ -1,16 +1,34 @@
+import asyncio
+
 import pytest
 
+from app.services.order_context import OrderCreationContext
 from app.services.order_validator import OrderValidator
+from app.services.user_client import UserSnapshot
 from app.schemas.orders import SCartItemForOrder
 from app.exceptions import (
     CannotMakeOrderWithoutAddress,
     CannotMakeOrderWithoutItems,
     NotEnoughProductsInStock,
     UserIsNotPresentException,
-    NotEnoughBalanceToMakeOrder
+    NotEnoughBalanceToMakeOrder,
+    OrderValidationTimeout
 )
 
 
+def make_user(delivery_address: str | None = "Test Address", balance: int | None = 5000) -> UserSnapshot:
+    return UserSnapshot(user_id=1, email="test@example.com", delivery_address=delivery_address, balance=balance)
+
+
+def make_context(
+    user_id: int,
+    user: UserSnapshot | None,
+    cart_items: list[SCartItemForOrder],
+    total_cost: int
+) -> OrderCreationContext:
+    return OrderCreationContext(user_id=user_id, user=user, cart_items=cart_items, total_cost=total_cost)
+
+
 class TestOrderValidatorValidateOrder:
     """Тесты для метода validate_order OrderValidator"""
     
@@ -32,21 +50,13 @@ class TestOrderValidatorValidateOrder:
         ]
         total_cost = 3500
         
-        mocker.patch(
-            'app.services.order_validator.get_user_delivery_address',
-            new=mocker.AsyncMock(return_value="Test Address")
-        )
         mocker.patch(
             'app.services.order_validator.get_stock_by_ids',
             new=mocker.AsyncMock(return_value={1: 10, 2: 5})
         )
-        mocker.patch(
-            'app.services.order_validator.get_user_balance',
-            new=mocker.AsyncMock(return_value=5000)
-        )
         
         # Не должно быть исключений
-        await validator.validate_order(user_id, cart_items, total_cost)
+        await validator.validate_order(make_context(user_id, make_user(), cart_items, total_cost))
     
     @pytest.mark.asyncio
     async def test_validate_order_no_address(
@@ -59,13 +69,8 @@ class TestOrderValidatorValidateOrder:
         cart_items = [SCartItemForOrder(product_id=1, quantity=1)]
         total_cost = 1000
         
-        mocker.patch(
-            'app.services.order_validator.get_user_delivery_address',
-            new=mocker.AsyncMock(return_value=None)
-        )
-        
         with pytest.raises(CannotMakeOrderWithoutAddress):
-            await validator.validate_order(user_id, cart_items, total_cost)
+            await validator.validate_order(make_context(user_id, make_user(delivery_address=None), cart_items, total_cost))
     
     @pytest.mark.asyncio
     async def test_validate_order_empty_cart(
@@ -78,13 +83,8 @@ class TestOrderValidatorValidateOrder:
         cart_items = []
         total_cost = 0
         
-        mocker.patch(
-            'app.services.order_validator.get_user_delivery_address',
-            new=mocker.AsyncMock(return_value="Test Address")
-        )
-        
         with pytest.raises(CannotMakeOrderWithoutItems):
-            await validator.validate_order(user_id, cart_items, total_cost)
+            await validator.validate_order(make_context(user_id, make_user(), cart_items, total_cost))
     
     @pytest.mark.asyncio
     async def test_validate_order_insufficient_stock(
@@ -99,17 +99,13 @@ class TestOrderValidatorValidateOrder:
         ]
         total_cost = 5000
         
-        mocker.patch(
-            'app.services.order_validator.get_user_delivery_address',
-            new=mocker.AsyncMock(return_value="Test Address")
-        )
         mocker.patch(
             'app.services.order_validator.get_stock_by_ids',
             new=mocker.AsyncMock(return_value={1: 5})  # Доступно только 5, запрашивается 10
         )
         
         with pytest.raises(NotEnoughProductsInStock):
-            await validator.validate_order(user_id, cart_items, total_cost)
+            await validator.validate_order(make_context(user_id, make_user(), cart_items, total_cost))
     
     @pytest.mark.asyncio
     async def test_validate_order_user_not_found(
@@ -122,21 +118,13 @@ class TestOrderValidatorValidateOrder:
         cart_items = [SCartItemForOrder(product_id=1, quantity=1)]
         total_cost = 1000
         
-        mocker.patch(
-            'app.services.order_validator.get_user_delivery_address',
-            new=mocker.AsyncMock(return_value="Test Address")
-        )
         mocker.patch(
             'app.services.order_validator.get_stock_by_ids',
             new=mocker.AsyncMock(return_value={1: 10})
         )
-        mocker.patch(
-            'app.services.order_validator.get_user_balance',
-            new=mocker.AsyncMock(return_value=None)  # Пользователь не найден
-        )
         
         with pytest.raises(UserIsNotPresentException):
-            await validator.validate_order(user_id, cart_items, total_cost)
+            await validator.validate_order(make_context(user_id, None, cart_items, total_cost))
     
     @pytest.mark.asyncio
     async def test_validate_order_insufficient_balance(
@@ -149,21 +137,72 @@ class TestOrderValidatorValidateOrder:
         cart_items = [SCartItemForOrder(product_id=1, quantity=1)]
         total_cost = 5000
         
-        mocker.patch(
-            'app.services.order_validator.get_user_delivery_address',
-            new=mocker.AsyncMock(return_value="Test Address")
-        )
         mocker.patch(
             'app.services.order_validator.get_stock_by_ids',
             new=mocker.AsyncMock(return_value={1: 10})
         )
+        
+        with pytest.raises(NotEnoughBalanceToMakeOrder):
+            await validator.validate_order(make_context(user_id, make_user(balance=3000), cart_items, total_cost))
+
+    
+    @pytest.mark.asyncio
+    async def test_validate_order_violation_cancels_pending_rules(
+        self,
+        validator: OrderValidator,
+        mocker
+    ):
+        """Тест: нарушение одного правила сразу прерывает проверку и отменяет медленные правила"""
+        user_id = 1
+        cart_items = [SCartItemForOrder(product_id=1, quantity=1)]
+        total_cost = 5000
+        stock_cancelled = asyncio.Event()
+        
+        async def slow_stock(product_ids):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                stock_cancelled.set()
+                raise
+            return {1: 10}
+        
         mocker.patch(
-            'app.services.order_validator.get_user_balance',
-            new=mocker.AsyncMock(return_value=3000)  # Баланс меньше стоимости
+            'app.services.order_validator.get_stock_by_ids',
+            new=slow_stock
         )
         
         with pytest.raises(NotEnoughBalanceToMakeOrder):
-            await validator.validate_order(user_id, cart_items, total_cost)
+            await asyncio.wait_for(
+                validator.validate_order(make_context(user_id, make_user(balance=3000), cart_items, total_cost)),
+                timeout=1
+            )
+        assert stock_cancelled.is_set()
+    
+    @pytest.mark.asyncio
+    async def test_validate_order_deadline_exceeded(
+        self,
+        validator: OrderValidator,
+        mocker
+    ):
+        """Тест: проверки, не уложившиеся в общий дедлайн, завершаются OrderValidationTimeout"""
+        user_id = 1
+        cart_items = [SCartItemForOrder(product_id=1, quantity=1)]
+        total_cost = 1000
+        
+        async def hanging_stock(product_ids):
+            await asyncio.sleep(10)
+        
+        mocker.patch(
+            'app.services.order_validator.get_stock_by_ids',
+            new=hanging_stock
+        )
+        mocker.patch(
+            'app.services.order_validator.settings.ORDER_VALIDATION_TIMEOUT_SECONDS',
+            0.05
+        )
+        
+        with pytest.raises(OrderValidationTimeout):
+            await validator.validate_order(make_context(user_id, make_user(), cart_items, total_cost))
 
 
 class TestOrderValidatorValidateAddress:
@@ -182,13 +221,8 @@ class TestOrderValidatorValidateAddress:
         """Тест успешной проверки адреса"""
         user_id = 1
         
-        mocker.patch(
-            'app.services.order_validator.get_user_delivery_address',
-            new=mocker.AsyncMock(return_value="Test Address")
-        )
-        
         # Не должно быть исключений
-        await validator._validate_address(user_id)
+        await validator._validate_address(user_id, make_user())
     
     @pytest.mark.asyncio
     async def test_validate_address_empty(
@@ -199,13 +233,8 @@ class TestOrderValidatorValidateAddress:
         """Тест проверки адреса при его отсутствии"""
         user_id = 1
         
-        mocker.patch(
-            'app.services.order_validator.get_user_delivery_address',
-            new=mocker.AsyncMock(return_value="")
-        )
-        
         with pytest.raises(CannotMakeOrderWithoutAddress):
-            await validator._validate_address(user_id)
+            await validator._validate_address(user_id, make_user(delivery_address=""))
     
     @pytest.mark.asyncio
     async def test_validate_address_none(
@@ -216,13 +245,19 @@ class TestOrderValidatorValidateAddress:
         """Тест проверки адреса при None"""
         user_id = 1
         
-        mocker.patch(
-            'app.services.order_validator.get_user_delivery_address',
-            new=mocker.AsyncMock(return_value=None)
-        )
-        
         with pytest.raises(CannotMakeOrderWithoutAddress):
-            await validator._validate_address(user_id)
+            await validator._validate_address(user_id, make_user(delivery_address=None))
+    
+    @pytest.mark.asyncio
+    async def test_validate_address_user_not_found(
+        self,
+        validator: OrderValidator
+    ):
+        """Тест проверки адреса при отсутствии пользователя"""
+        user_id = 1
+        
+        with pytest.raises(UserIsNotPresentException):
+            await validator._validate_address(user_id, None)
 
 
 class TestOrderValidatorValidateCart:
@@ -379,13 +414,8 @@ class TestOrderValidatorValidateBalance:
         user_id = 1
         total_cost = 1000
         
-        mocker.patch(
-            'app.services.order_validator.get_user_balance',
-            new=mocker.AsyncMock(return_value=5000)
-        )
-        
         # Не должно быть исключений
-        await validator._validate_balance(user_id, total_cost)
+        await validator._validate_balance(user_id, make_user(), total_cost)
     
     @pytest.mark.asyncio
     async def test_validate_balance_exact_match(
@@ -397,13 +427,8 @@ class TestOrderValidatorValidateBalance:
         user_id = 1
         total_cost = 1000
         
-        mocker.patch(
-            'app.services.order_validator.get_user_balance',
-            new=mocker.AsyncMock(return_value=1000)
-        )
-        
         # Не должно быть исключений (равенство допустимо)
-        await validator._validate_balance(user_id, total_cost)
+        await validator._validate_balance(user_id, make_user(balance=1000), total_cost)
     
     @pytest.mark.asyncio
     async def test_validate_balance_insufficient(
@@ -415,13 +440,8 @@ class TestOrderValidatorValidateBalance:
         user_id = 1
         total_cost = 5000
         
-        mocker.patch(
-            'app.services.order_validator.get_user_balance',
-            new=mocker.AsyncMock(return_value=3000)
-        )
-        
         with pytest.raises(NotEnoughBalanceToMakeOrder):
-            await validator._validate_balance(user_id, total_cost)
+            await validator._validate_balance(user_id, make_user(balance=3000), total_cost)
     
     @pytest.mark.asyncio
     async def test_validate_balance_user_not_found(
@@ -433,10 +453,5 @@ class TestOrderValidatorValidateBalance:
         user_id = 1
         total_cost = 1000
         
-        mocker.patch(
-            'app.services.order_validator.get_user_balance',
-            new=mocker.AsyncMock(return_value=None)
-        )
-        
         with pytest.raises(UserIsNotPresentException):
-            await validator._validate_balance(user_id, total_cost)
+            await validator._validate_balance(user_id, None, total_cost)
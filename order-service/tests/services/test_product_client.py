@@ -23,12 +23,10 @@ class TestProductClientGetProduct:
         mock_response.raise_for_status = mocker.Mock()
         
         mock_client = mocker.AsyncMock()
-        mock_client.__aenter__ = mocker.AsyncMock(return_value=mock_client)
-        mock_client.__aexit__ = mocker.AsyncMock(return_value=None)
         mock_client.get = mocker.AsyncMock(return_value=mock_response)
         
         mocker.patch(
-            'app.services.product_client.httpx.AsyncClient',
+            'app.services.product_client.get_http_client',
             return_value=mock_client
         )
         
@@ -54,12 +52,10 @@ class TestProductClientGetProduct:
         )
         
         mock_client = mocker.AsyncMock()
-        mock_client.__aenter__ = mocker.AsyncMock(return_value=mock_client)
-        mock_client.__aexit__ = mocker.AsyncMock(return_value=None)
         mock_client.get = mocker.AsyncMock(return_value=mock_response)
         
         mocker.patch(
-            'app.services.product_client.httpx.AsyncClient',
+            'app.services.product_client.get_http_client',
             return_value=mock_client
         )
         
@@ -81,12 +77,10 @@ class TestProductClientGetProduct:
         )
         
         mock_client = mocker.AsyncMock()
-        mock_client.__aenter__ = mocker.AsyncMock(return_value=mock_client)
-        mock_client.__aexit__ = mocker.AsyncMock(return_value=None)
         mock_client.get = mocker.AsyncMock(return_value=mock_response)
         
         mocker.patch(
-            'app.services.product_client.httpx.AsyncClient',
+            'app.services.product_client.get_http_client',
             return_value=mock_client
         )
         
@@ -108,12 +102,10 @@ class TestProductClientGetStockByIds:
         mock_response.raise_for_status = mocker.Mock()
         
         mock_client = mocker.AsyncMock()
-        mock_client.__aenter__ = mocker.AsyncMock(return_value=mock_client)
-        mock_client.__aexit__ = mocker.AsyncMock(return_value=None)
         mock_client.post = mocker.AsyncMock(return_value=mock_response)
         
         mocker.patch(
-            'app.services.product_client.httpx.AsyncClient',
+            'app.services.product_client.get_http_client',
             return_value=mock_client
         )
         
@@ -135,12 +127,10 @@ class TestProductClientGetStockByIds:
         mock_response.raise_for_status = mocker.Mock()
         
         mock_client = mocker.AsyncMock()
-        mock_client.__aenter__ = mocker.AsyncMock(return_value=mock_client)
-        mock_client.__aexit__ = mocker.AsyncMock(return_value=None)
         mock_client.post = mocker.AsyncMock(return_value=mock_response)
         
         mocker.patch(
-            'app.services.product_client.httpx.AsyncClient',
+            'app.services.product_client.get_http_client',
             return_value=mock_client
         )
         
@@ -159,12 +149,10 @@ class TestProductClientGetStockByIds:
         mock_response.raise_for_status = mocker.Mock()
         
         mock_client = mocker.AsyncMock()
-        mock_client.__aenter__ = mocker.AsyncMock(return_value=mock_client)
-        mock_client.__aexit__ = mocker.AsyncMock(return_value=None)
         mock_client.post = mocker.AsyncMock(return_value=mock_response)
         
         mocker.patch(
-            'app.services.product_client.httpx.AsyncClient',
+            'app.services.product_client.get_http_client',
             return_value=mock_client
         )
         
@@ -187,12 +175,10 @@ class TestProductClientGetStockByIds:
         )
         
         mock_client = mocker.AsyncMock()
-        mock_client.__aenter__ = mocker.AsyncMock(return_value=mock_client)
-        mock_client.__aexit__ = mocker.AsyncMock(return_value=None)
         mock_client.post = mocker.AsyncMock(return_value=mock_response)
         
         mocker.patch(
-            'app.services.product_client.httpx.AsyncClient',
+            'app.services.product_client.get_http_client',
             return_value=mock_client
         )
         
@@ -213,12 +199,10 @@ class TestProductClientDecreaseStock:
         mock_response.raise_for_status = mocker.Mock()
         
         mock_client = mocker.AsyncMock()
-        mock_client.__aenter__ = mocker.AsyncMock(return_value=mock_client)
-        mock_client.__aexit__ = mocker.AsyncMock(return_value=None)
         mock_client.patch = mocker.AsyncMock(return_value=mock_response)
         
         mocker.patch(
-            'app.services.product_client.httpx.AsyncClient',
+            'app.services.product_client.get_http_client',
             return_value=mock_client
         )
         
@@ -239,12 +223,10 @@ class TestProductClientDecreaseStock:
         mock_response.raise_for_status = mocker.Mock()
         
         mock_client = mocker.AsyncMock()
-        mock_client.__aenter__ = mocker.AsyncMock(return_value=mock_client)
-        mock_client.__aexit__ = mocker.AsyncMock(return_value=None)
         mock_client.patch = mocker.AsyncMock(return_value=mock_response)
         
         mocker.patch(
-            'app.services.product_client.httpx.AsyncClient',
+            'app.services.product_client.get_http_client',
             return_value=mock_client
         )
         
@@ -264,12 +246,10 @@ class TestProductClientDecreaseStock:
         mock_response.raise_for_status = mocker.Mock()
         
         mock_client = mocker.AsyncMock()
-        mock_client.__aenter__ = mocker.AsyncMock(return_value=mock_client)
-        mock_client.__aexit__ = mocker.AsyncMock(return_value=None)
         mock_client.patch = mocker.AsyncMock(return_value=mock_response)
         
         mocker.patch(
-            'app.services.product_client.httpx.AsyncClient',
+            'app.services.product_client.get_http_client',
             return_value=mock_client
         )
         
@@ -295,12 +275,10 @@ class TestProductClientDecreaseStock:
         )
         
         mock_client = mocker.AsyncMock()
-        mock_client.__aenter__ = mocker.AsyncMock(return_value=mock_client)
-        mock_client.__aexit__ = mocker.AsyncMock(return_value=None)
         mock_client.patch = mocker.AsyncMock(return_value=mock_response)
         
         mocker.patch(
-            'app.services.product_client.httpx.AsyncClient',
+            'app.services.product_client.get_http_client',
             return_value=mock_client
         )
         
@@ -323,12 +301,10 @@ class TestProductClientDecreaseStock:
         )
         
         mock_client = mocker.AsyncMock()
-        mock_client.__aenter__ = mocker.AsyncMock(return_value=mock_client)
-        mock_client.__aexit__ = mocker.AsyncMock(return_value=None)
         mock_client.patch = mocker.AsyncMock(return_value=mock_response)
         
         mocker.patch(
-            'app.services.product_client.httpx.AsyncClient',
+            'app.services.product_client.get_http_client',
             return_value=mock_client
         )
         
@@ -1,4 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.exc import IntegrityError
 from shared import get_logger
 
@@ -30,6 +32,22 @@ async def get_all_categories(
         raise
 
 
+@router.get("/by_ids", response_model=list[SCategoryResponse])
+async def get_categories_by_ids(
+        ids: Annotated[list[int], Query(description="Список ID категорий")],
+        category_service: CategoryService = Depends(get_categories_service)
+):
+    """Получить категории по списку ID одним запросом."""
+    logger.info(f"GET /categories/by_ids request for {len(ids)} categories")
+    try:
+        categories = await category_service.get_categories_by_ids(ids)
+        logger.info(f"Returned {len(categories)} categories")
+        return categories
+    except Exception as e:
+        logger.error(f"Error fetching categories by ids by API: {e}", exc_info=True)
+        raise
+
+
 @router.get("/{category_id}", response_model=SCategoryResponse)
 async def get_category_by_id(
         category_id: int,
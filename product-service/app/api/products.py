@@ -1,8 +1,16 @@
+from collections.abc import AsyncIterator
 from fastapi import APIRouter, Depends, Body, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from typing import Annotated
 from shared import get_logger
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from app.dependencies import get_products_service, pagination_params
+from app.dependencies import (
+    export_products_service,
+    get_products_service,
+    get_session_maker,
+    pagination_params,
+)
 from app.schemas.products import Pagination, SProducts, SProductsCount, SProductCreate, SProductUpdate
 from app.schemas.stock import StockUpdateRequest
 from app.services.product_service import ProductService
@@ -50,6 +58,22 @@ async def get_products_by_ids(
     return await product_service.get_products_by_ids(ids[:50])
 
 
+@router.get("/export")
+async def export_products(
+        after_id: Annotated[int, Query(ge=0, description="Выгрузка товаров с product_id больше этого")] = 0,
+        session_maker: async_sessionmaker[AsyncSession] = Depends(get_session_maker),
+) -> StreamingResponse:
+    """Выгружает весь каталог одним потоком NDJSON (товар на строку) по возрастанию product_id"""
+    logger.info(f"GET /products/export request, after_id: {after_id}")
+
+    async def ndjson_lines() -> AsyncIterator[bytes]:
+        async with export_products_service(session_maker) as product_service:
+            async for product in product_service.export_products(after_id):
+                yield product.model_dump_json().encode() + b"\n"
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+
 @router.get("/{product_id}", response_model=SProducts)
 async def get_product(
         product_id: int,
@@ -19,6 +19,14 @@ class Settings(BaseSettings):
 
     LOG_LEVEL: str = "INFO"
 
+    # GET /products/export: размер keyset-страницы и порция чтения из серверного курсора
+    PRODUCTS_EXPORT_PAGE_SIZE: int = 5000
+    PRODUCTS_EXPORT_FETCH_SIZE: int = 500
+
+    # Read-through кэш товаров и их количества в процессе
+    PRODUCT_CACHE_SIZE: int = 10000
+    PRODUCT_CACHE_TTL_SECONDS: float = 30.0
+
     @property
     def DATABASE_URL(self):
         """Возвращает URL БД в зависимости от MODE"""
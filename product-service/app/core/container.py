@@ -1,10 +1,12 @@
 from dependency_injector import containers, providers
+from shared.idempotency import IdempotencyKeyStore
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.unit_of_work_factory import UnitOfWorkFactory
+from app.models.idempotency import IdempotencyKey
 from app.repositories.products_repository import ProductsRepository
 from app.repositories.categories_repository import CategoriesRepository
-from app.repositories.idempotency_key_repository import IdempotencyKeyRepository
+from app.services.product_cache import product_cache
 from app.services.product_service import ProductService
 from app.services.category_service import CategoryService
 from app.services.stock_reservation_service import StockReservationService
@@ -25,9 +27,10 @@ class Container(containers.DeclarativeContainer):
         db=db
     )
 
-    idempotency_key_repository = providers.Factory(
-        IdempotencyKeyRepository,
-        db=db
+    idempotency_keys = providers.Factory(
+        IdempotencyKeyStore,
+        db=db,
+        model=IdempotencyKey
     )
 
     uow_factory = providers.Factory(
@@ -35,15 +38,19 @@ class Container(containers.DeclarativeContainer):
         session=db
     )
 
+    # Один кэш товаров на процесс, общий для всех экземпляров контейнера (API и Kafka-обработчики)
+    product_cache = providers.Object(product_cache)
+
     product_service = providers.Factory(
         ProductService,
         products_repository=products_repository,
-        uow_factory=uow_factory
+        uow_factory=uow_factory,
+        product_cache=product_cache,
     )
 
     stock_reservation_service = providers.Factory(
         StockReservationService,
-        idempotency_key_repository=idempotency_key_repository,
+        idempotency_keys=idempotency_keys,
         products_repository=products_repository,
     )
 
@@ -1,5 +1,8 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastapi import Depends, Query
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 
 from app.core.container import Container
@@ -47,6 +50,33 @@ async def get_categories_service(
         return container.category_service()
 
 
+def get_session_maker() -> async_sessionmaker[AsyncSession]:
+    """Фабрика сессий для обработчиков, которым сессия нужна дольше, чем живёт get_db"""
+    return async_session_maker
+
+
+@asynccontextmanager
+async def export_products_service(
+        session_maker: async_sessionmaker[AsyncSession],
+) -> AsyncIterator[ProductService]:
+    """
+    Сервис товаров с собственной сессией на время стриминга ответа.
+
+    Сессия из get_db закрывается до отправки тела StreamingResponse,
+    поэтому экспорт открывает свою и держит её, пока идёт выгрузка.
+
+    Args:
+        session_maker: Фабрика сессий базы данных
+
+    Yields:
+        ProductService: Сервис для работы с товарами
+    """
+    async with session_maker() as session:
+        with container.db.override(session):
+            product_service = container.product_service()
+        yield product_service
+
+
 def pagination_params(
         page: int = Query(default=1, ge=1, le=50),
         per_page: int = Query(default=10, ge=1, le=50),
@@ -10,6 +10,9 @@ class ICategoriesRepository(Protocol):
     async def get_by_id(self, category_id: int) -> CategoryItem | None:
         ...
 
+    async def get_by_ids(self, category_ids: list[int]) -> list[CategoryItem]:
+        ...
+
     async def get_by_name(self, name: str) -> CategoryItem | None:
         ...
 
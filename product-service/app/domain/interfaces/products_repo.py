@@ -1,3 +1,4 @@
+from collections.abc import AsyncIterator
 from typing import Protocol
 
 from app.domain.entities.product import ProductItem
@@ -21,6 +22,14 @@ class IProductsRepository(Protocol):
     async def count_products(self) -> int:
         ...
 
+    def stream_products(
+            self,
+            after_id: int,
+            page_size: int,
+            fetch_size: int,
+    ) -> AsyncIterator[ProductItem]:
+        ...
+
     async def get_product_by_id(self, product_id: int) -> ProductItem | None:
         ...
 
@@ -33,6 +42,12 @@ class IProductsRepository(Protocol):
     async def decrease_stock(self, product_id: int, quantity: int) -> None:
         ...
 
+    async def lock_stock(self, product_ids: list[int]) -> dict[int, int]:
+        ...
+
+    async def reserve_stock(self, quantities: dict[int, int]) -> dict[int, int]:
+        ...
+
     async def increase_stock(self, product_id: int, quantity: int) -> None:
         ...
 
@@ -1,25 +1,36 @@
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 
 import sentry_sdk
 from fastapi import FastAPI
 from prometheus_fastapi_instrumentator import Instrumentator
 
 from shared import setup_logging
+from shared.idempotency import run_idempotency_key_maintenance
 
 from app.config import settings
+from app.database import async_session_maker
 from app.api.products import router as router_products
 from app.api.categories import router as router_categories
 from app.messaging.broker import broker
 from app.messaging.handlers import router as kafka_router
+from app.models.idempotency import IdempotencyKey
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     broker.include_router(kafka_router)
     await broker.start()
+    # Удаление ключей идемпотентности старше окна хранения и метрики таблицы
+    idempotency_maintenance = asyncio.create_task(
+        run_idempotency_key_maintenance(async_session_maker, IdempotencyKey)
+    )
 
     yield
 
+    idempotency_maintenance.cancel()
+    with suppress(asyncio.CancelledError):
+        await idempotency_maintenance
     await broker.stop()
 
 
@@ -3,13 +3,33 @@ from shared import ReserveStockResult, get_logger
 
 from app.database import async_session_maker
 from app.core.container import Container
-from app.messaging.publisher import publish_stock_reserved, publish_stock_reservation_failed
+from app.messaging.publisher import (
+    publish_product_stock_changed,
+    publish_stock_reserved,
+    publish_stock_reservation_failed,
+)
+from app.services.product_cache import product_cache
 
 router = KafkaRouter()
 container = Container()
 logger = get_logger(__name__)
 
 
+async def notify_stock_changed(product_ids: list[int]) -> None:
+    """
+    Сбрасывает товары с изменившимся остатком в кэше этого процесса
+    и рассылает product_stock_changed остальным процессам сервиса.
+
+    Ошибка публикации не откатывает операцию саги: остальные процессы
+    увидят новый остаток по истечении TTL кэша.
+    """
+    product_cache.invalidate(product_ids)
+    try:
+        await publish_product_stock_changed(product_ids)
+    except Exception as e:
+        logger.warning(f"Failed to publish product_stock_changed for products {product_ids}: {e}")
+
+
 @router.subscriber("order_processing_started", group_id="product_service")
 async def handle_order_processing_started(event: dict) -> None:
     """Обработчик события начала обработки заказа — резервирует товары."""
@@ -31,6 +51,8 @@ async def handle_order_processing_started(event: dict) -> None:
                 service = container.stock_reservation_service()
                 result, error_msg = await service.reserve_stock(order_id, order_items)
             await session.commit()
+            if result == ReserveStockResult.SUCCESS:
+                await notify_stock_changed([item["product_id"] for item in order_items if item.get("product_id")])
 
             if result in (ReserveStockResult.ALREADY_DONE, ReserveStockResult.SUCCESS):
                 await publish_stock_reserved(order_id)
@@ -72,6 +94,7 @@ async def handle_stock_increase(request: dict) -> None:
                 recorded = await service.record_stock_compensation(order_id, product_id, quantity)
             await session.commit()
             if recorded:
+                await notify_stock_changed([product_id])
                 logger.info(
                     f"Stock increase (compensation) completed for order {order_id}, product {product_id}"
                 )
@@ -83,3 +106,29 @@ async def handle_stock_increase(request: dict) -> None:
             exc_info=True,
         )
         raise
+
+
+# Без group_id: каждый процесс сервиса держит свой кэш товаров и должен получить событие сам
+@router.subscriber("product_updated", "product_removed")
+async def handle_product_changed(event: dict) -> None:
+    """Сбрасывает товар в кэше процесса после изменения или удаления в любом экземпляре сервиса."""
+    product_id = (event.get("product") or {}).get("product_id")
+    if product_id is None:
+        return
+    product_cache.invalidate([product_id])
+    product_cache.invalidate_count()
+
+
+# Без group_id: остаток меняется в одном процессе, а сбросить кэш должен каждый
+@router.subscriber("product_stock_changed")
+async def handle_product_stock_changed(event: dict) -> None:
+    """Сбрасывает в кэше процесса товары, остаток которых изменила сага."""
+    product_ids = event.get("product_ids") or []
+    if product_ids:
+        product_cache.invalidate(product_ids)
+
+
+@router.subscriber("product_created")
+async def handle_product_created(event: dict) -> None:
+    """Сбрасывает закэшированное количество товаров после добавления товара."""
+    product_cache.invalidate_count()
@@ -1,3 +1,4 @@
+from app.domain.entities.categories import CategoryItem
 from app.domain.entities.product import ProductItem
 from app.schemas.products import ProductPayload
 from app.messaging.broker import broker
@@ -46,4 +47,20 @@ async def publish_product_removed(product: ProductItem) -> None:
 
 async def publish_product_updated(product: ProductItem) -> None:
     payload = get_product_payload_for_qdrant(product)
-    await broker.publish(message={"product": payload}, topic="product_updated")
\ No newline at end of file
+    await broker.publish(message={"product": payload}, topic="product_updated")
+
+
+async def publish_product_stock_changed(product_ids: list[int]) -> None:
+    """Публикует изменение остатков товаров сагой, чтобы каждый процесс сервиса сбросил их в кэше."""
+    await broker.publish(
+        message={"product_ids": product_ids},
+        topic="product_stock_changed",
+    )
+
+
+async def publish_category_updated(category: CategoryItem) -> None:
+    """Публикует событие изменения категории для инвалидации кэшей."""
+    await broker.publish(
+        message={"category_id": category.id, "name": category.name},
+        topic="category_updated",
+    )
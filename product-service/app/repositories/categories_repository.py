@@ -60,6 +60,25 @@ class CategoriesRepository:
         
         return self.mapper.to_entity(orm_model)
 
+    async def get_by_ids(self, category_ids: list[int]) -> list[CategoryItem]:
+        """
+        Получает категории по списку ID одним запросом.
+
+        Args:
+            category_ids: Список ID категорий
+
+        Returns:
+            Список найденных domain entities категорий (порядок не гарантируется)
+        """
+        if not category_ids:
+            return []
+        result = await self.db.execute(
+            select(Categories).where(Categories.id.in_(category_ids))
+        )
+        orm_models = list(result.scalars().all())
+
+        return [self.mapper.to_entity(orm_model) for orm_model in orm_models]
+
     async def get_by_name(self, name: str) -> CategoryItem | None:
         """
         Получает категорию по названию.
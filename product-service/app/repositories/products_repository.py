@@ -1,4 +1,6 @@
-from sqlalchemy import select, update, asc, desc, func, insert, delete
+from collections.abc import AsyncIterator
+
+from sqlalchemy import Integer, column, select, update, asc, desc, func, insert, delete, values
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.schemas.products import SortEnum, Pagination, SProductCreate, SProductUpdate
@@ -58,6 +60,65 @@ class ProductsRepository:
             .values(product_quantity=Products.product_quantity - quantity)
         )
 
+    async def lock_stock(self, product_ids: list[int]) -> dict[int, int]:
+        """
+        Блокирует строки товаров (FOR UPDATE) и возвращает их остатки.
+
+        Строки блокируются по возрастанию product_id: конкурирующие резервации
+        захватывают одни и те же товары в одном порядке и не ловят взаимоблокировку.
+        Блокировка держится до конца транзакции.
+
+        Args:
+            product_ids: Список ID товаров
+
+        Returns:
+            Словарь вида {product_id: количество}; несуществующих товаров в нём нет
+        """
+        result = await self.db.execute(
+            select(Products.product_id, Products.product_quantity)
+            .where(Products.product_id.in_(product_ids))
+            .order_by(asc(Products.product_id))
+            .with_for_update()
+        )
+        return {
+            item["product_id"]: item["product_quantity"]
+            for item in result.mappings().all()
+        }
+
+    async def reserve_stock(self, quantities: dict[int, int]) -> dict[int, int]:
+        """
+        Списывает остатки сразу по всем товарам одним условным UPDATE.
+
+        `UPDATE products ... FROM (VALUES ...) WHERE product_quantity >= quantity`:
+        строка, где остатка не хватает, не меняется и не попадает в RETURNING.
+
+        Args:
+            quantities: Словарь вида {product_id: количество для списания}
+
+        Returns:
+            Словарь вида {product_id: остаток после списания} по списанным товарам
+        """
+        requested = values(
+            column("product_id", Integer),
+            column("quantity", Integer),
+            name="requested",
+        ).data(list(quantities.items()))
+        result = await self.db.execute(
+            update(Products)
+            .where(
+                Products.product_id == requested.c.product_id,
+                Products.product_quantity >= requested.c.quantity,
+            )
+            .values(product_quantity=Products.product_quantity - requested.c.quantity)
+            .returning(Products.product_id, Products.product_quantity)
+            # Строки товаров в сессию не загружены - синхронизировать нечего
+            .execution_options(synchronize_session=False)
+        )
+        return {
+            item["product_id"]: item["product_quantity"]
+            for item in result.mappings().all()
+        }
+
     async def increase_stock(self, product_id: int, quantity: int) -> None:
         """
         Увеличивает количество конкретного товара (компенсация).
@@ -140,6 +201,42 @@ class ProductsRepository:
             if orm_model is not None
         ]
 
+    async def stream_products(
+            self,
+            after_id: int,
+            page_size: int,
+            fetch_size: int,
+    ) -> AsyncIterator[ProductItem]:
+        """
+        Отдаёт товары по возрастанию product_id, начиная после after_id.
+
+        Страницы выбираются по ключу (`WHERE product_id > :cursor LIMIT page_size`),
+        поэтому каждая следующая страница стоит столько же, сколько первая.
+        Строки страницы читаются через серверный курсор порциями по fetch_size
+        и в памяти не накапливаются.
+
+        Args:
+            after_id: Последний уже полученный product_id (0 - с начала каталога)
+            page_size: Размер страницы keyset-пагинации
+            fetch_size: Сколько строк забирать из курсора за раз
+        """
+        cursor = after_id
+        while True:
+            result = await self.db.stream_scalars(
+                select(Products)
+                .where(Products.product_id > cursor)
+                .order_by(asc(Products.product_id))
+                .limit(page_size)
+                .execution_options(yield_per=fetch_size)
+            )
+            fetched = 0
+            async for orm_model in result:
+                cursor = orm_model.product_id
+                fetched += 1
+                yield self.mapper.to_entity(orm_model)
+            if fetched < page_size:
+                return
+
     async def add_product(self, product: SProductCreate) -> ProductItem:
         payload = product.model_dump(exclude_none=True)
         result = await self.db.execute(
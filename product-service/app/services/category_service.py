@@ -3,6 +3,7 @@ from shared import get_logger
 from app.domain.entities.categories import CategoryItem
 from app.domain.interfaces.categories_repo import ICategoriesRepository
 from app.domain.interfaces.unit_of_work import IUnitOfWorkFactory
+from app.messaging.publisher import publish_category_updated
 
 logger = get_logger(__name__)
 
@@ -41,6 +42,17 @@ class CategoryService:
             logger.error(f"Error fetching category {category_id}: {e}", exc_info=True)
             raise
 
+    async def get_categories_by_ids(self, category_ids: list[int]) -> list[CategoryItem]:
+        """Получить категории по списку ID."""
+        logger.debug(f"Fetching categories by ids: {category_ids}")
+        try:
+            categories = await self.category_repository.get_by_ids(category_ids)
+            logger.debug(f"Found {len(categories)} of {len(category_ids)} categories")
+            return categories
+        except Exception as e:
+            logger.error(f"Error fetching categories by ids {category_ids}: {e}", exc_info=True)
+            raise
+
     async def get_category_by_name(self, category_name: str) -> CategoryItem | None:
         """Получить категорию по названию."""
         logger.debug(f"Fetching category by name: {category_name}")
@@ -61,10 +73,25 @@ class CategoryService:
         try:
             async with self.uow_factory.create():
                 created = await self.category_repository.create(category)
+            await self._notify_category_updated(created)
             logger.info(f"Category created successfully: {created.name}")
             return created
         except Exception as e:
             logger.error(f"Error creating category '{category.name}': {e}", exc_info=True)
             raise
 
+    async def _notify_category_updated(self, category: CategoryItem) -> None:
+        """
+        Публикует category_updated для сброса кэшей категорий у потребителей.
+
+        Создание - единственное изменение категорий, которое проходит через
+        сервис. Новое изменение (переименование, удаление) должно вызывать этот
+        метод, иначе потребители увидят его только по истечении TTL своих кэшей.
+        Ошибка публикации не откатывает изменение: кэши ограничены TTL.
+        """
+        try:
+            await publish_category_updated(category)
+        except Exception as e:
+            logger.warning(f"Failed to publish category_updated for category {category.id}: {e}")
+
 
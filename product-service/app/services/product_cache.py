@@ -0,0 +1,206 @@
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+
+from prometheus_client import Counter, Gauge
+from shared import get_logger
+
+from app.config import settings
+from app.schemas.products import SProducts
+
+logger = get_logger(__name__)
+
+PRODUCT_CACHE_LOOKUPS = Counter(
+    "product_cache_lookups_total",
+    "Обращения к кэшу товаров по результату (hit, miss, shared - дождались чужой загрузки)",
+    labelnames=["result"],
+)
+PRODUCT_CACHE_SIZE = Gauge(
+    "product_cache_size",
+    "Количество товаров в кэше процесса",
+)
+
+ProductsLoader = Callable[[list[int]], Awaitable[dict[int, SProducts]]]
+
+
+def fail_future(future: asyncio.Future, error: BaseException) -> None:
+    """Передаёт ошибку загрузки ожидающим; при отмене загрузки ожидающие грузят сами"""
+    if isinstance(error, Exception):
+        future.set_exception(error)
+        # Ожидающих может не быть - помечаем исключение как полученное
+        future.exception()
+    else:
+        future.cancel()
+
+
+class ProductCache:
+    """
+    Read-through LRU-кэш товаров (SProducts) и их общего количества в процессе.
+
+    Промахи по одному и тому же товару склеиваются: пока товар грузится из БД,
+    остальные запросы ждут ту же загрузку, а не идут в Postgres сами.
+    Записи сбрасываются сервисом при изменении товара, а в других процессах -
+    по событиям product_updated/product_removed и product_stock_changed
+    (остатки, изменённые сагой); TTL ограничивает устаревание, если событие
+    потерялось.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self._max_size = max_size
+        self._ttl_seconds = ttl_seconds
+        self._products: OrderedDict[int, tuple[SProducts, float]] = OrderedDict()
+        self._loading: dict[int, asyncio.Future] = {}
+        self._count: tuple[int, float] | None = None
+        self._count_loading: asyncio.Future | None = None
+
+    async def get(
+            self,
+            product_id: int,
+            load: Callable[[int], Awaitable[SProducts | None]],
+    ) -> SProducts | None:
+        """
+        Возвращает товар из кэша или загружает его через load.
+
+        Args:
+            product_id: ID товара
+            load: Загрузка одного товара из БД (None, если товара нет)
+
+        Returns:
+            Товар или None, если его нет в БД
+        """
+        async def load_one(product_ids: list[int]) -> dict[int, SProducts]:
+            product = await load(product_ids[0])
+            return {product_ids[0]: product} if product is not None else {}
+
+        found = await self.get_many([product_id], load_one)
+        return found.get(product_id)
+
+    async def get_many(self, product_ids: list[int], load: ProductsLoader) -> dict[int, SProducts]:
+        """
+        Возвращает товары из кэша, догружая отсутствующие одним вызовом load.
+
+        Args:
+            product_ids: ID товаров
+            load: Загрузка товаров по списку ID из БД
+
+        Returns:
+            Словарь {product_id: товар}; товаров, которых нет в БД, в нём нет
+        """
+        now = time.monotonic()
+        found: dict[int, SProducts] = {}
+        waiting: dict[int, asyncio.Future] = {}
+        missing: list[int] = []
+        for product_id in dict.fromkeys(product_ids):
+            cached = self._products.get(product_id)
+            if cached is not None and now < cached[1]:
+                self._products.move_to_end(product_id)
+                found[product_id] = cached[0]
+                PRODUCT_CACHE_LOOKUPS.labels(result="hit").inc()
+            elif product_id in self._loading:
+                waiting[product_id] = self._loading[product_id]
+                PRODUCT_CACHE_LOOKUPS.labels(result="shared").inc()
+            else:
+                missing.append(product_id)
+                PRODUCT_CACHE_LOOKUPS.labels(result="miss").inc()
+
+        if missing:
+            found.update(await self._load(missing, load))
+        for product_id, future in waiting.items():
+            try:
+                product = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # Чужую загрузку отменили - грузим товар сами
+                product = (await self._load([product_id], load)).get(product_id)
+            if product is not None:
+                found[product_id] = product
+        return found
+
+    async def _load(self, product_ids: list[int], load: ProductsLoader) -> dict[int, SProducts]:
+        loop = asyncio.get_running_loop()
+        futures = {product_id: loop.create_future() for product_id in product_ids}
+        self._loading.update(futures)
+        try:
+            loaded = await load(product_ids)
+        except BaseException as e:
+            for product_id, future in futures.items():
+                self._release(product_id, future)
+                fail_future(future, e)
+            raise
+
+        expires_at = time.monotonic() + self._ttl_seconds
+        for product_id, future in futures.items():
+            product = loaded.get(product_id)
+            # Если товар сбросили во время загрузки, прочитанная версия могла устареть - не кэшируем
+            if self._release(product_id, future) and product is not None:
+                self._remember(product_id, product, expires_at)
+            future.set_result(product)
+        return loaded
+
+    def _release(self, product_id: int, future: asyncio.Future) -> bool:
+        """Снимает загрузку товара; False, если её уже сняла инвалидация"""
+        if self._loading.get(product_id) is not future:
+            return False
+        del self._loading[product_id]
+        return True
+
+    def _remember(self, product_id: int, product: SProducts, expires_at: float) -> None:
+        self._products[product_id] = (product, expires_at)
+        self._products.move_to_end(product_id)
+        while len(self._products) > self._max_size:
+            self._products.popitem(last=False)
+        PRODUCT_CACHE_SIZE.set(len(self._products))
+
+    async def get_count(self, load: Callable[[], Awaitable[int]]) -> int:
+        """Общее количество товаров из кэша или через load (одна загрузка на всех ожидающих)"""
+        if self._count is not None and time.monotonic() < self._count[1]:
+            return self._count[0]
+        if self._count_loading is not None:
+            loading = self._count_loading
+            try:
+                return await asyncio.shield(loading)
+            except asyncio.CancelledError:
+                if not loading.cancelled():
+                    raise
+                return await load()
+
+        future = asyncio.get_running_loop().create_future()
+        self._count_loading = future
+        try:
+            total = await load()
+        except BaseException as e:
+            if self._count_loading is future:
+                self._count_loading = None
+            fail_future(future, e)
+            raise
+        if self._count_loading is future:
+            self._count_loading = None
+            self._count = (total, time.monotonic() + self._ttl_seconds)
+        future.set_result(total)
+        return total
+
+    def invalidate(self, product_ids: list[int]) -> None:
+        """Сбрасывает товары; идущие загрузки этих товаров не попадут в кэш"""
+        for product_id in product_ids:
+            self._products.pop(product_id, None)
+            self._loading.pop(product_id, None)
+        PRODUCT_CACHE_SIZE.set(len(self._products))
+        logger.debug(f"Product cache invalidated for {len(product_ids)} products")
+
+    def invalidate_count(self) -> None:
+        self._count = None
+        self._count_loading = None
+
+    def clear(self) -> None:
+        self._products.clear()
+        self._loading.clear()
+        self.invalidate_count()
+        PRODUCT_CACHE_SIZE.set(0)
+
+
+product_cache = ProductCache(
+    max_size=settings.PRODUCT_CACHE_SIZE,
+    ttl_seconds=settings.PRODUCT_CACHE_TTL_SECONDS,
+)
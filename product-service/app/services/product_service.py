@@ -1,10 +1,15 @@
+from collections.abc import AsyncIterator
+
 from shared import get_logger
 
+from app.config import settings
+
 from app.domain.entities.product import ProductItem
 from app.domain.interfaces.products_repo import IProductsRepository
 from app.domain.interfaces.unit_of_work import IUnitOfWorkFactory
 from app.schemas.products import Pagination, SProducts, SProductCreate, SProductUpdate
 from app.exceptions import CannotFindProductWithThisId
+from app.services.product_cache import ProductCache
 from app.messaging.publisher import (
     publish_product_added,
     publish_product_removed,
@@ -19,9 +24,12 @@ class ProductService:
             self,
             products_repository: IProductsRepository,
             uow_factory: IUnitOfWorkFactory,
+            product_cache: ProductCache | None = None,
     ) -> None:
         self.products_repository: IProductsRepository = products_repository
         self.uow_factory: IUnitOfWorkFactory = uow_factory
+        # Без общего кэша процесса - только склейка одновременных загрузок внутри сервиса
+        self.product_cache: ProductCache = product_cache or ProductCache(max_size=0, ttl_seconds=0.0)
 
     async def get_all_products(self, pagination: Pagination) -> list[SProducts]:
         logger.debug("Fetching all products")
@@ -35,22 +43,39 @@ class ProductService:
 
     async def count_products(self) -> int:
         try:
-            return await self.products_repository.count_products()
+            return await self.product_cache.get_count(self.products_repository.count_products)
         except Exception as e:
             logger.error(f"Error counting products: {e}", exc_info=True)
             raise
 
+    async def export_products(self, after_id: int = 0) -> AsyncIterator[SProducts]:
+        """Стримит весь каталог по возрастанию product_id, начиная после after_id"""
+        logger.debug(f"Exporting products after {after_id}")
+        exported = 0
+        try:
+            async for product in self.products_repository.stream_products(
+                    after_id,
+                    settings.PRODUCTS_EXPORT_PAGE_SIZE,
+                    settings.PRODUCTS_EXPORT_FETCH_SIZE,
+            ):
+                exported += 1
+                yield SProducts.model_validate(product)
+        except Exception as e:
+            logger.error(f"Error exporting products after {exported} rows: {e}", exc_info=True)
+            raise
+        logger.info(f"Exported {exported} products")
+
     async def get_product_by_id(self, product_id: int) -> SProducts:
         logger.debug(f"Fetching product {product_id}")
         try:
-            product = await self.products_repository.get_product_by_id(product_id)
+            product = await self.product_cache.get(product_id, self._load_product)
 
             if not product:
                 logger.warning(f"Product {product_id} not found")
                 raise CannotFindProductWithThisId
 
             logger.debug(f"Product {product_id} retrieved successfully")
-            return SProducts.model_validate(product)
+            return product
         except CannotFindProductWithThisId:
             raise
         except Exception as e:
@@ -62,12 +87,20 @@ class ProductService:
         if not product_ids:
             return []
         try:
-            products = await self.products_repository.get_products_by_ids(product_ids)
-            return [SProducts.model_validate(p) for p in products]
+            products = await self.product_cache.get_many(product_ids, self._load_products)
+            return list(products.values())
         except Exception as e:
             logger.error(f"Error fetching products by ids: {e}", exc_info=True)
             raise
 
+    async def _load_product(self, product_id: int) -> SProducts | None:
+        product = await self.products_repository.get_product_by_id(product_id)
+        return SProducts.model_validate(product) if product else None
+
+    async def _load_products(self, product_ids: list[int]) -> dict[int, SProducts]:
+        products = await self.products_repository.get_products_by_ids(product_ids)
+        return {p.product_id: SProducts.model_validate(p) for p in products}
+
     async def get_stock_by_ids(self, product_ids: list[int]) -> dict[int, int]:
         """Получает остатки товаров по списку ID"""
         logger.debug(f"Fetching stock for {len(product_ids)} products")
@@ -85,6 +118,7 @@ class ProductService:
         try:
             async with self.uow_factory.create():
                 await self.products_repository.decrease_stock(product_id, quantity)
+            self.product_cache.invalidate([product_id])
             logger.info(f"Stock decreased successfully for product {product_id}")
         except Exception as e:
             logger.error(f"Error decreasing stock for product {product_id}: {e}", exc_info=True)
@@ -96,6 +130,7 @@ class ProductService:
         try:
             async with self.uow_factory.create():
                 await self.products_repository.increase_stock(product_id, quantity)
+            self.product_cache.invalidate([product_id])
             logger.info(f"Stock increased successfully for product {product_id}")
         except Exception as e:
             logger.error(f"Error increasing stock for product {product_id}: {e}", exc_info=True)
@@ -106,6 +141,7 @@ class ProductService:
         try:
             async with self.uow_factory.create():
                 created = await self.products_repository.add_product(product)
+            self.product_cache.invalidate_count()
             if created:
                 await publish_product_added(created)
             logger.info(f"Added product {product.name} successfully")
@@ -121,6 +157,7 @@ class ProductService:
                 updated = await self.products_repository.update_product(product_id, data)
             if not updated:
                 raise CannotFindProductWithThisId
+            self.product_cache.invalidate([product_id])
             await publish_product_updated(updated)
             logger.info(f"Updated product {product_id} successfully")
             return SProducts.model_validate(updated)
@@ -137,6 +174,8 @@ class ProductService:
                 deleted = await self.products_repository.delete_product(product_id)
             if not deleted:
                 raise CannotFindProductWithThisId
+            self.product_cache.invalidate([product_id])
+            self.product_cache.invalidate_count()
             await publish_product_removed(deleted)
             logger.info(f"Deleted product {product_id} successfully")
         except CannotFindProductWithThisId:
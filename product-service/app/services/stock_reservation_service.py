@@ -1,59 +1,85 @@
 from shared import ReserveStockResult, SagaIdempotencyKey, get_logger
+from shared.idempotency import IdempotencyKeyStore
 
-from app.repositories.idempotency_key_repository import IdempotencyKeyRepository
 from app.repositories.products_repository import ProductsRepository
 
 logger = get_logger(__name__)
 
 
+def format_shortages(shortages: list[tuple[int, int, int | None]]) -> str:
+    """Сообщение о позициях, которые не удалось зарезервировать: (product_id, запрошено, остаток)"""
+    details = ", ".join(
+        f"product {product_id}: not found" if available is None
+        else f"product {product_id}: requested {quantity}, available {available}"
+        for product_id, quantity, available in shortages
+    )
+    return f"Insufficient stock for {details}"
+
+
 class StockReservationService:
     """Сервис резервации остатков и компенсаций в рамках саги."""
 
     def __init__(
         self,
-        idempotency_key_repository: IdempotencyKeyRepository,
+        idempotency_keys: IdempotencyKeyStore,
         products_repository: ProductsRepository,
     ):
-        self.idempotency_key_repository = idempotency_key_repository
+        self.idempotency_keys = idempotency_keys
         self.products_repository = products_repository
 
     async def reserve_stock(
         self, order_id: int, order_items: list[dict]
     ) -> tuple[ReserveStockResult, str | None]:
         """
-        Резервирует остатки по позициям заказа.
+        Резервирует остатки по позициям заказа: всё или ничего.
+
+        Строки товаров блокируются в порядке product_id, остатки списываются
+        одним UPDATE по всем позициям. Если хотя бы одной позиции не хватает,
+        ничего не списывается, а в сообщении перечислены все такие позиции.
 
         Returns: (result, error_message). error_message заполнен при INSUFFICIENT_STOCK.
         """
-        if await self.idempotency_key_repository.exists(
-            SagaIdempotencyKey.ORDER_PROCESSING, str(order_id)
-        ):
-            return ReserveStockResult.ALREADY_DONE, None
-
-        reserved_any = False
+        quantities: dict[int, int] = {}
         for item in order_items:
             product_id = item.get("product_id")
             quantity = item.get("quantity")
             if not product_id or not quantity:
                 continue
-            stock = await self.products_repository.get_stock_by_ids([product_id])
-            available = stock.get(product_id, 0)
-            if available < quantity:
-                return (
-                    ReserveStockResult.INSUFFICIENT_STOCK,
-                    f"Insufficient stock for product {product_id}",
-                )
-            await self.products_repository.decrease_stock(product_id, quantity)
-            reserved_any = True
-
-        if not reserved_any:
+            quantities[product_id] = quantities.get(product_id, 0) + quantity
+
+        if not quantities:
             return (
                 ReserveStockResult.INSUFFICIENT_STOCK,
                 "No valid order items to reserve",
             )
-        await self.idempotency_key_repository.add(
+
+        # Повторная доставка того же заказа ждёт здесь фиксации первой и получает False
+        if not await self.idempotency_keys.claim(
             SagaIdempotencyKey.ORDER_PROCESSING, str(order_id)
-        )
+        ):
+            return ReserveStockResult.ALREADY_DONE, None
+
+        # Строки блокируются до конца транзакции: проверка остатков ниже не устареет до UPDATE
+        stock = await self.products_repository.lock_stock(sorted(quantities))
+        shortages = [
+            (product_id, quantity, stock.get(product_id))
+            for product_id, quantity in sorted(quantities.items())
+            if stock.get(product_id, 0) < quantity
+        ]
+        if shortages:
+            # Заказ не зарезервирован - ключ не должен выдавать повтор за выполненную резервацию
+            await self.idempotency_keys.release(
+                SagaIdempotencyKey.ORDER_PROCESSING, str(order_id)
+            )
+            return ReserveStockResult.INSUFFICIENT_STOCK, format_shortages(shortages)
+
+        reserved = await self.products_repository.reserve_stock(quantities)
+        if len(reserved) != len(quantities):
+            # Под блокировкой не должно случаться; исключение откатывает транзакцию целиком
+            raise RuntimeError(
+                f"Stock reservation for order {order_id} updated {len(reserved)} of {len(quantities)} products"
+            )
+        logger.debug(f"Reserved stock for order {order_id}: {len(reserved)} products")
         return ReserveStockResult.SUCCESS, None
 
     async def record_stock_compensation(
@@ -65,12 +91,9 @@ class StockReservationService:
         Returns: True если операция выполнена, False если уже была выполнена.
         """
         business_key = f"{order_id}:{product_id}"
-        if await self.idempotency_key_repository.exists(
+        if not await self.idempotency_keys.claim(
             SagaIdempotencyKey.COMPENSATION_STOCK, business_key
         ):
             return False
-        await self.idempotency_key_repository.add(
-            SagaIdempotencyKey.COMPENSATION_STOCK, business_key
-        )
         await self.products_repository.increase_stock(product_id, quantity)
         return True
@@ -0,0 +1,25 @@
+"""Index idempotency_keys.created_at for retention pruning
+
+Revision ID: c7d8e9f0a1b2
+Revises: f901b2c3d4e5
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "c7d8e9f0a1b2"
+down_revision: Union[str, None] = "f901b2c3d4e5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_idempotency_keys_created_at", "idempotency_keys", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_idempotency_keys_created_at", table_name="idempotency_keys")
@@ -80,6 +80,32 @@ class TestGetCategoryById:
         assert "not found" in data["detail"].lower()
 
 
+class TestGetCategoriesByIds:
+    """Тесты для получения категорий по списку ID"""
+    
+    @pytest.mark.asyncio
+    async def test_get_categories_by_ids_success(
+        self,
+        async_client: AsyncClient,
+        test_db_session
+    ):
+        """Тест получения нескольких категорий одним запросом"""
+        category1 = Categories(name="Category 1", description="Description 1")
+        category2 = Categories(name="Category 2", description="Description 2")
+        test_db_session.add(category1)
+        test_db_session.add(category2)
+        await test_db_session.flush()
+        
+        response = await async_client.get(
+            "/categories/by_ids",
+            params={"ids": [category1.id, category2.id, 99999]}
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert {cat["id"] for cat in data} == {category1.id, category2.id}
+
+
 class TestGetCategoryByName:
     """Тесты для получения категории по названию"""
     
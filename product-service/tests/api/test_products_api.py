@@ -1,5 +1,11 @@
+import json
+
 import pytest
 from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.dependencies import get_session_maker
+from app.main import app
 
 from app.models.products import Products
 from app.models.categories import Categories
@@ -67,6 +73,51 @@ class TestGetProducts:
         assert data[1]["name"] in ["Product 1", "Product 2"]
 
 
+class TestExportProducts:
+    """Тесты для потоковой выгрузки каталога"""
+    
+    @pytest.mark.asyncio
+    async def test_export_products_ndjson(
+        self,
+        async_client: AsyncClient,
+        test_db_session,
+        test_engine
+    ):
+        """Тест выгрузки NDJSON по возрастанию product_id с продолжением после after_id"""
+        category = Categories(name="Test Category", description="Test Description")
+        test_db_session.add(category)
+        await test_db_session.flush()
+        
+        for product_id in (3, 1, 2):
+            test_db_session.add(Products(
+                product_id=product_id,
+                name=f"Product {product_id}",
+                description=f"Description {product_id}",
+                price=1000,
+                product_quantity=10,
+                image=None,
+                features=None,
+                category_id=category.id
+            ))
+        await test_db_session.commit()
+        
+        app.dependency_overrides[get_session_maker] = lambda: async_sessionmaker(
+            bind=test_engine, class_=AsyncSession, expire_on_commit=False
+        )
+        
+        response = await async_client.get("/products/export")
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [row["product_id"] for row in rows] == [1, 2, 3]
+        assert rows[0]["name"] == "Product 1"
+        
+        response = await async_client.get("/products/export", params={"after_id": 2})
+        
+        assert [json.loads(line)["product_id"] for line in response.text.splitlines()] == [3]
+
+
 class TestGetProduct:
     """Тесты для получения товара по ID"""
     
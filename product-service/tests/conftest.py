@@ -9,6 +9,7 @@ os.environ["MODE"] = "TEST"
 from app.main import app
 from app.database import Base
 from app.dependencies import get_db
+from app.services.product_cache import product_cache
 from app.config import settings
 from app.models import Categories, IdempotencyKey, Products  # noqa: F401 — регистрация таблиц в metadata
 
@@ -66,6 +67,8 @@ async def async_client(test_db_session: AsyncSession):
         yield test_db_session
     
     app.dependency_overrides[get_db] = override_get_db
+    # Кэш товаров живёт в процессе и не должен переносить данные между тестами
+    product_cache.clear()
     
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as client:
@@ -134,6 +134,40 @@ class TestCategoryServiceGetCategoryById:
         mock_repository.get_by_id.assert_called_once_with(99999)
 
 
+class TestCategoryServiceGetCategoriesByIds:
+    """Юнит-тесты для метода get_categories_by_ids CategoryService"""
+    
+    @pytest.fixture
+    def mock_repository(self, mocker):
+        return mocker.AsyncMock()
+    
+    @pytest.fixture
+    def category_service(self, mock_repository, mocker):
+        return CategoryService(
+            category_repository=mock_repository,
+            uow_factory=mocker.Mock()
+        )
+    
+    @pytest.mark.asyncio
+    async def test_get_categories_by_ids_single_query(
+        self,
+        category_service: CategoryService,
+        mock_repository,
+        mocker
+    ):
+        """Тест получения нескольких категорий одним запросом к репозиторию"""
+        categories = [
+            CategoryItem(id=1, name="Category 1", description=None),
+            CategoryItem(id=2, name="Category 2", description=None),
+        ]
+        mock_repository.get_by_ids = mocker.AsyncMock(return_value=categories)
+        
+        result = await category_service.get_categories_by_ids([1, 2, 3])
+        
+        assert [category.id for category in result] == [1, 2]
+        mock_repository.get_by_ids.assert_called_once_with([1, 2, 3])
+
+
 class TestCategoryServiceGetCategoryByName:
     """Юнит-тесты для метода get_category_by_name CategoryService"""
     
@@ -251,6 +285,48 @@ class TestCategoryServiceCreateCategory:
         mock_uow.__aenter__.assert_called_once()
         mock_uow.__aexit__.assert_called_once()
     
+    @pytest.mark.asyncio
+    async def test_create_category_publishes_category_updated(
+        self,
+        category_service: CategoryService,
+        mock_repository,
+        mocker
+    ):
+        """Тест публикации category_updated после создания категории"""
+        created_category = CategoryItem(id=1, name="New Category", description=None)
+        mock_repository.create = mocker.AsyncMock(return_value=created_category)
+        mock_publish = mocker.patch(
+            'app.services.category_service.publish_category_updated',
+            new=mocker.AsyncMock()
+        )
+        
+        await category_service.create_category(
+            CategoryItem(id=None, name="New Category", description=None)
+        )
+        
+        mock_publish.assert_awaited_once_with(created_category)
+    
+    @pytest.mark.asyncio
+    async def test_create_category_publish_error_does_not_fail(
+        self,
+        category_service: CategoryService,
+        mock_repository,
+        mocker
+    ):
+        """Тест: ошибка публикации category_updated не ломает создание категории"""
+        created_category = CategoryItem(id=1, name="New Category", description=None)
+        mock_repository.create = mocker.AsyncMock(return_value=created_category)
+        mocker.patch(
+            'app.services.category_service.publish_category_updated',
+            new=mocker.AsyncMock(side_effect=Exception("Kafka unavailable"))
+        )
+        
+        result = await category_service.create_category(
+            CategoryItem(id=None, name="New Category", description=None)
+        )
+        
+        assert result.id == 1
+    
     @pytest.mark.asyncio
     async def test_create_category_without_description(
         self,
@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+
+from app.schemas.products import SProducts
+from app.services.product_cache import ProductCache
+
+
+def make_product(product_id: int, name: str | None = None) -> SProducts:
+    return SProducts(
+        product_id=product_id,
+        name=name or f"Product {product_id}",
+        description=f"Description {product_id}",
+        price=1000,
+        product_quantity=10,
+        image=None,
+        features=None,
+        category_id=1
+    )
+
+
+class TestProductCache:
+    """Юнит-тесты для ProductCache"""
+
+    @pytest.fixture
+    def cache(self):
+        return ProductCache(max_size=10, ttl_seconds=60.0)
+
+    @pytest.mark.asyncio
+    async def test_get_many_loads_only_missing(self, cache: ProductCache, mocker):
+        """Тест: повторный запрос берёт товары из кэша, в БД уходят только отсутствующие ID"""
+        load = mocker.AsyncMock(side_effect=lambda ids: {i: make_product(i) for i in ids if i != 3})
+
+        first = await cache.get_many([1, 2, 3], load)
+        second = await cache.get_many([2, 1, 4], load)
+
+        assert sorted(first) == [1, 2]
+        assert sorted(second) == [1, 2, 4]
+        assert load.await_args_list == [mocker.call([1, 2, 3]), mocker.call([4])]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_load(self, cache: ProductCache):
+        """Тест single-flight: одновременные промахи по товару дают одну загрузку"""
+        calls = []
+        release = asyncio.Event()
+
+        async def load(product_id):
+            calls.append(product_id)
+            await release.wait()
+            return make_product(product_id)
+
+        tasks = [asyncio.create_task(cache.get(1, load)) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks)
+
+        assert calls == [1]
+        assert all(result.product_id == 1 for result in results)
+
+    @pytest.mark.asyncio
+    async def test_invalidate_during_load_is_not_cached(self, cache: ProductCache):
+        """Тест: версия, прочитанная до инвалидации, не попадает в кэш"""
+        release = asyncio.Event()
+
+        async def slow_load(product_ids):
+            await release.wait()
+            return {1: make_product(1, "Old name")}
+
+        task = asyncio.create_task(cache.get_many([1], slow_load))
+        await asyncio.sleep(0)
+        cache.invalidate([1])
+        release.set()
+        await task
+
+        async def fresh_load(product_ids):
+            return {1: make_product(1, "New name")}
+
+        result = await cache.get_many([1], fresh_load)
+
+        assert result[1].name == "New name"
+
+    @pytest.mark.asyncio
+    async def test_load_error_reaches_waiters(self, cache: ProductCache):
+        """Тест: ошибка загрузки пробрасывается всем ожидающим и не кэшируется"""
+        release = asyncio.Event()
+
+        async def failing_load(product_ids):
+            await release.wait()
+            raise Exception("Database error")
+
+        tasks = [asyncio.create_task(cache.get_many([1], failing_load)) for _ in range(2)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        assert all(str(result) == "Database error" for result in results)
+        assert await cache.get_many([1], lambda ids: asyncio.sleep(0, {1: make_product(1)})) == {1: make_product(1)}
+
+    @pytest.mark.asyncio
+    async def test_count_is_cached_until_invalidated(self, cache: ProductCache, mocker):
+        """Тест: количество товаров берётся из кэша до invalidate_count"""
+        load = mocker.AsyncMock(side_effect=[5, 6])
+
+        assert await cache.get_count(load) == 5
+        assert await cache.get_count(load) == 5
+        cache.invalidate_count()
+        assert await cache.get_count(load) == 6
+        assert load.await_count == 2
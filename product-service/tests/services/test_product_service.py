@@ -377,3 +377,71 @@ class TestProductServiceIncreaseStock:
             await product_service.increase_stock(product_id, quantity)
         
         mock_uow.__aexit__.assert_called_once()
+
+
+class TestProductServiceExportProducts:
+    """Юнит-тесты для метода export_products ProductService"""
+    
+    @pytest.fixture
+    def mock_repository(self, mocker):
+        """Мок репозитория"""
+        return mocker.Mock()
+    
+    @pytest.fixture
+    def product_service(self, mock_repository, mocker):
+        """Создает экземпляр ProductService с моками"""
+        return ProductService(
+            products_repository=mock_repository,
+            uow_factory=mocker.Mock()
+        )
+    
+    @staticmethod
+    def make_product(product_id: int) -> ProductItem:
+        return ProductItem(
+            product_id=product_id,
+            name=f"Product {product_id}",
+            description=f"Description {product_id}",
+            price=1000 * product_id,
+            product_quantity=product_id,
+            image=None,
+            features=None,
+            category_id=1
+        )
+    
+    @pytest.mark.asyncio
+    async def test_export_products_streams_repository_rows(
+        self,
+        product_service: ProductService,
+        mock_repository
+    ):
+        """Тест выгрузки: товары отдаются по мере чтения из репозитория, начиная после after_id"""
+        async def stream_products(after_id, page_size, fetch_size):
+            for product_id in (after_id + 1, after_id + 2):
+                yield self.make_product(product_id)
+        
+        mock_repository.stream_products = stream_products
+        
+        result = [product async for product in product_service.export_products(after_id=10)]
+        
+        assert [product.product_id for product in result] == [11, 12]
+        assert result[0].name == "Product 11"
+    
+    @pytest.mark.asyncio
+    async def test_export_products_error(
+        self,
+        product_service: ProductService,
+        mock_repository
+    ):
+        """Тест проброса ошибки БД посреди выгрузки"""
+        async def stream_products(after_id, page_size, fetch_size):
+            yield self.make_product(1)
+            raise Exception("Database error")
+        
+        mock_repository.stream_products = stream_products
+        
+        exported = []
+        with pytest.raises(Exception, match="Database error"):
+            async for product in product_service.export_products():
+                exported.append(product)
+        
+        assert [product.product_id for product in exported] == [1]
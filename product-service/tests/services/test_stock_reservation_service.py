@@ -0,0 +1,143 @@
+import pytest
+from shared import ReserveStockResult, SagaIdempotencyKey
+
+from app.services.stock_reservation_service import StockReservationService
+
+
+class TestStockReservationServiceReserveStock:
+    """Юнит-тесты для метода reserve_stock StockReservationService"""
+
+    @pytest.fixture
+    def mock_idempotency_keys(self, mocker):
+        store = mocker.AsyncMock()
+        store.claim = mocker.AsyncMock(return_value=True)
+        return store
+
+    @pytest.fixture
+    def mock_products_repository(self, mocker):
+        return mocker.AsyncMock()
+
+    @pytest.fixture
+    def service(self, mock_idempotency_keys, mock_products_repository):
+        return StockReservationService(
+            idempotency_keys=mock_idempotency_keys,
+            products_repository=mock_products_repository
+        )
+
+    @pytest.mark.asyncio
+    async def test_reserve_stock_success(
+        self,
+        service: StockReservationService,
+        mock_idempotency_keys,
+        mock_products_repository,
+        mocker
+    ):
+        """Тест: строки блокируются по возрастанию ID, повторы товара суммируются, списание одним вызовом"""
+        order_items = [
+            {"product_id": 5, "quantity": 1},
+            {"product_id": 2, "quantity": 3},
+            {"product_id": 5, "quantity": 2}
+        ]
+        mock_products_repository.lock_stock = mocker.AsyncMock(return_value={2: 10, 5: 3})
+        mock_products_repository.reserve_stock = mocker.AsyncMock(return_value={2: 7, 5: 0})
+
+        result, error = await service.reserve_stock(1, order_items)
+
+        assert result == ReserveStockResult.SUCCESS
+        assert error is None
+        mock_products_repository.lock_stock.assert_awaited_once_with([2, 5])
+        mock_products_repository.reserve_stock.assert_awaited_once_with({5: 3, 2: 3})
+        mock_idempotency_keys.claim.assert_awaited_once_with(SagaIdempotencyKey.ORDER_PROCESSING, "1")
+        mock_idempotency_keys.release.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_reserve_stock_reports_all_failed_lines(
+        self,
+        service: StockReservationService,
+        mock_idempotency_keys,
+        mock_products_repository,
+        mocker
+    ):
+        """Тест: при нехватке ничего не списывается, в сообщении все неудачные позиции"""
+        order_items = [
+            {"product_id": 1, "quantity": 2},
+            {"product_id": 2, "quantity": 5},
+            {"product_id": 3, "quantity": 1}
+        ]
+        mock_products_repository.lock_stock = mocker.AsyncMock(return_value={1: 10, 2: 4})
+
+        result, error = await service.reserve_stock(1, order_items)
+
+        assert result == ReserveStockResult.INSUFFICIENT_STOCK
+        assert error == (
+            "Insufficient stock for product 2: requested 5, available 4, "
+            "product 3: not found"
+        )
+        mock_products_repository.reserve_stock.assert_not_called()
+        mock_idempotency_keys.release.assert_awaited_once_with(SagaIdempotencyKey.ORDER_PROCESSING, "1")
+
+    @pytest.mark.asyncio
+    async def test_reserve_stock_partial_update_raises(
+        self,
+        service: StockReservationService,
+        mock_idempotency_keys,
+        mock_products_repository,
+        mocker
+    ):
+        """Тест: если UPDATE списал не все позиции, резервация прерывается исключением (откат транзакции)"""
+        mock_products_repository.lock_stock = mocker.AsyncMock(return_value={1: 10, 2: 10})
+        mock_products_repository.reserve_stock = mocker.AsyncMock(return_value={1: 9})
+
+        with pytest.raises(RuntimeError):
+            await service.reserve_stock(1, [{"product_id": 1, "quantity": 1}, {"product_id": 2, "quantity": 1}])
+
+    @pytest.mark.asyncio
+    async def test_reserve_stock_already_done(
+        self,
+        service: StockReservationService,
+        mock_idempotency_keys,
+        mock_products_repository,
+        mocker
+    ):
+        """Тест: повторная доставка события не трогает остатки"""
+        mock_idempotency_keys.claim = mocker.AsyncMock(return_value=False)
+
+        result, error = await service.reserve_stock(1, [{"product_id": 1, "quantity": 1}])
+
+        assert result == ReserveStockResult.ALREADY_DONE
+        assert error is None
+        mock_products_repository.lock_stock.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_reserve_stock_no_valid_items(
+        self,
+        service: StockReservationService,
+        mock_products_repository
+    ):
+        """Тест: заказ без корректных позиций не резервируется"""
+        result, error = await service.reserve_stock(1, [{"product_id": 1, "quantity": 0}])
+
+        assert result == ReserveStockResult.INSUFFICIENT_STOCK
+        assert error == "No valid order items to reserve"
+        mock_products_repository.lock_stock.assert_not_called()
+
+
+class TestStockReservationServiceRecordStockCompensation:
+    """Юнит-тесты для метода record_stock_compensation StockReservationService"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("claimed", [True, False])
+    async def test_record_stock_compensation_once(self, mocker, claimed):
+        """Тест: остаток возвращается, только если ключ компенсации занят этим вызовом"""
+        idempotency_keys = mocker.AsyncMock()
+        idempotency_keys.claim = mocker.AsyncMock(return_value=claimed)
+        products_repository = mocker.AsyncMock()
+        service = StockReservationService(
+            idempotency_keys=idempotency_keys,
+            products_repository=products_repository
+        )
+
+        assert await service.record_stock_compensation(order_id=1, product_id=2, quantity=3) == claimed
+
+        idempotency_keys.claim.assert_awaited_once_with(SagaIdempotencyKey.COMPENSATION_STOCK, "1:2")
+        assert products_repository.increase_stock.await_count == int(claimed)
@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
+
+from config import settings
 
 from app.dependencies import get_qdrant_store
 from app.schemas.recommend import RecommendRequest
-from app.services.recommend_service import recommend
+from app.services.recommend_service import build_query_filter, recommend
+from app.services.similar_products_service import get_similar_products
 from app.database.qdrant_client import QdrantStore
 
 router = APIRouter()
@@ -14,4 +17,21 @@ async def recommend_endpoint(
     store: QdrantStore = Depends(get_qdrant_store),
 ) -> list[dict]:
 
-    return await recommend(query=body.query, limit=body.limit, store=store)
\ No newline at end of file
+    return await recommend(
+        query=body.query,
+        limit=body.limit,
+        store=store,
+        query_filter=build_query_filter(body),
+    )
+
+
+@router.get("/recommend/similar/{product_id}")
+async def similar_products_endpoint(
+    product_id: int,
+    limit: int = Query(default=4, ge=1, le=50, description="Максимум товаров в ответе, не больше SIMILAR_PRODUCTS_TOP_K"),
+    store: QdrantStore = Depends(get_qdrant_store),
+) -> list[dict]:
+    """Похожие товары из предрасчитанного списка соседей проиндексированного товара"""
+    return await get_similar_products(
+        store, settings.DB_COLLECTION_NAME, product_id, limit
+    )
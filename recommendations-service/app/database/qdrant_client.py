@@ -1,72 +1,127 @@
 import asyncio
 import json
 import logging
+import math
+import random
+import time
+from collections.abc import AsyncIterator
 
 from qdrant_client import AsyncQdrantClient
 from qdrant_client.http import models as qdrant_models
 from qdrant_client.http.models import (
     Distance,
+    PayloadSchemaType,
     PointIdsList,
     PointStruct,
     SparseVector,
     SparseVectorParams,
     VectorParams,
 )
-from langchain_huggingface.embeddings import HuggingFaceEmbeddings
 
 from config import settings
 
-from app.services.lexical_bm25 import (
-    build_bm25_doc_vector,
-    build_bm25_query_vector,
-    tokenize_and_stem,
-)
+from app.services.bm25_stats import Bm25CorpusStats, write_stats_file
+from app.services.embedding_cache import EMBEDDING_INFERENCE_SECONDS, EmbeddingCache
+from app.services.embedding_engine import EmbeddingEngine
+from app.services.lexical_bm25 import tokenize_and_stem
 
 # Имена векторов для гибридного поиска (dense + lexical)
 DENSE_VECTOR_NAME = "dense"
 LEXICAL_VECTOR_NAME = "lexical"
+# Поле payload с предрасчитанным списком похожих товаров
+SIMILAR_PRODUCTS_FIELD = "similar_products"
+# Payload товара в выдаче без служебного списка соседей
+PRODUCT_PAYLOAD_SELECTOR = qdrant_models.PayloadSelectorExclude(exclude=[SIMILAR_PRODUCTS_FIELD])
+
+# Поля payload с индексами для фильтрации внутри обхода HNSW
+PAYLOAD_INDEXES: dict[str, PayloadSchemaType] = {
+    "category_id": PayloadSchemaType.INTEGER,
+    "price": PayloadSchemaType.INTEGER,
+    "product_quantity": PayloadSchemaType.INTEGER,
+}
 
 # Порог для dense и lexical
 MIN_SCORE_THRESHOLD = 0.11
 # Параметр RRF (сглаживание влияния ранга)
 K_RRF = 17
+# k, с которым Qdrant считает Rrf() без параметров (скор ветки при слиянии на клиенте)
+QDRANT_DEFAULT_RRF_K = 2
 
-def payload_with_scores(payload: dict, dense: float, lex: float, rrf: float) -> dict:
+def payload_with_scores(payload: dict, scores: dict[str, float]) -> dict:
     """Копия payload с полями scores для ответа /recommend"""
     out = dict(payload)
-    out["scores"] = {
-        "dense": round(float(dense), 6),
-        "lexical": round(float(lex), 6),
-        "rrf": round(float(rrf), 6),
-    }
+    out["scores"] = {name: round(float(score), 6) for name, score in scores.items()}
     return out
 
 
-def build_lexical_vector(
-    text: str, idf_map: dict[str, float], avgdl: float
-) -> SparseVector | None:
-    """Строит sparse-вектор запроса для BM25"""
-    if not idf_map:
-        return None
-    tokens = tokenize_and_stem(text.strip())
-    if not tokens:
-        return None
-    indices, values = build_bm25_query_vector(tokens, idf_map)
-    if not indices:
-        return None
-    return SparseVector(indices=indices, values=values)
+def should_log_ranking(log: logging.Logger) -> bool:
+    """Полный дамп ранжирования: всегда на DEBUG, на INFO - для доли запросов SEARCH_RANKING_LOG_SAMPLE_RATE"""
+    if log.isEnabledFor(logging.DEBUG):
+        return True
+    return random.random() < settings.SEARCH_RANKING_LOG_SAMPLE_RATE
 
 
-def build_lexical_doc_vector(
-    text: str, idf_map: dict[str, float], avgdl: float
-) -> SparseVector | None:
-    """Строит sparse-вектор документа для BM25"""
-    if not idf_map or avgdl <= 0:
+def qdrant_rrf_score(rank: int, weight: float, k: int) -> float:
+    """Вклад ветки во взвешенный RRF Qdrant для 1-based ранга"""
+    return 1.0 / (rank / weight + k - 1)
+
+
+def branch_rank_cutoff() -> int:
+    """
+    Последний ранг ветки, проходящий MIN_SCORE_THRESHOLD при слиянии на клиенте.
+
+    Там порог применяется к Rrf-скору одной ветки 1 / (rank + k - 1),
+    то есть фактически отбирает топ-N каждой ветки.
+    """
+    return math.ceil(1 / MIN_SCORE_THRESHOLD - QDRANT_DEFAULT_RRF_K + 1) - 1
+
+
+def both_branches_score_threshold(weights: list[float], rank_cutoff: int) -> float | None:
+    """
+    Порог слитого скора, отделяющий товары из топа обеих веток от товаров из одной.
+
+    Минимальный скор товара из обеих веток - оба ранга равны rank_cutoff,
+    максимальный скор товара из одной ветки - ранг 1 в ветке с большим весом.
+    Если веса так перекошены, что эти скоры не разделяются, возвращает None.
+    """
+    both_min = sum(qdrant_rrf_score(rank_cutoff, w, K_RRF) for w in weights)
+    single_max = max(qdrant_rrf_score(1, w, K_RRF) for w in weights)
+    if both_min <= single_max:
+        return None
+    return (both_min + single_max) / 2
+
+
+def build_hybrid_prefetch(
+    query_vector: list[float],
+    lexical_vec: SparseVector,
+    rank_cutoff: int,
+    query_filter: qdrant_models.Filter | None,
+) -> list[qdrant_models.Prefetch]:
+    """Prefetch-ветки dense и lexical для серверного слияния: топ rank_cutoff каждой ветки"""
+    return [
+        qdrant_models.Prefetch(
+            query=query_vector,
+            using=DENSE_VECTOR_NAME,
+            limit=rank_cutoff,
+            filter=query_filter,
+        ),
+        qdrant_models.Prefetch(
+            query=lexical_vec,
+            using=LEXICAL_VECTOR_NAME,
+            limit=rank_cutoff,
+            filter=query_filter,
+        ),
+    ]
+
+
+def build_lexical_vector(text: str, stats: Bm25CorpusStats) -> SparseVector | None:
+    """Строит sparse-вектор запроса для BM25"""
+    if not stats.n_docs:
         return None
     tokens = tokenize_and_stem(text.strip())
     if not tokens:
         return None
-    indices, values = build_bm25_doc_vector(tokens, idf_map, avgdl)
+    indices, values = stats.query_vector(tokens)
     if not indices:
         return None
     return SparseVector(indices=indices, values=values)
@@ -90,39 +145,57 @@ class QdrantStore:
         self.host: str = settings.QDRANT_HOST
         self.port: int = settings.QDRANT_EXTERNAL_PORT
         self.client: AsyncQdrantClient | None = None
-        self.embedder: HuggingFaceEmbeddings | None = None
-        self.idf_map: dict[str, float] | None = None
-        self.avgdl: float | None = None
+        self.embedding_engine = EmbeddingEngine(
+            model_name=settings.EMBEDDING_MODEL_NAME,
+            workers=settings.EMBEDDING_WORKERS,
+            max_batch_size=settings.EMBEDDING_MAX_BATCH_SIZE,
+            max_wait_ms=settings.EMBEDDING_MAX_WAIT_MS,
+            max_queue_size=settings.EMBEDDING_QUEUE_SIZE,
+        )
+        self.bm25_stats: Bm25CorpusStats | None = None
+        self.embedding_cache = EmbeddingCache(
+            model_name=settings.EMBEDDING_MODEL_NAME,
+            max_size=settings.EMBEDDING_CACHE_SIZE,
+            ttl_seconds=settings.EMBEDDING_CACHE_TTL_SECONDS,
+            disk_path=settings.EMBEDDING_CACHE_PATH,
+        )
 
     async def get_client(self) -> AsyncQdrantClient:
         if self.client is None:
             self.client = AsyncQdrantClient(host=self.host, port=self.port)
         return self.client
 
-    async def get_embedder(self) -> HuggingFaceEmbeddings:
-        if self.embedder is None:
-            self.embedder = HuggingFaceEmbeddings(
-                model_name=settings.EMBEDDING_MODEL_NAME
-            )
-        return self.embedder
+    async def get_embedding_engine(self) -> EmbeddingEngine:
+        """Запускает пул воркеров эмбеддингов (загрузка модели) при первом обращении"""
+        await self.embedding_engine.start()
+        return self.embedding_engine
 
     async def ensure_bm25_stats_loaded(self) -> None:
-        """Загружает idf и avgdl из файла"""
-        if self.idf_map is not None:
+        """Загружает статистику корпуса BM25 из файла"""
+        if self.bm25_stats is not None:
             return
         path = settings.BM25_IDF_PATH
+        loop = asyncio.get_event_loop()
         try:
-            with open(path, encoding="utf-8") as f:
-                data = json.load(f)
-            self.idf_map = data.get("idf") or {}
-            self.avgdl = float(data.get("avgdl", 0.0))
-        except Exception:
-            self.idf_map = {}
-            self.avgdl = 0.0
+            self.bm25_stats = await loop.run_in_executor(None, Bm25CorpusStats.load, path)
+        except FileNotFoundError:
+            self.bm25_stats = Bm25CorpusStats()
+        except Exception as e:
+            logging.getLogger(__name__).warning("Не удалось прочитать статистику BM25 %s: %s", path, e)
+            self.bm25_stats = Bm25CorpusStats()
 
-    def get_bm25_stats(self) -> tuple[dict[str, float], float]:
-        """Возвращает (idf_map, avgdl)"""
-        return (self.idf_map or {}, self.avgdl or 0.0)
+    async def save_bm25_stats(self) -> None:
+        """Сохраняет статистику корпуса, если она менялась с последнего сохранения"""
+        if self.bm25_stats is None or not self.bm25_stats.dirty:
+            return
+        # Снимок берётся в потоке event loop, чтобы статистика не менялась во время сериализации
+        data = self.bm25_stats.serialize()
+        loop = asyncio.get_event_loop()
+        try:
+            await loop.run_in_executor(None, write_stats_file, settings.BM25_IDF_PATH, data)
+        except Exception:
+            self.bm25_stats.dirty = True
+            raise
 
     async def create_collection(
         self,
@@ -140,38 +213,110 @@ class QdrantStore:
                 LEXICAL_VECTOR_NAME: SparseVectorParams(),
             },
         )
+        await self.ensure_payload_indexes(collection_name, set())
+
+    async def ensure_payload_indexes(self, collection_name: str, existing: set[str]) -> None:
+        """Создаёт недостающие индексы payload из PAYLOAD_INDEXES"""
+        client = await self.get_client()
+        for field_name, field_schema in PAYLOAD_INDEXES.items():
+            if field_name in existing:
+                continue
+            await client.create_payload_index(
+                collection_name=collection_name,
+                field_name=field_name,
+                field_schema=field_schema,
+            )
 
     async def ensure_collection_exists(self, collection_name: str, vector_size: int) -> None:
         client = await self.get_client()
         try:
-            await client.get_collection(collection_name)
+            info = await client.get_collection(collection_name)
         except Exception:
             await self.create_collection(collection_name, vector_size)
+            return
+        # Коллекции, созданные до появления индексов, получают их при первой записи
+        await self.ensure_payload_indexes(collection_name, set(info.payload_schema or {}))
 
     async def embed_texts(self, texts: list[str]) -> list[list[float]]:
         """Dense-эмбеддинг"""
-        embedder = await self.get_embedder()
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, lambda: embedder.embed_documents(texts))
+        engine = await self.get_embedding_engine()
+        started = time.perf_counter()
+        try:
+            return await engine.embed(texts)
+        finally:
+            EMBEDDING_INFERENCE_SECONDS.observe(time.perf_counter() - started)
+
+    async def embed_query(self, phrase: str) -> list[float] | None:
+        """Dense-эмбеддинг поисковой фразы через кэш: повторная фраза не запускает модель"""
+        vector = await self.embedding_cache.get(phrase)
+        if vector is not None:
+            return vector
+        vectors = await self.embed_texts([phrase])
+        if not vectors:
+            return None
+        await self.embedding_cache.put(phrase, vectors[0])
+        return vectors[0]
 
     async def get_lexical_vector(self, text: str) -> SparseVector | None:
         """BM25-вектор запроса"""
         await self.ensure_bm25_stats_loaded()
-        idf_map, avgdl = self.get_bm25_stats()
         loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None, build_lexical_vector, text, idf_map, avgdl
-        )
+        return await loop.run_in_executor(None, build_lexical_vector, text, self.bm25_stats)
 
-    async def get_lexical_doc_vector(self, text: str) -> SparseVector | None:
-        """BM25-вектор документа для индексации"""
+    async def index_lexical_document(self, product_id: int, text: str) -> SparseVector | None:
+        """Учитывает документ в статистике BM25 и строит его sparse-вектор по обновлённым idf"""
         await self.ensure_bm25_stats_loaded()
-        idf_map, avgdl = self.get_bm25_stats()
         loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None, build_lexical_doc_vector, text, idf_map, avgdl
+        tokens = await loop.run_in_executor(None, tokenize_and_stem, text.strip())
+        self.bm25_stats.add_document(product_id, tokens)
+        indices, values = self.bm25_stats.doc_vector(product_id)
+        if not indices:
+            return None
+        return SparseVector(indices=indices, values=values)
+
+    async def remove_lexical_document(self, product_id: int) -> None:
+        """Убирает документ из статистики BM25"""
+        await self.ensure_bm25_stats_loaded()
+        self.bm25_stats.remove_document(product_id)
+
+    async def update_lexical_vectors(
+        self,
+        collection_name: str,
+        vectors: dict[int, SparseVector],
+    ) -> None:
+        """Перезаписывает только lexical-векторы точек, dense и payload не трогаются"""
+        if not vectors:
+            return
+        client = await self.get_client()
+        await client.update_vectors(
+            collection_name=collection_name,
+            points=[
+                qdrant_models.PointVectors(id=product_id, vector={LEXICAL_VECTOR_NAME: vector})
+                for product_id, vector in vectors.items()
+            ],
         )
 
+    async def scroll_points(
+        self,
+        collection_name: str,
+        batch_size: int,
+    ) -> AsyncIterator[list[qdrant_models.Record]]:
+        """Обходит все точки коллекции страницами (payload без списка соседей, без векторов)"""
+        client = await self.get_client()
+        offset = None
+        while True:
+            points, offset = await client.scroll(
+                collection_name=collection_name,
+                limit=batch_size,
+                offset=offset,
+                with_payload=PRODUCT_PAYLOAD_SELECTOR,
+                with_vectors=False,
+            )
+            if points:
+                yield points
+            if offset is None:
+                break
+
     async def upsert_points(
         self,
         collection_name: str,
@@ -193,6 +338,38 @@ class QdrantStore:
             points_selector=PointIdsList(points=point_ids),
         )
 
+    async def retrieve_points(
+        self,
+        collection_name: str,
+        point_ids: list[int],
+        with_payload: bool | list[str] | qdrant_models.PayloadSelectorExclude = PRODUCT_PAYLOAD_SELECTOR,
+        with_vectors: bool = False,
+    ) -> list[qdrant_models.Record]:
+        """Точки по id (без ранжирования); отсутствующие id просто не возвращаются"""
+        if not point_ids:
+            return []
+        client = await self.get_client()
+        return await client.retrieve(
+            collection_name=collection_name,
+            ids=point_ids,
+            with_payload=with_payload,
+            with_vectors=with_vectors,
+        )
+
+    async def set_payload(
+        self,
+        collection_name: str,
+        point_id: int,
+        payload: dict[str, object],
+    ) -> None:
+        """Дописывает поля payload точки, не трогая векторы"""
+        client = await self.get_client()
+        await client.set_payload(
+            collection_name=collection_name,
+            payload=payload,
+            points=[point_id],
+        )
+
     async def count_points(self, collection_name: str) -> int:
         """Число точек в коллекции; 0 если коллекции нет или ошибка"""
         log = logging.getLogger(__name__)
@@ -212,25 +389,165 @@ class QdrantStore:
         query_text: str,
         limit: int = 10,
         lexical_vec: SparseVector | None = None,
+        query_filter: qdrant_models.Filter | None = None,
     ) -> list[dict]:
         """
         Гибридный поиск: семантика (dense) + лексика (BM25)
+
+        query_filter (категория, цена, наличие, исключённые id) применяется в обеих ветках
+        внутри обхода индекса, поэтому выдача не требует запаса под фильтрацию
+
+        SEARCH_FUSION_MODE="server" - обе ветки и взвешенный RRF в одном запросе к Qdrant,
+        payload запрашивается только для итогового топа; "client" - ветки отдельными
+        запросами и RRF на стороне сервиса (со скорами каждой ветки в ответе)
         """
-        client = await self.get_client()
-        query_filter = None
         fetch_limit = max(min(limit * 12, 100), limit * 2)
         log = logging.getLogger(__name__)
-        w_dense = settings.RRF_WEIGHT_DENSE
-        w_lexical = settings.RRF_WEIGHT_LEXICAL
 
         if lexical_vec is None and query_text.strip():
             lexical_vec = await self.get_lexical_vector(query_text)
 
         if lexical_vec is not None:
-            log.info(
+            log.debug(
                 "lexical query vector size=%d (non-zero idf terms)",
                 len(lexical_vec.indices) if lexical_vec.indices else 0,
             )
+
+        if settings.SEARCH_FUSION_MODE == "client":
+            return await self.search_with_client_fusion(
+                collection_name, query_vector, limit, fetch_limit, lexical_vec, query_filter
+            )
+        return await self.search_with_server_fusion(
+            collection_name, query_vector, limit, fetch_limit, lexical_vec, query_filter
+        )
+
+    async def search_neighbours(
+        self,
+        collection_name: str,
+        dense_vector: list[float],
+        lexical_vec: SparseVector | None,
+        limit: int,
+        query_filter: qdrant_models.Filter | None = None,
+    ) -> list[tuple[int, float]]:
+        """
+        Ближайшие товары по dense и lexical векторам товара: (id, rrf-скор).
+
+        В отличие от search, ветки не обрезаются branch_rank_cutoff() и нет порога
+        попадания в обе ветки: соседи нужны всегда, а не только уверенные совпадения
+        запроса, поэтому список заполняется до limit. Payload не запрашивается.
+        """
+        client = await self.get_client()
+        if lexical_vec is None:
+            resp = await client.query_points(
+                collection_name=collection_name,
+                query=dense_vector,
+                using=DENSE_VECTOR_NAME,
+                query_filter=query_filter,
+                limit=limit,
+                with_payload=False,
+                with_vectors=False,
+            )
+        else:
+            branch_limit = max(min(limit * 12, 100), limit * 2)
+            resp = await client.query_points(
+                collection_name=collection_name,
+                prefetch=build_hybrid_prefetch(dense_vector, lexical_vec, branch_limit, query_filter),
+                query=qdrant_models.RrfQuery(
+                    rrf=qdrant_models.Rrf(k=K_RRF, weights=[settings.RRF_WEIGHT_DENSE, settings.RRF_WEIGHT_LEXICAL])
+                ),
+                limit=limit,
+                with_payload=False,
+                with_vectors=False,
+            )
+        return [(p.id, float(p.score)) for p in resp.points or []]
+
+    async def search_with_server_fusion(
+        self,
+        collection_name: str,
+        query_vector: list[float],
+        limit: int,
+        fetch_limit: int,
+        lexical_vec: SparseVector | None,
+        query_filter: qdrant_models.Filter | None,
+    ) -> list[dict]:
+        """
+        Слияние веток в Qdrant: один query_points без payload, затем payload только для топ-limit.
+
+        Отбор тот же, что при слиянии на клиенте: товар должен войти в топ branch_rank_cutoff()
+        обеих веток. Ветки ограничены этим топом, а товары только из одной ветки отсекаются
+        порогом слитого скора. Взвешенный RRF Qdrant делит ранг на вес ветки, поэтому
+        значения rrf отличаются от клиентских, а приоритет lexical над dense сохраняется.
+        """
+        client = await self.get_client()
+        log = logging.getLogger(__name__)
+        rank_cutoff = branch_rank_cutoff()
+
+        if lexical_vec is None:
+            resp = await client.query_points(
+                collection_name=collection_name,
+                query=query_vector,
+                using=DENSE_VECTOR_NAME,
+                query_filter=query_filter,
+                limit=min(limit, rank_cutoff),
+                with_payload=False,
+                with_vectors=False,
+            )
+        else:
+            weights = [settings.RRF_WEIGHT_DENSE, settings.RRF_WEIGHT_LEXICAL]
+            score_threshold = both_branches_score_threshold(weights, rank_cutoff)
+            if score_threshold is None:
+                log.warning("RRF weights %s do not allow server-side fusion, falling back to client fusion", weights)
+                return await self.search_with_client_fusion(
+                    collection_name, query_vector, limit, fetch_limit, lexical_vec, query_filter
+                )
+            resp = await client.query_points(
+                collection_name=collection_name,
+                prefetch=build_hybrid_prefetch(query_vector, lexical_vec, rank_cutoff, query_filter),
+                query=qdrant_models.RrfQuery(rrf=qdrant_models.Rrf(k=K_RRF, weights=weights)),
+                score_threshold=score_threshold,
+                limit=limit,
+                with_payload=False,
+                with_vectors=False,
+            )
+        scored = [(p.id, float(p.score)) for p in resp.points or []]
+
+        if should_log_ranking(log):
+            log.info(
+                "search fused ranking (%d results): %s",
+                len(scored),
+                json.dumps(
+                    [{"rank": rank, "product_id": pid, "rrf_score": score} for rank, (pid, score) in enumerate(scored, start=1)],
+                    default=str,
+                ),
+            )
+
+        points = await self.retrieve_points(collection_name, [pid for pid, _ in scored])
+        payload_by_id = {p.id: p.payload or {} for p in points}
+        items_out = [
+            payload_with_scores(payload_by_id[pid], {"rrf": score})
+            for pid, score in scored
+            if pid in payload_by_id
+        ]
+        if items_out:
+            log.info("search summary: names=%s", [str(item.get("name", ""))[:50] for item in items_out])
+        else:
+            log.info("search summary: no results")
+        return items_out
+
+    async def search_with_client_fusion(
+        self,
+        collection_name: str,
+        query_vector: list[float],
+        limit: int,
+        fetch_limit: int,
+        lexical_vec: SparseVector | None,
+        query_filter: qdrant_models.Filter | None,
+    ) -> list[dict]:
+        """Ветки отдельными запросами и взвешенный RRF на стороне сервиса"""
+        client = await self.get_client()
+        log = logging.getLogger(__name__)
+        w_dense = settings.RRF_WEIGHT_DENSE
+        w_lexical = settings.RRF_WEIGHT_LEXICAL
         #Формирование запроса к Qdrant
         rrf_one = qdrant_models.Rrf()
         dense_req = client.query_points(
@@ -246,7 +563,7 @@ class QdrantStore:
             #Qdrant возвращает результат в формате RRF-ранжирования внутри запроса
             query=qdrant_models.RrfQuery(rrf=rrf_one),
             limit=fetch_limit,
-            with_payload=True,
+            with_payload=PRODUCT_PAYLOAD_SELECTOR,
             with_vectors=False,
         )
         if lexical_vec is not None:
@@ -262,7 +579,7 @@ class QdrantStore:
                 ],
                 query=qdrant_models.RrfQuery(rrf=rrf_one),
                 limit=fetch_limit,
-                with_payload=True,
+                with_payload=PRODUCT_PAYLOAD_SELECTOR,
                 with_vectors=False,
             )
             resp_dense, resp_lex = await asyncio.gather(dense_req, lex_req)
@@ -280,7 +597,7 @@ class QdrantStore:
             points_with_rrf.sort(key=lambda x: -x[1])
         else:
             lex_points = (resp_lex.points or []) if resp_lex else []
-            log.info(
+            log.debug(
                 "lexical search returned %d points (у остальных lexical_score=0: они не в этом списке)",
                 len(lex_points),
             )
@@ -306,26 +623,27 @@ class QdrantStore:
                 points_with_rrf.append((payload, dense_score, lex_score, rrf_score))
             points_with_rrf.sort(key=lambda x: -x[3])
 
-        # Полный список кандидатов с рангами и скорами (до порогового фильтра) — для ответа API
-        ranking_before_filter: list[dict] = []
-        for rank, (payload, dense_score, lex_score, rrf_score) in enumerate(points_with_rrf, start=1):
-            product_id = payload.get("product_id")
-            ranking_before_filter.append(
-                {
-                    "rank": rank,
-                    "product_id": product_id,
-                    "name": str(payload.get("name", "")),
-                    "dense_score": float(dense_score),
-                    "lexical_score": float(lex_score),
-                    "rrf_score": float(rrf_score),
-                }
+        ranking_logged = should_log_ranking(log)
+        if ranking_logged:
+            # Полный список кандидатов с рангами и скорами (до порогового фильтра) — для диагностики
+            ranking_before_filter: list[dict] = []
+            for rank, (payload, dense_score, lex_score, rrf_score) in enumerate(points_with_rrf, start=1):
+                product_id = payload.get("product_id")
+                ranking_before_filter.append(
+                    {
+                        "rank": rank,
+                        "product_id": product_id,
+                        "name": str(payload.get("name", "")),
+                        "dense_score": float(dense_score),
+                        "lexical_score": float(lex_score),
+                        "rrf_score": float(rrf_score),
+                    }
+                )
+            log.info(
+                "search full ranking before threshold filter (%d candidates): %s",
+                len(ranking_before_filter),
+                json.dumps(ranking_before_filter, ensure_ascii=False, default=str),
             )
-        # Полный список кандидатов до порогового фильтра (не только топ-N) — в INFO для диагностики
-        log.info(
-            "search full ranking before threshold filter (%d candidates): %s",
-            len(ranking_before_filter),
-            json.dumps(ranking_before_filter, ensure_ascii=False, default=str),
-        )
 
         # Оставить товары: и dense, и lexical строго выше порога
         points_filtered = [
@@ -336,20 +654,21 @@ class QdrantStore:
         points_filtered = points_filtered[:limit]
 
         if points_filtered:
-            for rank, (payload, dense_score, lex_score, rrf_score) in enumerate(points_filtered, start=1):
-                name = str(payload.get("name", ""))[:60]
-                product_id = payload.get("product_id")
-                log.info(
-                    "search result #%d | product_id=%s | dense_score=%.4f | lexical_score=%.4f | rrf_score=%.4f | name=%s",
-                    rank, product_id, dense_score, lex_score, rrf_score, name,
-                )
+            if ranking_logged:
+                for rank, (payload, dense_score, lex_score, rrf_score) in enumerate(points_filtered, start=1):
+                    name = str(payload.get("name", ""))[:60]
+                    product_id = payload.get("product_id")
+                    log.info(
+                        "search result #%d | product_id=%s | dense_score=%.4f | lexical_score=%.4f | rrf_score=%.4f | name=%s",
+                        rank, product_id, dense_score, lex_score, rrf_score, name,
+                    )
             names = [str((p[0].get("name", ""))[:50]) for p in points_filtered]
             log.info("search summary: names=%s", names)
         else:
             log.info("search summary: no results")
 
         items_out = [
-            payload_with_scores(p, d, l, r)
+            payload_with_scores(p, {"dense": d, "lexical": l, "rrf": r})
             for p, d, l, r in points_filtered
         ]
         return items_out
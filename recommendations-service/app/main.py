@@ -1,12 +1,16 @@
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
+from prometheus_fastapi_instrumentator import Instrumentator
 
 from app.api.recommendations import router
 from app.store import store
 from app.messaging.broker import broker
 from app.messaging.handlers import router as kafka_router
+from config import settings
+from app.services.bm25_maintenance import run_bm25_maintenance
 from app.services.product_service_bootstrap import bootstrap_qdrant_from_product_service_if_empty
 
 logging.basicConfig(
@@ -21,14 +25,30 @@ logging.getLogger("faststream").setLevel(logging.WARNING)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    await store.get_embedder()
+    await store.get_embedding_engine()
     await store.ensure_bm25_stats_loaded()
     await bootstrap_qdrant_from_product_service_if_empty(store)
     broker.include_router(kafka_router)
     await broker.start()
+    bm25_task = asyncio.create_task(run_bm25_maintenance(store, settings.DB_COLLECTION_NAME))
     yield
     await broker.stop()
+    bm25_task.cancel()
+    try:
+        await bm25_task
+    except asyncio.CancelledError:
+        pass
+    await store.save_bm25_stats()
+    await store.embedding_engine.stop()
+    store.embedding_cache.close()
 
 
 app = FastAPI(lifespan=lifespan)
-app.include_router(router)
\ No newline at end of file
+app.include_router(router)
+
+instrumentator = Instrumentator(
+    should_group_status_codes=False,
+    excluded_handlers=[".*admin.*", "/metrics"],
+)
+instrumentator.instrument(app)
+instrumentator.expose(app)
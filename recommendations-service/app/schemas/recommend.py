@@ -4,3 +4,8 @@ from pydantic import BaseModel, Field
 class RecommendRequest(BaseModel):
     query: str = Field(..., min_length=1, description="Текст товара для поиска похожих (название, описание, категория, фичи)")
     limit: int = Field(default=3, ge=1, le=50, description="Максимум товаров в ответе")
+    category_ids: list[int] | None = Field(default=None, description="Только товары этих категорий")
+    price_min: int | None = Field(default=None, ge=0, description="Минимальная цена")
+    price_max: int | None = Field(default=None, ge=0, description="Максимальная цена")
+    in_stock: bool = Field(default=False, description="Только товары в наличии")
+    exclude_ids: list[int] = Field(default_factory=list, description="ID товаров, которые не должны попасть в выдачу")
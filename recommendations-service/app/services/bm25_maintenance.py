@@ -0,0 +1,88 @@
+import asyncio
+import logging
+
+from qdrant_client.http.models import SparseVector
+
+from config import settings
+
+from app.database.qdrant_client import QdrantStore
+from app.services.bm25_stats import Bm25CorpusStats
+from app.services.lexical_bm25 import tokenize_and_stem_batch
+from app.services.product_index_service import product_to_searchable_text
+
+logger = logging.getLogger(__name__)
+
+
+async def reweight_documents(
+    store: QdrantStore,
+    collection_name: str,
+    doc_ids: list[int],
+) -> int:
+    """Перезаписывает lexical-векторы документов по текущей статистике, пачками BM25_REWEIGHT_BATCH_SIZE"""
+    stats = store.bm25_stats
+    batch_size = settings.BM25_REWEIGHT_BATCH_SIZE
+    updated = 0
+    for start in range(0, len(doc_ids), batch_size):
+        vectors = {}
+        for doc_id in doc_ids[start:start + batch_size]:
+            #Товар мог быть удалён, пока шла перезапись предыдущих пачек
+            if doc_id not in stats.documents:
+                continue
+            indices, values = stats.doc_vector(doc_id)
+            if indices:
+                vectors[doc_id] = SparseVector(indices=indices, values=values)
+        await store.update_lexical_vectors(collection_name, vectors)
+        updated += len(vectors)
+    return updated
+
+
+async def rebuild_bm25_stats_from_qdrant(store: QdrantStore, collection_name: str) -> int:
+    """
+    Восстанавливает статистику корпуса по payload точек коллекции.
+
+    Нужна, когда файла статистики нет, он в старом формате (idf.json) или отстал
+    от коллекции после аварийной остановки:
+    df и длины документов считаются заново, векторы всех точек перевзвешиваются.
+    """
+    documents = {}
+    async for points in store.scroll_points(collection_name, settings.BM25_REWEIGHT_BATCH_SIZE):
+        texts = [product_to_searchable_text(point.payload or {}) for point in points]
+        documents.update(zip((point.id for point in points), tokenize_and_stem_batch(texts)))
+    store.bm25_stats = Bm25CorpusStats.from_documents(documents)
+    updated = await reweight_documents(store, collection_name, list(documents))
+    await store.save_bm25_stats()
+    logger.info("BM25: статистика восстановлена из Qdrant по %d товарам", len(documents))
+    return updated
+
+
+async def reweight_drifted_documents(store: QdrantStore, collection_name: str) -> int:
+    """
+    Перевзвешивает только документы с терминами, чей idf ушёл от базового больше порога.
+
+    Returns:
+        Количество перезаписанных lexical-векторов
+    """
+    await store.ensure_bm25_stats_loaded()
+    stats = store.bm25_stats
+    doc_ids, term_indices = stats.drifted_documents(settings.BM25_REWEIGHT_DRIFT_THRESHOLD)
+    if not doc_ids:
+        return 0
+    updated = await reweight_documents(store, collection_name, doc_ids)
+    stats.mark_reweighted(term_indices)
+    logger.info(
+        "BM25: перевзвешено векторов %d (дрейфующих терминов %d)",
+        updated,
+        len(term_indices),
+    )
+    return updated
+
+
+async def run_bm25_maintenance(store: QdrantStore, collection_name: str) -> None:
+    """Фоновая задача: периодически перевзвешивает дрейфующие векторы и сохраняет статистику"""
+    while True:
+        await asyncio.sleep(settings.BM25_REWEIGHT_INTERVAL_SECONDS)
+        try:
+            await reweight_drifted_documents(store, collection_name)
+            await store.save_bm25_stats()
+        except Exception as e:
+            logger.warning("BM25: ошибка обслуживания статистики: %s", e)
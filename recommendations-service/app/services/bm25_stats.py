@@ -0,0 +1,227 @@
+import math
+import os
+import struct
+import zlib
+from array import array
+from collections import Counter
+from collections.abc import Mapping
+
+from app.services.lexical_bm25 import build_bm25_weights_vector, term_id
+
+STATS_MAGIC = b"BM25S2"
+# Размеры секций файла: термины, id терминов в sparse-векторе, df, базовые idf,
+# id документов, число терминов документа, индексы терминов, частоты
+STATS_HEADER = struct.Struct("<6sd8Q")
+
+
+def bm25_idf(n_docs: int, df: int) -> float:
+    """IDF термина по числу документов корпуса и документной частоте"""
+    return math.log((n_docs - df + 0.5) / (df + 0.5) + 1.0)
+
+
+class Bm25CorpusStats:
+    """
+    Инкрементальная статистика корпуса для BM25.
+
+    Хранит df терминов, суммарную длину и частоты терминов каждого документа,
+    поэтому создание, изменение и удаление товара обновляют IDF и avgdl
+    без пересчёта по всему каталогу. Для каждого термина запоминается idf,
+    которым взвешены уже записанные sparse-векторы, - по расхождению с
+    текущим idf выбираются документы для перевзвешивания.
+    """
+
+    def __init__(self) -> None:
+        self.terms: list[str] = []
+        self.term_ids: dict[str, int] = {}
+        # Предрасчитанные term_id (индексы sparse-вектора) терминов - sha256 считается один раз на термин
+        self.term_hashes = array("I")
+        self.doc_freq = array("I")
+        self.baseline_idf = array("d")
+        self.baseline_avgdl = 0.0
+        # product_id -> (индексы терминов, частоты)
+        self.documents: dict[int, tuple[array, array]] = {}
+        self.total_len = 0
+        self.dirty = False
+
+    @property
+    def n_docs(self) -> int:
+        return len(self.documents)
+
+    @property
+    def avgdl(self) -> float:
+        return self.total_len / self.n_docs if self.n_docs else 0.0
+
+    def idf(self, term_index: int) -> float:
+        return bm25_idf(self.n_docs, self.doc_freq[term_index])
+
+    def term_index(self, term: str) -> int:
+        index = self.term_ids.get(term)
+        if index is None:
+            index = len(self.terms)
+            self.terms.append(term)
+            self.term_ids[term] = index
+            self.term_hashes.append(term_id(term))
+            self.doc_freq.append(0)
+            self.baseline_idf.append(0.0)
+        return index
+
+    def add_document(self, doc_id: int, tokens: list[str]) -> None:
+        """Добавляет документ или заменяет прежнюю версию документа с тем же id"""
+        if doc_id in self.documents:
+            self.remove_document(doc_id)
+        tf = Counter(tokens)
+        indices = array("I", (self.term_index(term) for term in tf))
+        counts = array("I", tf.values())
+        for index in indices:
+            self.doc_freq[index] += 1
+        self.documents[doc_id] = (indices, counts)
+        self.total_len += len(tokens)
+        # Вектор нового документа пишется с текущими idf - они и становятся базовыми для новых терминов
+        for index in indices:
+            if self.baseline_idf[index] == 0.0:
+                self.baseline_idf[index] = self.idf(index)
+        if not self.baseline_avgdl:
+            self.baseline_avgdl = self.avgdl
+        self.dirty = True
+
+    def remove_document(self, doc_id: int) -> None:
+        document = self.documents.pop(doc_id, None)
+        if document is None:
+            return
+        indices, counts = document
+        for index in indices:
+            self.doc_freq[index] -= 1
+        self.total_len -= sum(counts)
+        self.dirty = True
+
+    def doc_vector(self, doc_id: int) -> tuple[list[int], list[float]]:
+        """Sparse-вектор документа по сохранённым частотам и текущим idf/avgdl"""
+        indices, counts = self.documents[doc_id]
+        if not indices:
+            return [], []
+        n_docs = self.n_docs
+        doc_freq = self.doc_freq
+        return build_bm25_weights_vector(
+            [self.term_hashes[index] for index in indices],
+            counts,
+            [bm25_idf(n_docs, doc_freq[index]) for index in indices],
+            sum(counts),
+            self.avgdl,
+        )
+
+    def query_vector(self, tokens: list[str]) -> tuple[list[int], list[float]]:
+        """Sparse-вектор запроса: термины вне корпуса пропускаются, id берутся из таблицы терминов"""
+        n_docs = self.n_docs
+        weights: dict[int, float] = {}
+        for token in tokens:
+            index = self.term_ids.get(token)
+            if index is None or self.doc_freq[index] == 0:
+                continue
+            weights.setdefault(self.term_hashes[index], bm25_idf(n_docs, self.doc_freq[index]))
+        indices = sorted(weights)
+        return indices, [weights[idx] for idx in indices]
+
+    def drifted_documents(self, threshold: float) -> tuple[list[int], list[int]]:
+        """
+        Документы, чьи sparse-векторы устарели сильнее threshold.
+
+        Returns:
+            Кортеж (id документов для перевзвешивания, индексы дрейфующих терминов);
+            при дрейфе avgdl перевзвешиваются все документы
+        """
+        drifted_terms = [
+            index
+            for index, base in enumerate(self.baseline_idf)
+            if self.doc_freq[index] > 0 and abs(self.idf(index) - base) > threshold * max(base, 1e-9)
+        ]
+        if self.baseline_avgdl and abs(self.avgdl - self.baseline_avgdl) > threshold * self.baseline_avgdl:
+            return list(self.documents), drifted_terms
+        if not drifted_terms:
+            return [], []
+        drifted = set(drifted_terms)
+        doc_ids = [
+            doc_id
+            for doc_id, (indices, _) in self.documents.items()
+            if not drifted.isdisjoint(indices)
+        ]
+        return doc_ids, drifted_terms
+
+    def mark_reweighted(self, term_indices: list[int]) -> None:
+        """Запоминает текущие idf/avgdl как базовые после перевзвешивания векторов"""
+        for index in term_indices:
+            self.baseline_idf[index] = self.idf(index)
+        self.baseline_avgdl = self.avgdl
+        self.dirty = True
+
+    @classmethod
+    def from_documents(cls, documents: Mapping[int, list[str]]) -> "Bm25CorpusStats":
+        """Статистика по всему корпусу; базовые idf равны итоговым"""
+        stats = cls()
+        for doc_id, tokens in documents.items():
+            stats.add_document(doc_id, tokens)
+        stats.mark_reweighted(list(range(len(stats.terms))))
+        return stats
+
+    def serialize(self) -> bytes:
+        """Снимок статистики в бинарном виде (без сжатия), см. write_stats_file"""
+        doc_ids = array("q", self.documents)
+        doc_sizes = array("I")
+        term_indices = array("I")
+        term_counts = array("I")
+        for indices, counts in self.documents.values():
+            doc_sizes.append(len(indices))
+            term_indices.extend(indices)
+            term_counts.extend(counts)
+        sections = [
+            "\n".join(self.terms).encode("utf-8"),
+            self.term_hashes.tobytes(),
+            self.doc_freq.tobytes(),
+            self.baseline_idf.tobytes(),
+            doc_ids.tobytes(),
+            doc_sizes.tobytes(),
+            term_indices.tobytes(),
+            term_counts.tobytes(),
+        ]
+        header = STATS_HEADER.pack(STATS_MAGIC, self.baseline_avgdl, *(len(section) for section in sections))
+        self.dirty = False
+        return header + b"".join(sections)
+
+    @classmethod
+    def load(cls, path: str) -> "Bm25CorpusStats":
+        with open(path, "rb") as f:
+            data = zlib.decompress(f.read())
+        magic, baseline_avgdl, *sizes = STATS_HEADER.unpack_from(data)
+        if magic != STATS_MAGIC:
+            raise ValueError(f"Unknown BM25 stats format in {path}")
+        sections = []
+        offset = STATS_HEADER.size
+        for size in sizes:
+            sections.append(data[offset:offset + size])
+            offset += size
+
+        stats = cls()
+        stats.terms = sections[0].decode("utf-8").split("\n") if sections[0] else []
+        stats.term_ids = {term: index for index, term in enumerate(stats.terms)}
+        stats.term_hashes = array("I", sections[1])
+        stats.doc_freq = array("I", sections[2])
+        stats.baseline_idf = array("d", sections[3])
+        stats.baseline_avgdl = baseline_avgdl
+        doc_ids = array("q", sections[4])
+        doc_sizes = array("I", sections[5])
+        term_indices = array("I", sections[6])
+        term_counts = array("I", sections[7])
+        position = 0
+        for doc_id, size in zip(doc_ids, doc_sizes):
+            counts = term_counts[position:position + size]
+            stats.documents[doc_id] = (term_indices[position:position + size], counts)
+            stats.total_len += sum(counts)
+            position += size
+        return stats
+
+
+def write_stats_file(path: str, data: bytes) -> None:
+    """Сжимает снимок статистики и атомарно заменяет файл"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(zlib.compress(data))
+    os.replace(tmp_path, path)
@@ -0,0 +1,155 @@
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+
+from prometheus_client import Counter, Gauge, Histogram
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_CACHE_LOOKUPS = Counter(
+    "recommendations_embedding_cache_lookups_total",
+    "Обращения к кэшу эмбеддингов запросов по результату (memory_hit, disk_hit, miss)",
+    labelnames=["result"],
+)
+EMBEDDING_CACHE_SIZE = Gauge(
+    "recommendations_embedding_cache_size",
+    "Количество эмбеддингов в in-memory кэше",
+)
+EMBEDDING_INFERENCE_SECONDS = Histogram(
+    "recommendations_embedding_inference_seconds",
+    "Длительность вычисления dense-эмбеддингов моделью",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+
+def embedding_cache_key(model_name: str, phrase: str) -> str:
+    """Ключ кэша: sha256 от имени модели и нормализованной фразы"""
+    return hashlib.sha256(f"{model_name}\x00{phrase}".encode("utf-8")).hexdigest()
+
+
+class DiskEmbeddingStore:
+    """
+    Персистентный уровень кэша эмбеддингов в SQLite.
+
+    Векторы хранятся как float32 в BLOB, поэтому переживают рестарт
+    сервиса. Все методы блокирующие и вызываются через executor.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, vector BLOB NOT NULL, created_at REAL NOT NULL)"
+        )
+        self.conn.commit()
+
+    def get(self, key: str) -> list[float] | None:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT vector FROM embeddings WHERE key = ? AND created_at > ?",
+                (key, time.time() - self.ttl_seconds),
+            ).fetchone()
+        if row is None:
+            return None
+        return array("f", row[0]).tolist()
+
+    def put(self, key: str, vector: list[float]) -> None:
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO embeddings (key, vector, created_at) VALUES (?, ?, ?)",
+                (key, array("f", vector).tobytes(), time.time()),
+            )
+            self.conn.commit()
+
+    def close(self) -> None:
+        with self.lock:
+            self.conn.close()
+
+
+class EmbeddingCache:
+    """
+    LRU/TTL-кэш dense-эмбеддингов поисковых фраз.
+
+    Фронтенд строит запрос по товару детерминированно, поэтому одна и та же
+    страница товара даёт одну и ту же фразу, и повторный запрос не должен
+    запускать модель. Первый уровень - in-memory LRU, второй (необязательный) -
+    SQLite-файл disk_path.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        max_size: int,
+        ttl_seconds: float,
+        disk_path: str | None = None,
+    ) -> None:
+        self.model_name = model_name
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.entries: OrderedDict[str, tuple[list[float], float]] = OrderedDict()
+        self.disk: DiskEmbeddingStore | None = None
+        if disk_path:
+            try:
+                self.disk = DiskEmbeddingStore(disk_path, ttl_seconds)
+            except Exception as e:
+                logger.warning("Дисковый кэш эмбеддингов %s недоступен: %s", disk_path, e)
+
+    def key(self, phrase: str) -> str:
+        return embedding_cache_key(self.model_name, phrase)
+
+    async def get(self, phrase: str) -> list[float] | None:
+        """Эмбеддинг фразы из кэша или None"""
+        key = self.key(phrase)
+        cached = self.entries.get(key)
+        if cached is not None:
+            vector, expires_at = cached
+            if time.monotonic() < expires_at:
+                self.entries.move_to_end(key)
+                EMBEDDING_CACHE_LOOKUPS.labels(result="memory_hit").inc()
+                return vector
+            del self.entries[key]
+
+        if self.disk is not None:
+            loop = asyncio.get_running_loop()
+            try:
+                vector = await loop.run_in_executor(None, self.disk.get, key)
+            except Exception as e:
+                logger.warning("Ошибка чтения дискового кэша эмбеддингов: %s", e)
+                vector = None
+            if vector is not None:
+                self.remember(key, vector)
+                EMBEDDING_CACHE_LOOKUPS.labels(result="disk_hit").inc()
+                return vector
+
+        EMBEDDING_CACHE_LOOKUPS.labels(result="miss").inc()
+        return None
+
+    async def put(self, phrase: str, vector: list[float]) -> None:
+        """Кладёт эмбеддинг фразы в оба уровня кэша"""
+        key = self.key(phrase)
+        self.remember(key, vector)
+        if self.disk is not None:
+            loop = asyncio.get_running_loop()
+            try:
+                await loop.run_in_executor(None, self.disk.put, key, vector)
+            except Exception as e:
+                logger.warning("Ошибка записи дискового кэша эмбеддингов: %s", e)
+
+    def remember(self, key: str, vector: list[float]) -> None:
+        self.entries[key] = (vector, time.monotonic() + self.ttl_seconds)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+        EMBEDDING_CACHE_SIZE.set(len(self.entries))
+
+    def close(self) -> None:
+        if self.disk is not None:
+            self.disk.close()
+            self.disk = None
@@ -0,0 +1,218 @@
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from prometheus_client import Gauge, Histogram
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_BATCH_SECONDS = Histogram(
+    "recommendations_embedding_batch_seconds",
+    "Длительность обработки одного батча эмбеддингов в пуле воркеров",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+EMBEDDING_BATCH_SIZE = Histogram(
+    "recommendations_embedding_batch_size",
+    "Количество текстов в одном батче эмбеддингов",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+)
+EMBEDDING_QUEUE_DEPTH = Gauge(
+    "recommendations_embedding_queue_depth",
+    "Количество запросов эмбеддингов, ожидающих батча",
+)
+
+# Модель внутри процесса-воркера, загружается один раз в init_worker
+worker_embedder = None
+
+
+def init_worker(model_name: str) -> None:
+    """Инициализатор процесса пула: загружает модель эмбеддингов"""
+    global worker_embedder
+    from langchain_huggingface.embeddings import HuggingFaceEmbeddings
+
+    worker_embedder = HuggingFaceEmbeddings(model_name=model_name)
+
+
+def embed_in_worker(texts: list[str]) -> list[list[float]]:
+    """Считает эмбеддинги батча текстов в процессе-воркере"""
+    return worker_embedder.embed_documents(texts)
+
+
+class EmbeddingEngine:
+    """
+    Пул процессов для dense-эмбеддингов с динамическим батчингом.
+
+    Модель работает в отдельных процессах и не делит GIL с event loop.
+    Запросы, пришедшие в пределах max_wait_ms, склеиваются в один батч
+    до max_batch_size текстов, поэтому конкурентные /recommend прогоняют
+    модель одним вызовом, а не по одному тексту. Очередь ограничена
+    max_queue_size: при переполнении вызывающие ждут свободного места.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        workers: int,
+        max_batch_size: int,
+        max_wait_ms: float,
+        max_queue_size: int,
+    ) -> None:
+        self.model_name = model_name
+        self.workers = workers
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queue: asyncio.Queue[tuple[list[str], asyncio.Future]] | None = None
+        self.max_queue_size = max_queue_size
+        self.pool: ProcessPoolExecutor | None = None
+        self.batcher_task: asyncio.Task | None = None
+        self.batch_slots: asyncio.Semaphore | None = None
+        self.batch_tasks: set[asyncio.Task] = set()
+
+    async def start(self) -> None:
+        """Поднимает пул воркеров, прогревает модель и запускает батчер"""
+        if self.batcher_task is not None:
+            return
+        self.pool = self.create_pool()
+        self.queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self.batch_slots = asyncio.Semaphore(self.workers)
+        self.batcher_task = asyncio.create_task(self.run_batcher())
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            *(loop.run_in_executor(self.pool, embed_in_worker, ["warmup"]) for _ in range(self.workers))
+        )
+        logger.info("Embedding engine started: workers=%d model=%s", self.workers, self.model_name)
+
+    def create_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker,
+            initargs=(self.model_name,),
+        )
+
+    def replace_broken_pool(self, broken: ProcessPoolExecutor) -> None:
+        """Заменяет сломанный пул новым; параллельные батчи с тем же пулом его не пересоздают"""
+        if self.pool is not broken:
+            return
+        logger.error("Процесс пула эмбеддингов аварийно завершился, пул пересоздаётся")
+        broken.shutdown(wait=False, cancel_futures=True)
+        self.pool = self.create_pool()
+
+    async def stop(self) -> None:
+        if self.batcher_task is not None:
+            self.batcher_task.cancel()
+            try:
+                await self.batcher_task
+            except asyncio.CancelledError:
+                pass
+            self.batcher_task = None
+        while self.queue is not None and not self.queue.empty():
+            _, future = self.queue.get_nowait()
+            future.cancel()
+        if self.batch_tasks:
+            await asyncio.gather(*self.batch_tasks, return_exceptions=True)
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+        logger.info("Embedding engine stopped")
+
+    async def embed(self, texts: list[str]) -> list[list[float]]:
+        """
+        Dense-эмбеддинги текстов.
+
+        Небольшие запросы ставятся в очередь и склеиваются с соседними,
+        крупные (индексация каталога) режутся на батчи и уходят в пул напрямую.
+        """
+        if not texts:
+            return []
+        if self.batcher_task is None:
+            await self.start()
+
+        if len(texts) >= self.max_batch_size:
+            chunks = [
+                texts[i:i + self.max_batch_size]
+                for i in range(0, len(texts), self.max_batch_size)
+            ]
+            results = await asyncio.gather(*(self.run_in_pool(chunk) for chunk in chunks))
+            return [vector for chunk_vectors in results for vector in chunk_vectors]
+
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((texts, future))
+        EMBEDDING_QUEUE_DEPTH.set(self.queue.qsize())
+        return await future
+
+    async def run_in_pool(self, texts: list[str]) -> list[list[float]]:
+        """
+        Считает батч в пуле воркеров.
+
+        Если воркер упал (OOM killer, segfault), пул помечается сломанным и
+        отклоняет все задачи - он пересоздаётся, а батч повторяется один раз.
+        """
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        pool = self.pool
+        try:
+            try:
+                return await loop.run_in_executor(pool, embed_in_worker, texts)
+            except BrokenProcessPool:
+                # Движок остановлен, пока батч ждал, - повторять негде
+                if self.pool is None:
+                    raise
+                self.replace_broken_pool(pool)
+                return await loop.run_in_executor(self.pool, embed_in_worker, texts)
+        finally:
+            EMBEDDING_BATCH_SECONDS.observe(time.perf_counter() - started)
+            EMBEDDING_BATCH_SIZE.observe(len(texts))
+
+    async def collect_batch(self) -> list[tuple[list[str], asyncio.Future]]:
+        """Ждёт первый запрос и добирает соседние, пока не кончится max_wait или место в батче"""
+        batch = [await self.queue.get()]
+        size = len(batch[0][0])
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self.queue.get(), timeout=timeout)
+            except asyncio.TimeoutError:
+                break
+            batch.append(item)
+            size += len(item[0])
+        EMBEDDING_QUEUE_DEPTH.set(self.queue.qsize())
+        return batch
+
+    async def run_batch(self, batch: list[tuple[list[str], asyncio.Future]]) -> None:
+        try:
+            texts = [text for request_texts, _ in batch for text in request_texts]
+            try:
+                vectors = await self.run_in_pool(texts)
+            except Exception as e:
+                logger.error("Ошибка батча эмбеддингов (%d текстов): %s", len(texts), e)
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+            offset = 0
+            for request_texts, future in batch:
+                if not future.done():
+                    future.set_result(vectors[offset:offset + len(request_texts)])
+                offset += len(request_texts)
+        finally:
+            self.batch_slots.release()
+
+    async def run_batcher(self) -> None:
+        while True:
+            # Новый батч собирается, только когда есть свободный воркер
+            await self.batch_slots.acquire()
+            try:
+                batch = await self.collect_batch()
+            except BaseException:
+                self.batch_slots.release()
+                raise
+            task = asyncio.create_task(self.run_batch(batch))
+            self.batch_tasks.add(task)
+            task.add_done_callback(self.batch_tasks.discard)
@@ -1,14 +1,18 @@
 import functools
 import hashlib
-import math
 import re
-from collections import Counter
+from collections.abc import Iterable
 
 import snowballstemmer
 
 LEXICAL_DIM = 2**20
 BM25_K1 = 1.2
 BM25_B = 0.75
+# Сколько стемов слов держать в памяти: словарь каталога и запросов почти всегда помещается целиком
+STEM_CACHE_SIZE = 200_000
+TERM_ID_CACHE_SIZE = 200_000
+
+TOKEN_RE = re.compile(r"[^\W_]+")
 
 
 @functools.lru_cache(maxsize=1)
@@ -16,19 +20,22 @@ def get_stemmer():
     return snowballstemmer.stemmer("russian")
 
 
+@functools.lru_cache(maxsize=STEM_CACHE_SIZE)
+def stem_word(word: str) -> str:
+    """Стем слова; повторяющиеся слова не прогоняются через Snowball заново"""
+    return get_stemmer().stemWord(word)
+
+
 def tokenize(text: str) -> list[str]:
     """Токены: буквы и цифры, нижний регистр"""
-    if not text or not text.strip():
+    if not text:
         return []
-    lower = text.lower().strip()
-    tokens = re.findall(r"[^\W_]+", lower)
-    return [t for t in tokens if t]
+    return TOKEN_RE.findall(text.lower())
 
 
 def stem_tokens(tokens: list[str]) -> list[str]:
     """Стемминг для русского"""
-    stemmer = get_stemmer()
-    return [stemmer.stemWord(t) for t in tokens]
+    return list(map(stem_word, tokens))
 
 
 def tokenize_and_stem(text: str) -> list[str]:
@@ -36,6 +43,13 @@ def tokenize_and_stem(text: str) -> list[str]:
     return stem_tokens(tokenize(text))
 
 
+def tokenize_and_stem_batch(texts: Iterable[str]) -> list[list[str]]:
+    """Токенизация + стемминг списка документов за один проход (без промежуточных списков токенов)"""
+    findall = TOKEN_RE.findall
+    return [list(map(stem_word, findall(text.lower()))) if text else [] for text in texts]
+
+
+@functools.lru_cache(maxsize=TERM_ID_CACHE_SIZE)
 def term_id(term: str) -> int:
     """Детерминированный id термина (одинаковый в любом процессе/контейнере)"""
     h = hashlib.sha256(term.encode("utf-8")).digest()
@@ -43,74 +57,27 @@ def term_id(term: str) -> int:
     return idx
 
 
-def compute_corpus_bm25_stats(
-    docs_tokenized: list[list[str]],
-) -> tuple[dict[str, float], float, int]:
-    """IDF и avgdl по корпусу (список документов = список списков стеммов)"""
-    N = len(docs_tokenized)
-    if N == 0:
-        return {}, 0.0, 0
-    doc_freq = Counter()
-    total_len = 0
-    for tokens in docs_tokenized:
-        total_len += len(tokens)
-        for t in set(tokens):
-            doc_freq[t] += 1
-    avgdl = total_len / N
-    idf_map: dict[str, float] = {}
-    for term, df in doc_freq.items():
-        idf_map[term] = math.log((N - df + 0.5) / (df + 0.5) + 1.0)
-    return idf_map, avgdl, N
-
-
-def build_bm25_doc_vector(
-    tokens: list[str],
-    idf_map: dict[str, float],
+def build_bm25_weights_vector(
+    ids: Iterable[int],
+    counts: Iterable[int],
+    idfs: Iterable[float],
+    doc_len: int,
     avgdl: float,
     k1: float = BM25_K1,
     b: float = BM25_B,
 ) -> tuple[list[int], list[float]]:
-    """Sparse-вектор документа для BM25 (indices, values)."""
-    if not tokens or avgdl <= 0:
-        return [], []
-    doc_len = len(tokens)
-    tf = Counter(tokens)
-    norm = 1.0 - b + b * (doc_len / avgdl)
-    seen: set[int] = set()
-    indices: list[int] = []
-    values: list[float] = []
-    for term, cnt in tf.items():
-        idx = term_id(term)
-        if idx in seen:
-            continue
-        seen.add(idx)
-        idf = idf_map.get(term, 0.0)
-        val = (cnt * (k1 + 1)) / (cnt + k1 * norm)
-        indices.append(idx)
-        values.append(idf * val)
-    paired = sorted(zip(indices, values))
-    return [p[0] for p in paired], [p[1] for p in paired]
-
-
-def build_bm25_query_vector(
-    tokens: list[str],
-    idf_map: dict[str, float],
-) -> tuple[list[int], list[float]]:
-    """Sparse-вектор запроса для BM25 (indices, values)"""
-    if not tokens:
+    """
+    Sparse-вектор документа по уже посчитанным id терминов, частотам и idf.
+
+    При коллизии id остаётся первый термин.
+    """
+    if avgdl <= 0:
         return [], []
-    seen: set[int] = set()
-    indices: list[int] = []
-    values: list[float] = []
-    for t in tokens:
-        idx = term_id(t)
-        if idx in seen:
-            continue
-        idf = idf_map.get(t, 0.0)
-        if idf <= 0.0:
-            continue
-        seen.add(idx)
-        indices.append(idx)
-        values.append(idf)
-    paired = sorted(zip(indices, values))
-    return [p[0] for p in paired], [p[1] for p in paired]
+    norm = k1 * (1.0 - b + b * (doc_len / avgdl))
+    weights: dict[int, float] = {}
+    for idx, cnt, idf in zip(ids, counts, idfs):
+        if idx not in weights:
+            weights[idx] = idf * ((cnt * (k1 + 1)) / (cnt + norm))
+    indices = sorted(weights)
+    return indices, [weights[idx] for idx in indices]
+
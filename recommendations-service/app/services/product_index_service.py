@@ -6,6 +6,10 @@ from app.database.qdrant_client import (
     QdrantStore,
 )
 from app.schemas.products import IncomingProduct, ProductPayload
+from app.services.similar_products_service import (
+    refresh_similar_products,
+    refresh_similar_products_by_ids,
+)
 
 
 def features_to_text(features: dict[str, str] | None) -> str:
@@ -68,8 +72,8 @@ class ProductIndexService:
             return
 
         dense = vectors[0]
-        #Строит lexical sparse вектор
-        lexical = await self.store.get_lexical_doc_vector(text)
+        #Обновляет статистику BM25 и строит lexical sparse вектор
+        lexical = await self.store.index_lexical_document(product_id, text)
         await self.store.ensure_collection_exists(
             self.collection_name, vector_size=len(dense)
         )
@@ -77,7 +81,15 @@ class ProductIndexService:
         payload_dict = dict(build_payload(product))
         point = build_point_for_qdrant(product_id, dense, lexical, payload_dict)
         await self.store.upsert_points(self.collection_name, [point])
+        #Обновляет список похожих товара и его соседей: новый товар может войти в их топ
+        similar = await refresh_similar_products(
+            self.store, self.collection_name, product_id, dense, lexical
+        )
+        await refresh_similar_products_by_ids(
+            self.store, self.collection_name, [s["product_id"] for s in similar]
+        )
 
     async def remove_product(self, product_id: int) -> None:
-        """Удаляет товар из Qdrant"""
+        """Удаляет товар из Qdrant и из статистики BM25"""
         await self.store.delete_points(self.collection_name, [product_id])
+        await self.store.remove_lexical_document(product_id)
@@ -1,8 +1,16 @@
+import asyncio
+import itertools
 import logging
+
 import httpx
 
 from app.database.qdrant_client import QdrantStore
-from app.services.reindex_products_to_qdrant import reindex_products_to_qdrant
+from app.services.bm25_maintenance import rebuild_bm25_stats_from_qdrant
+from app.services.reindex_products_to_qdrant import (
+    finish_reindex,
+    index_products_chunk,
+    start_reindex,
+)
 from config import settings
 
 logger = logging.getLogger(__name__)
@@ -10,11 +18,89 @@ logger = logging.getLogger(__name__)
 MAX_PER_PAGE = 50
 
 
-async def fetch_all_products_from_product_service(
+async def fetch_products_page(client: httpx.AsyncClient, base: str, page: int) -> list[dict]:
+    r = await client.get(
+        f"{base}/products/",
+        params={"page": page, "per_page": MAX_PER_PAGE, "order": "DESC"},
+    )
+    r.raise_for_status()
+    return r.json()
+
+
+async def produce_product_chunks(
+    client: httpx.AsyncClient,
+    base: str,
+    pages: int,
+    queue: asyncio.Queue[list[dict] | None],
+    consumers: int,
+) -> None:
+    """
+    Качает страницы каталога окном из BOOTSTRAP_FETCH_CONCURRENCY запросов
+    и кладёт в очередь чанки по BOOTSTRAP_CHUNK_SIZE товаров.
+
+    Очередь ограничена, поэтому, пока индексация не успевает, новые страницы
+    не запрашиваются и в памяти не копится весь каталог.
+    """
+    chunk_size = settings.BOOTSTRAP_CHUNK_SIZE
+    pending_pages = iter(range(1, pages + 1))
+    in_flight: set[asyncio.Task] = set()
+    buffer: list[dict] = []
+    fetched = 0
+
+    def fill_window() -> None:
+        for page in itertools.islice(pending_pages, settings.BOOTSTRAP_FETCH_CONCURRENCY - len(in_flight)):
+            in_flight.add(asyncio.create_task(fetch_products_page(client, base, page)))
+
+    try:
+        fill_window()
+        while in_flight:
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            in_flight.difference_update(done)
+            for task in done:
+                rows = task.result()
+                buffer.extend(rows)
+                fetched += len(rows)
+            while len(buffer) >= chunk_size:
+                await queue.put(buffer[:chunk_size])
+                del buffer[:chunk_size]
+            fill_window()
+            logger.info("product-service: получено %d товаров (страниц в каталоге %d)", fetched, pages)
+        if buffer:
+            await queue.put(buffer)
+    finally:
+        for task in in_flight:
+            task.cancel()
+    #По одному маркеру конца на каждого потребителя
+    for _ in range(consumers):
+        await queue.put(None)
+
+
+async def consume_product_chunks(
+    store: QdrantStore,
+    queue: asyncio.Queue[list[dict] | None],
+    product_ids: list[int],
+) -> None:
+    """Индексирует чанки из очереди до маркера конца"""
+    while True:
+        chunk = await queue.get()
+        if chunk is None:
+            return
+        product_ids.extend(await index_products_chunk(chunk, store))
+        logger.info("reindex_qdrant: проиндексировано %d товаров", len(product_ids))
+
+
+async def stream_products_from_product_service(
     base_url: str,
+    store: QdrantStore,
     timeout: float = 120.0,
-) -> list[dict]:
-    """GET /products/count и постранично GET /products/."""
+) -> int:
+    """
+    Конвейерная загрузка каталога: страницы /products/ качаются параллельно,
+    а чанки товаров тем временем эмбеддятся, получают sparse-векторы и пишутся в Qdrant.
+
+    Чанки индексируются BOOTSTRAP_INDEX_CONCURRENCY потребителями одновременно,
+    так что dense-эмбеддинги загружают все воркеры пула, пока идут сеть и upsert.
+    """
     base = base_url.rstrip("/")
     async with httpx.AsyncClient(timeout=timeout) as client:
         #Узнаёт общее число товаров
@@ -23,31 +109,22 @@ async def fetch_all_products_from_product_service(
         total = int(r.json().get("total", 0))
         if total == 0:
             logger.warning("product-service: total=0 товаров")
-            return []
+            return 0
         #Считает число страниц
         pages = (total + MAX_PER_PAGE - 1) // MAX_PER_PAGE
 
-        all_rows = []
-        for page in range(1, pages + 1):
-            r = await client.get(
-                f"{base}/products/",
-                params={"page": page, "per_page": MAX_PER_PAGE, "order": "DESC"},
-            )
-            r.raise_for_status()
-            batch = r.json()
-            #Склеивает батчи, пока не пришла пустая страница
-            if not batch:
-                break
-            all_rows.extend(batch)
-            logger.info(
-                "product-service: страница %d/%d, получено %d (всего %d)",
-                page,
-                pages,
-                len(batch),
-                len(all_rows),
-            )
+        consumers = settings.BOOTSTRAP_INDEX_CONCURRENCY or settings.EMBEDDING_WORKERS + 1
+        queue: asyncio.Queue[list[dict] | None] = asyncio.Queue(maxsize=consumers)
+        product_ids: list[int] = []
+        await start_reindex(store)
+        async with asyncio.TaskGroup() as group:
+            group.create_task(produce_product_chunks(client, base, pages, queue, consumers))
+            for _ in range(consumers):
+                group.create_task(consume_product_chunks(store, queue, product_ids))
 
-        return all_rows
+    if product_ids:
+        await finish_reindex(store, product_ids)
+    return len(product_ids)
 
 
 async def bootstrap_qdrant_from_product_service_if_empty(store: QdrantStore) -> None:
@@ -60,30 +137,37 @@ async def bootstrap_qdrant_from_product_service_if_empty(store: QdrantStore) ->
     n = await store.count_points(settings.DB_COLLECTION_NAME)
     if n > 0:
         logger.info("Qdrant коллекция %s: уже %d точек - пропускаем", settings.DB_COLLECTION_NAME, n)
+        #Статистики BM25 нет (первый запуск с новым форматом файла) или файл отстал от коллекции
+        #(процесс упал между сохранениями) - восстанавливаем по payload точек
+        await store.ensure_bm25_stats_loaded()
+        if store.bm25_stats.n_docs != n:
+            logger.info(
+                "BM25: в статистике %d документов, в коллекции %d точек - пересчёт",
+                store.bm25_stats.n_docs,
+                n,
+            )
+            try:
+                await rebuild_bm25_stats_from_qdrant(store, settings.DB_COLLECTION_NAME)
+            except Exception:
+                logger.exception("Не удалось восстановить статистику BM25 из Qdrant")
         return
 
     logger.info(
         "Qdrant пустой или коллекция новая - загрузка каталога из product-service: %s",
         url,
     )
-    #Если точек нет - получает из сервиса товаров
+    #Если точек нет - получает товары из сервиса товаров и сразу индексирует их чанками
     try:
-        products = await fetch_all_products_from_product_service(url)
+        loaded = await stream_products_from_product_service(url, store)
     except Exception as e:
         logger.exception(
-            "Не удалось получить товары из product-service (%s): %s - рекомендации будут пустыми до ручной загрузки/Kafka.",
+            "Не удалось загрузить товары из product-service (%s): %s - рекомендации будут неполными до ручной загрузки/Kafka.",
             url,
             e,
         )
         return
 
-    if not products:
+    if not loaded:
         logger.warning("product-service вернул 0 товаров - Qdrant остаётся пустым")
         return
-
-    try:
-        #Загружаем полученные товары
-        loaded = await reindex_products_to_qdrant(products, store)
-        logger.info("В Qdrant загружено %d товаров", loaded)
-    except Exception:
-        logger.exception("Ошибка reindex_qdrant при bootstrap из product-service")
+    logger.info("В Qdrant загружено %d товаров", loaded)
@@ -1,9 +1,12 @@
 import asyncio
 import logging
 
+from qdrant_client.http import models as qdrant_models
+
 from config import settings
 
 from app.database.qdrant_client import QdrantStore
+from app.schemas.recommend import RecommendRequest
 
 logger = logging.getLogger(__name__)
 
@@ -20,8 +23,38 @@ def normalize_search_phrase(query: str | None) -> str:
     return phrase
 
 
+def build_query_filter(body: RecommendRequest) -> qdrant_models.Filter | None:
+    """Фильтр Qdrant по категории, цене, наличию и исключённым id из запроса"""
+    must: list[qdrant_models.Condition] = []
+    if body.category_ids:
+        must.append(
+            qdrant_models.FieldCondition(
+                key="category_id", match=qdrant_models.MatchAny(any=body.category_ids)
+            )
+        )
+    if body.price_min is not None or body.price_max is not None:
+        must.append(
+            qdrant_models.FieldCondition(
+                key="price", range=qdrant_models.Range(gte=body.price_min, lte=body.price_max)
+            )
+        )
+    if body.in_stock:
+        must.append(
+            qdrant_models.FieldCondition(key="product_quantity", range=qdrant_models.Range(gt=0))
+        )
+    must_not: list[qdrant_models.Condition] = []
+    if body.exclude_ids:
+        must_not.append(qdrant_models.HasIdCondition(has_id=body.exclude_ids))
+    if not must and not must_not:
+        return None
+    return qdrant_models.Filter(must=must or None, must_not=must_not or None)
+
+
 async def recommend(
-    query: str, limit: int = 3, store: "QdrantStore | None" = None
+    query: str,
+    limit: int = 3,
+    store: "QdrantStore | None" = None,
+    query_filter: qdrant_models.Filter | None = None,
 ) -> list[dict]:
     """Текст товара (название, описание, категория, фичи) -> dense + lexical в Qdrant -> список похожих товаров"""
 
@@ -32,22 +65,22 @@ async def recommend(
     phrase = normalize_search_phrase(query)
     logger.info("search phrase length=%d", len(phrase))
 
-    #dense-вектор для фразы
-    vectors_task = store.embed_texts([phrase])
+    #dense-вектор для фразы (из кэша эмбеддингов, если фраза уже встречалась)
+    vector_task = store.embed_query(phrase)
 
     #sparse BM25-вектор запроса
     lexical_task = store.get_lexical_vector(phrase)
 
     #Эмбеддер и построение lexical не ждут друг друга
-    vectors, lexical_vec = await asyncio.gather(vectors_task, lexical_task)
-    if not vectors:
+    query_vector, lexical_vec = await asyncio.gather(vector_task, lexical_task)
+    if query_vector is None:
         return []
-    query_vector = vectors[0]
     items = await store.search(
         collection_name=settings.DB_COLLECTION_NAME,
         query_vector=query_vector,
         query_text=phrase,
         limit=limit,
         lexical_vec=lexical_vec,
+        query_filter=query_filter,
     )
     return items
@@ -1,81 +1,112 @@
-import json
 import logging
 
 from qdrant_client.http.models import SparseVector
 
 from app.database.qdrant_client import QdrantStore
-from app.services.lexical_bm25 import (
-    build_bm25_doc_vector,
-    compute_corpus_bm25_stats,
-    tokenize_and_stem,
-)
+from app.services.bm25_maintenance import reweight_documents
+from app.services.bm25_stats import Bm25CorpusStats
+from app.services.lexical_bm25 import tokenize_and_stem_batch
 from app.services.product_index_service import (
     build_payload,
     build_point_for_qdrant,
     product_to_searchable_text,
 )
+from app.services.similar_products_service import refresh_similar_products_by_ids
 from config import settings
 
 logger = logging.getLogger(__name__)
 
+# Текст, по эмбеддингу которого определяется размерность модели
+DIMENSION_PROBE_TEXT = "товар"
 
-async def reindex_products_to_qdrant(products: list[dict], store: QdrantStore) -> int:
+
+async def start_reindex(store: QdrantStore) -> None:
     """
-    По всему переданному списку products заново считает глобальную BM25-статистику (IDF, средняя длина документа),
-    перезаписывает idf.json, затем для каждого товара строит dense и lexical (sparse) векторы
-    и делает один массовый upsert в Qdrant.
+    Начинает полную переиндексацию: создаёт коллекцию, статистика BM25 копится заново по мере поступления чанков.
+
+    Коллекция создаётся здесь один раз, до индексации чанков: чанки индексируются
+    параллельно, и проверка "нет коллекции - создать" в каждом из них гонялась бы
+    за create_collection. Размер dense-вектора берётся из эмбеддинга пробного текста.
     """
-    if not products:
-        return 0
+    vectors = await store.embed_texts([DIMENSION_PROBE_TEXT])
+    if not vectors:
+        raise RuntimeError("reindex_qdrant: не удалось получить dense эмбеддинг для размера коллекции")
+    await store.ensure_collection_exists(settings.DB_COLLECTION_NAME, vector_size=len(vectors[0]))
+    store.bm25_stats = Bm25CorpusStats()
 
-    collection = settings.DB_COLLECTION_NAME
-    #Для каждого товара собирает строку (название, описание, фичи)
-    texts = [product_to_searchable_text(p) for p in products]
-    logger.info("reindex_qdrant: токенизация и BM25 по %d товарам", len(texts))
 
-    docs_tokenized = [tokenize_and_stem(t) for t in texts]
-    #Считает idf_map и avgdl по всем документам
-    idf_map, avgdl, _ = compute_corpus_bm25_stats(docs_tokenized)
+async def index_products_chunk(products: list[dict], store: QdrantStore) -> list[int]:
+    """
+    Индексирует чанк товаров: токены и df в статистику BM25, dense-эмбеддинги, один upsert.
 
-    idf_path = settings.BM25_IDF_PATH
-    with open(idf_path, "w", encoding="utf-8") as f:
-        json.dump({"idf": idf_map, "avgdl": avgdl, "N": len(products)}, f, ensure_ascii=False)
-    logger.info(
-        "reindex_qdrant: сохранён %s (avgdl=%.2f, терминов=%d)",
-        idf_path,
-        avgdl,
-        len(idf_map),
-    )
+    Коллекция к этому моменту уже создана в start_reindex.
+    Lexical-векторы строятся по статистике, накопленной к этому моменту,
+    и перевзвешиваются в finish_reindex, когда корпус собран целиком.
 
-    # После записи файла инстанс store перечитывает статистику
-    store.idf_map = None
-    store.avgdl = None
-    await store.ensure_bm25_stats_loaded()
+    Returns:
+        id загруженных товаров
+    """
+    collection = settings.DB_COLLECTION_NAME
+    #Для каждого товара собирает строку (название, описание, фичи)
+    texts = [product_to_searchable_text(p) for p in products]
+    stats = store.bm25_stats
+    for p, tokens in zip(products, tokenize_and_stem_batch(texts)):
+        stats.add_document(p["product_id"], tokens)
 
-    logger.info("reindex_qdrant: dense эмбеддинги...")
     vectors = await store.embed_texts(texts)
     if not vectors:
         logger.error("reindex_qdrant: не удалось получить dense эмбеддинги")
-        return 0
-
-    vector_size = len(vectors[0])
-    await store.ensure_collection_exists(collection, vector_size=vector_size)
+        for p in products:
+            stats.remove_document(p["product_id"])
+        return []
 
     points = []
-    for i, p in enumerate(products):
-        idx, val = build_bm25_doc_vector(docs_tokenized[i], idf_map, avgdl)
-        #Lexical: sparse BM25 по уже посчитанным idf_map/avgdl и токенам документа i
-        #Dense: vectors[i] для того же текста
+    for p, dense in zip(products, vectors):
+        #Lexical: sparse BM25 по статистике корпуса и частотам терминов документа
+        idx, val = stats.doc_vector(p["product_id"])
         lexical = SparseVector(indices=idx, values=val) if idx else None
-        point = build_point_for_qdrant(
-            p["product_id"],
-            vectors[i],
-            lexical,
-            dict(build_payload(p)),
-        )
-        points.append(point)
-
+        points.append(build_point_for_qdrant(p["product_id"], dense, lexical, dict(build_payload(p))))
     await store.upsert_points(collection, points)
-    logger.info("reindex_qdrant: в Qdrant загружено точек: %d", len(points))
-    return len(points)
+    return [p["product_id"] for p in products]
+
+
+async def finish_reindex(store: QdrantStore, product_ids: list[int]) -> None:
+    """
+    Завершает переиндексацию: lexical-векторы по итоговой статистике, сохранение статистики
+    и списки похожих товаров (после загрузки всего каталога), пачками BM25_REWEIGHT_BATCH_SIZE.
+    """
+    collection = settings.DB_COLLECTION_NAME
+    stats = store.bm25_stats
+    await reweight_documents(store, collection, product_ids)
+    stats.mark_reweighted(list(range(len(stats.terms))))
+    await store.save_bm25_stats()
+    logger.info(
+        "reindex_qdrant: сохранена статистика BM25 %s (avgdl=%.2f, терминов=%d)",
+        settings.BM25_IDF_PATH,
+        stats.avgdl,
+        len(stats.terms),
+    )
+
+    batch_size = settings.BM25_REWEIGHT_BATCH_SIZE
+    for start in range(0, len(product_ids), batch_size):
+        await refresh_similar_products_by_ids(store, collection, product_ids[start:start + batch_size])
+    logger.info("reindex_qdrant: пересчитаны списки похожих товаров: %d", len(product_ids))
+
+
+async def reindex_products_to_qdrant(products: list[dict], store: QdrantStore) -> int:
+    """
+    По всему переданному списку products заново считает глобальную BM25-статистику (df, средняя длина документа),
+    перезаписывает файл статистики и загружает товары в Qdrant чанками BOOTSTRAP_CHUNK_SIZE.
+    """
+    if not products:
+        return 0
+
+    await start_reindex(store)
+    chunk_size = settings.BOOTSTRAP_CHUNK_SIZE
+    product_ids = []
+    for start in range(0, len(products), chunk_size):
+        product_ids.extend(await index_products_chunk(products[start:start + chunk_size], store))
+    logger.info("reindex_qdrant: в Qdrant загружено точек: %d", len(product_ids))
 
+    await finish_reindex(store, product_ids)
+    return len(product_ids)
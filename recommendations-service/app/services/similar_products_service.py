@@ -0,0 +1,133 @@
+import asyncio
+
+from qdrant_client.http import models as qdrant_models
+from qdrant_client.http.models import SparseVector
+
+from config import settings
+
+from app.database.qdrant_client import (
+    DENSE_VECTOR_NAME,
+    LEXICAL_VECTOR_NAME,
+    SIMILAR_PRODUCTS_FIELD,
+    QdrantStore,
+    payload_with_scores,
+)
+
+
+async def compute_similar_products(
+    store: QdrantStore,
+    collection_name: str,
+    product_id: int,
+    dense_vector: list[float],
+    lexical_vector: SparseVector | None,
+) -> list[dict]:
+    """
+    Топ-K соседей товара по его сохранённым dense и lexical векторам.
+
+    Слияние веток то же, что у /recommend (взвешенный RRF), но без отсечения
+    по рангу и порога: список всегда добирается до SIMILAR_PRODUCTS_TOP_K
+    соседей, если в коллекции хватает товаров.
+    """
+    neighbours = await store.search_neighbours(
+        collection_name,
+        dense_vector,
+        lexical_vector,
+        limit=settings.SIMILAR_PRODUCTS_TOP_K,
+        query_filter=qdrant_models.Filter(
+            must_not=[qdrant_models.HasIdCondition(has_id=[product_id])]
+        ),
+    )
+    return [
+        {"product_id": neighbour_id, "scores": {"rrf": round(score, 6)}}
+        for neighbour_id, score in neighbours
+    ]
+
+
+async def refresh_similar_products(
+    store: QdrantStore,
+    collection_name: str,
+    product_id: int,
+    dense_vector: list[float],
+    lexical_vector: SparseVector | None,
+) -> list[dict]:
+    """Пересчитывает список соседей товара и сохраняет его в payload точки"""
+    similar = await compute_similar_products(
+        store, collection_name, product_id, dense_vector, lexical_vector
+    )
+    await store.set_payload(collection_name, product_id, {SIMILAR_PRODUCTS_FIELD: similar})
+    return similar
+
+
+async def refresh_similar_products_bulk(
+    store: QdrantStore,
+    collection_name: str,
+    vectors_by_id: dict[int, tuple[list[float], SparseVector | None]],
+) -> dict[int, list[dict]]:
+    """Пересчитывает списки соседей нескольких товаров с ограничением параллелизма"""
+    semaphore = asyncio.Semaphore(settings.SIMILAR_PRODUCTS_REFRESH_CONCURRENCY)
+
+    async def refresh_one(product_id: int, dense: list[float], lexical: SparseVector | None) -> list[dict]:
+        async with semaphore:
+            return await refresh_similar_products(store, collection_name, product_id, dense, lexical)
+
+    product_ids = list(vectors_by_id)
+    results = await asyncio.gather(
+        *(refresh_one(pid, *vectors_by_id[pid]) for pid in product_ids)
+    )
+    return dict(zip(product_ids, results))
+
+
+async def refresh_similar_products_by_ids(
+    store: QdrantStore,
+    collection_name: str,
+    product_ids: list[int],
+) -> dict[int, list[dict]]:
+    """Пересчитывает списки соседей товаров по векторам, уже лежащим в Qdrant"""
+    points = await store.retrieve_points(
+        collection_name,
+        product_ids,
+        with_payload=False,
+        with_vectors=True,
+    )
+    vectors_by_id = {}
+    for point in points:
+        vectors = point.vector if isinstance(point.vector, dict) else {}
+        if vectors.get(DENSE_VECTOR_NAME):
+            vectors_by_id[point.id] = (vectors[DENSE_VECTOR_NAME], vectors.get(LEXICAL_VECTOR_NAME))
+    return await refresh_similar_products_bulk(store, collection_name, vectors_by_id)
+
+
+async def get_similar_products(
+    store: QdrantStore,
+    collection_name: str,
+    product_id: int,
+    limit: int,
+) -> list[dict]:
+    """
+    Похожие товары из предрасчитанного списка соседей.
+
+    Список читается из payload точки товара; если его ещё нет (товар
+    проиндексирован до появления списков), он считается и сохраняется.
+    """
+    points = await store.retrieve_points(
+        collection_name, [product_id], with_payload=[SIMILAR_PRODUCTS_FIELD]
+    )
+    if not points:
+        return []
+    similar = (points[0].payload or {}).get(SIMILAR_PRODUCTS_FIELD)
+    if similar is None:
+        refreshed = await refresh_similar_products_by_ids(store, collection_name, [product_id])
+        similar = refreshed.get(product_id, [])
+
+    # С запасом: удалённые товары могли остаться в списке до его пересчёта
+    candidates = similar[:limit * 2]
+    neighbours = await store.retrieve_points(
+        collection_name, [s["product_id"] for s in candidates]
+    )
+    payload_by_id = {p.id: p.payload or {} for p in neighbours}
+    items = [
+        payload_with_scores(payload_by_id[s["product_id"]], s["scores"])
+        for s in candidates
+        if s["product_id"] in payload_by_id
+    ]
+    return items[:limit]
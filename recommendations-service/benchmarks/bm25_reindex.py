@@ -0,0 +1,154 @@
+"""
+Микробенчмарк lexical-части reindex на синтетическом каталоге.
+
+Сравнивает прежний конвейер (стемминг слово за словом, sha256 на каждый
+токен, idf-словарь строк) с текущим: tokenize_and_stem_batch, кэш стемов
+и таблица term_id в Bm25CorpusStats. Dense-эмбеддинги и Qdrant не участвуют.
+
+Запуск из каталога recommendations-service:
+    python -m benchmarks.bm25_reindex --products 100000
+"""
+import argparse
+import hashlib
+import itertools
+import math
+import random
+import re
+import time
+from collections import Counter
+
+from app.services.bm25_stats import Bm25CorpusStats
+from app.services.lexical_bm25 import (
+    BM25_B,
+    BM25_K1,
+    LEXICAL_DIM,
+    get_stemmer,
+    stem_word,
+    term_id,
+    tokenize_and_stem_batch,
+)
+from app.services.product_index_service import product_to_searchable_text
+
+SYLLABLES = [
+    "ка", "ро", "ми", "на", "те", "ло", "ви", "ст", "пра", "кор",
+    "бел", "зо", "ник", "ус", "ан", "ме", "то", "ри", "да", "вой",
+]
+ENDINGS = ["", "а", "ы", "ой", "ого", "ами", "ение", "ный", "ная", "ные"]
+
+
+def make_vocabulary(size: int, rng: random.Random) -> list[str]:
+    words = set()
+    while len(words) < size:
+        stem = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        words.add(stem + rng.choice(ENDINGS))
+    return sorted(words)
+
+
+def make_catalog(n_products: int, vocabulary_size: int, seed: int) -> list[dict]:
+    """Каталог со словарём, распределённым по Ципфу, как у реальных описаний товаров"""
+    rng = random.Random(seed)
+    vocabulary = make_vocabulary(vocabulary_size, rng)
+    cum_weights = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(len(vocabulary))))
+
+    def words(k: int) -> str:
+        return " ".join(rng.choices(vocabulary, cum_weights=cum_weights, k=k))
+
+    return [
+        {
+            "product_id": product_id,
+            "name": words(rng.randint(2, 6)),
+            "description": words(rng.randint(20, 60)),
+            "features": {words(1): f"{rng.randint(1, 500)} {words(1)}" for _ in range(rng.randint(2, 6))},
+        }
+        for product_id in range(1, n_products + 1)
+    ]
+
+
+def legacy_term_id(term: str) -> int:
+    h = hashlib.sha256(term.encode("utf-8")).digest()
+    return int.from_bytes(h[:4], "big") % LEXICAL_DIM
+
+
+def legacy_vectors(texts: list[str]) -> list[tuple[list[int], list[float]]]:
+    """Прежний конвейер reindex: токены и стемы по одному, idf-словарь, sha256 на каждый термин документа"""
+    stemmer = get_stemmer()
+    docs = []
+    for text in texts:
+        tokens = re.findall(r"[^\W_]+", text.lower().strip())
+        docs.append([stemmer.stemWord(t) for t in tokens if t])
+
+    n_docs = len(docs)
+    doc_freq = Counter()
+    total_len = 0
+    for tokens in docs:
+        total_len += len(tokens)
+        for t in set(tokens):
+            doc_freq[t] += 1
+    avgdl = total_len / n_docs
+    idf_map = {term: math.log((n_docs - df + 0.5) / (df + 0.5) + 1.0) for term, df in doc_freq.items()}
+
+    vectors = []
+    for tokens in docs:
+        norm = 1.0 - BM25_B + BM25_B * (len(tokens) / avgdl)
+        seen = set()
+        indices = []
+        values = []
+        for term, cnt in Counter(tokens).items():
+            idx = legacy_term_id(term)
+            if idx in seen:
+                continue
+            seen.add(idx)
+            indices.append(idx)
+            values.append(idf_map.get(term, 0.0) * ((cnt * (BM25_K1 + 1)) / (cnt + BM25_K1 * norm)))
+        paired = sorted(zip(indices, values))
+        vectors.append(([p[0] for p in paired], [p[1] for p in paired]))
+    return vectors
+
+
+def current_vectors(products: list[dict], texts: list[str]) -> list[tuple[list[int], list[float]]]:
+    """Текущий конвейер reindex_products_to_qdrant"""
+    docs = tokenize_and_stem_batch(texts)
+    stats = Bm25CorpusStats.from_documents({p["product_id"]: tokens for p, tokens in zip(products, docs)})
+    return [stats.doc_vector(p["product_id"]) for p in products]
+
+
+def measure(label: str, func, *args) -> tuple[float, list]:
+    started = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28} {elapsed:8.2f} s")
+    return elapsed, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--vocabulary", type=int, default=30_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    products = make_catalog(args.products, args.vocabulary, args.seed)
+    texts = [product_to_searchable_text(p) for p in products]
+    print(f"Каталог: {len(products)} товаров, {sum(len(t) for t in texts) / len(texts):.0f} символов на товар")
+
+    legacy_time, legacy = measure("прежний конвейер", legacy_vectors, texts)
+    stem_word.cache_clear()
+    term_id.cache_clear()
+    cold_time, current = measure("текущий (холодный кэш)", current_vectors, products, texts)
+    warm_time, _ = measure("текущий (тёплый кэш)", current_vectors, products, texts)
+
+    mismatched = sum(
+        1
+        for (old_idx, old_val), (new_idx, new_val) in zip(legacy, current)
+        if old_idx != new_idx or any(not math.isclose(a, b, rel_tol=1e-12) for a, b in zip(old_val, new_val))
+    )
+    print(f"Ускорение: x{legacy_time / cold_time:.2f} (холодный), x{legacy_time / warm_time:.2f} (тёплый)")
+    print(f"Различающихся векторов: {mismatched}")
+    print(
+        f"Кэш стемов: {stem_word.cache_info().currsize}, "
+        f"кэш term_id: {term_id.cache_info().currsize}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -7,13 +9,39 @@ class Settings(BaseSettings):
     QDRANT_INTERNAL_PORT: int
     DB_COLLECTION_NAME: str
     EMBEDDING_MODEL_NAME: str
+    # Кэш эмбеддингов поисковых фраз; EMBEDDING_CACHE_PATH включает дисковый уровень (SQLite)
+    EMBEDDING_CACHE_SIZE: int = 10000
+    EMBEDDING_CACHE_TTL_SECONDS: float = 86400.0
+    EMBEDDING_CACHE_PATH: str | None = None
+    # Пул процессов эмбеддингов и динамический батчинг запросов
+    EMBEDDING_WORKERS: int = 1
+    EMBEDDING_MAX_BATCH_SIZE: int = 32
+    EMBEDDING_MAX_WAIT_MS: float = 5.0
+    EMBEDDING_QUEUE_SIZE: int = 1000
+    # Предрасчитанные списки похожих товаров (GET /recommend/similar/{product_id})
+    SIMILAR_PRODUCTS_TOP_K: int = 12
+    SIMILAR_PRODUCTS_REFRESH_CONCURRENCY: int = 8
     RRF_WEIGHT_DENSE: float = 0.35
     RRF_WEIGHT_LEXICAL: float = 0.65
+    # server - слияние dense + lexical в одном запросе к Qdrant, client - RRF в сервисе
+    SEARCH_FUSION_MODE: Literal["server", "client"] = "server"
+    # Доля запросов, для которых полное ранжирование пишется в лог на INFO
+    SEARCH_RANKING_LOG_SAMPLE_RATE: float = 0.0
+    # Файл статистики корпуса BM25 (бинарный, сжатый); df/avgdl обновляются инкрементально
     BM25_IDF_PATH: str
+    # Периодическое перевзвешивание lexical-векторов, чьи idf ушли от базовых больше чем на порог (доля)
+    BM25_REWEIGHT_INTERVAL_SECONDS: float = 600.0
+    BM25_REWEIGHT_DRIFT_THRESHOLD: float = 0.1
+    BM25_REWEIGHT_BATCH_SIZE: int = 256
     KAFKA_HOST: str
     KAFKA_PORT: int
 
     PRODUCT_SERVICE_URL: str
+    # Загрузка каталога при старте: окно параллельных запросов страниц, размер чанка индексации
+    # и число чанков, индексируемых одновременно (по умолчанию EMBEDDING_WORKERS + 1)
+    BOOTSTRAP_FETCH_CONCURRENCY: int = 4
+    BOOTSTRAP_CHUNK_SIZE: int = 256
+    BOOTSTRAP_INDEX_CONCURRENCY: int | None = None
 
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
@@ -5,6 +5,7 @@ from fastapi import FastAPI
 from prometheus_fastapi_instrumentator import Instrumentator
 
 from shared import setup_logging
+from shared.http_client import close_http_clients
 
 from app.config import settings
 from app.api.reviews import router as router_reviews
@@ -14,6 +15,8 @@ from app.api.reviews import router as router_reviews
 async def lifespan(app: FastAPI):
     yield
 
+    await close_http_clients()
+
 
 sentry_sdk.init(
     dsn=settings.SENTRY_URL,
@@ -4,6 +4,7 @@ from fastapi import HTTPException, status
 from app.config import settings
 from shared import get_logger
 from shared.constants import HttpTimeout
+from shared.http_client import get_http_client
 
 logger = get_logger(__name__)
 
@@ -23,8 +24,8 @@ async def ensure_product_exists(product_id: int) -> int:
     """
     url = f"{settings.PRODUCT_SERVICE_URL.rstrip('/')}/products/{product_id}"
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, timeout=HttpTimeout.DEFAULT.value)
+        client = get_http_client(settings.PRODUCT_SERVICE_URL)
+        response = await client.get(url, timeout=HttpTimeout.DEFAULT.value)
     except httpx.RequestError as e:
         logger.error(f"Product service unreachable when checking product {product_id}: {e}", exc_info=True)
         raise HTTPException(
@@ -0,0 +1,140 @@
+import importlib.util
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from typing import Iterator
+
+import httpx
+from prometheus_client.core import REGISTRY, GaugeMetricFamily
+from prometheus_client.registry import Collector
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from shared.constants import HttpTimeout
+from shared.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class HttpClientSettings(BaseSettings):
+    """Настройки пулов соединений межсервисных HTTP-клиентов."""
+    HTTP_CLIENT_MAX_CONNECTIONS: int = 100
+    HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_CLIENT_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP_CLIENT_HTTP2: bool = False
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+
+class RejectCookiesPolicy(DefaultCookiePolicy):
+    """
+    Политика, запрещающая сохранять cookies из ответов.
+
+    Общий клиент обслуживает запросы разных пользователей, поэтому cookies
+    одного ответа (например, access_token после логина) не должны попасть
+    в следующие запросы. Cookies запроса передаются явно через cookies=.
+    """
+
+    def set_ok(self, cookie, request) -> bool:
+        return False
+
+
+class HttpClientRegistry:
+    """
+    Реестр долгоживущих httpx.AsyncClient, по одному на upstream.
+
+    Каждый клиент держит собственный пул keep-alive соединений, поэтому
+    повторные запросы к сервису не платят за установку TCP-соединения.
+    Клиенты создаются лениво и закрываются в lifespan приложения.
+    """
+
+    def __init__(self, settings: HttpClientSettings):
+        self._limits = httpx.Limits(
+            max_connections=settings.HTTP_CLIENT_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_CLIENT_KEEPALIVE_EXPIRY,
+        )
+        self._http2 = settings.HTTP_CLIENT_HTTP2
+        if self._http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("HTTP_CLIENT_HTTP2 is enabled but package 'h2' is not installed, falling back to HTTP/1.1")
+            self._http2 = False
+        self._clients: dict[str, httpx.AsyncClient] = {}
+
+    def get(self, base_url: str) -> httpx.AsyncClient:
+        """
+        Возвращает клиент с пулом соединений для указанного upstream.
+
+        Args:
+            base_url: Базовый URL сервиса, он же ключ пула
+
+        Returns:
+            Общий httpx.AsyncClient для этого upstream
+        """
+        client = self._clients.get(base_url)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                limits=self._limits,
+                timeout=HttpTimeout.DEFAULT.value,
+                http2=self._http2,
+                cookies=CookieJar(policy=RejectCookiesPolicy()),
+            )
+            self._clients[base_url] = client
+            logger.debug(f"Created pooled HTTP client for {base_url}")
+        return client
+
+    async def close(self) -> None:
+        """Закрывает все клиенты и их соединения."""
+        clients, self._clients = self._clients, {}
+        for base_url, client in clients.items():
+            await client.aclose()
+            logger.debug(f"Closed pooled HTTP client for {base_url}")
+
+    def pool_stats(self) -> Iterator[tuple[str, int, int]]:
+        """Отдаёт (upstream, активные соединения, простаивающие соединения) по каждому пулу."""
+        for base_url, client in self._clients.items():
+            pool = getattr(client._transport, "_pool", None)
+            connections = getattr(pool, "connections", [])
+            idle = sum(1 for connection in connections if connection.is_idle())
+            yield base_url, len(connections) - idle, idle
+
+
+class HttpClientPoolCollector(Collector):
+    """Экспортирует состояние пулов соединений реестра в Prometheus."""
+
+    def __init__(self, registry: HttpClientRegistry):
+        self._registry = registry
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        connections = GaugeMetricFamily(
+            "http_client_pool_connections",
+            "Соединения в пулах межсервисных HTTP-клиентов",
+            labels=["upstream", "state"],
+        )
+        for base_url, active, idle in self._registry.pool_stats():
+            connections.add_metric([base_url, "active"], active)
+            connections.add_metric([base_url, "idle"], idle)
+        yield connections
+
+
+_http_clients: HttpClientRegistry | None = None
+
+
+def _get_registry() -> HttpClientRegistry:
+    """
+    Создаёт реестр при первом обращении и регистрирует его коллектор метрик.
+
+    Импорт модуля не читает настройки и не трогает REGISTRY Prometheus.
+    """
+    global _http_clients
+    if _http_clients is None:
+        _http_clients = HttpClientRegistry(HttpClientSettings())
+        REGISTRY.register(HttpClientPoolCollector(_http_clients))
+    return _http_clients
+
+
+def get_http_client(base_url: str) -> httpx.AsyncClient:
+    """Возвращает общий клиент с пулом соединений для upstream base_url."""
+    return _get_registry().get(base_url)
+
+
+async def close_http_clients() -> None:
+    """Закрывает все общие HTTP-клиенты. Вызывается при остановке приложения."""
+    if _http_clients is not None:
+        await _http_clients.close()
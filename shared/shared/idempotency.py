@@ -0,0 +1,183 @@
+import asyncio
+from datetime import timedelta
+
+from prometheus_client import Counter, Gauge
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from sqlalchemy import Interval, cast, delete, func, select, text
+from sqlalchemy.dialects.postgresql import Insert, insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from shared.logging import get_logger
+
+logger = get_logger(__name__)
+
+IDEMPOTENCY_KEY_CLAIMS = Counter(
+    "idempotency_key_claims_total",
+    "Попытки занять ключ идемпотентности (claimed - первая обработка, duplicate - повтор)",
+    labelnames=["key_type", "result"],
+)
+IDEMPOTENCY_KEYS_PRUNED = Counter(
+    "idempotency_keys_pruned_total",
+    "Ключи идемпотентности, удалённые по истечении срока хранения",
+)
+IDEMPOTENCY_KEYS_ROWS = Gauge(
+    "idempotency_keys_table_rows",
+    "Оценка числа строк таблицы ключей идемпотентности (pg_class.reltuples)",
+)
+IDEMPOTENCY_KEYS_BYTES = Gauge(
+    "idempotency_keys_table_bytes",
+    "Размер таблицы ключей идемпотентности вместе с индексами",
+)
+
+
+class IdempotencySettings(BaseSettings):
+    """Настройки хранения ключей идемпотентности саги."""
+    IDEMPOTENCY_KEY_RETENTION_DAYS: int = 30
+    IDEMPOTENCY_KEY_PRUNE_INTERVAL_SECONDS: float = 3600.0
+    IDEMPOTENCY_KEY_PRUNE_BATCH_SIZE: int = 5000
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+
+def claim_statement(model: type, key_type: str, business_key: str) -> Insert:
+    """
+    `INSERT ... ON CONFLICT DO NOTHING RETURNING id` для ключа идемпотентности.
+
+    Вернёт строку, только если ключ занят этим запросом. Параллельная транзакция
+    с тем же ключом ждёт на уникальном индексе и после её фиксации получает конфликт.
+    Годится и как CTE внутри более крупного запроса.
+
+    Args:
+        model: ORM-модель таблицы ключей сервиса (id, key_type, business_key, created_at)
+        key_type: Тип ключа (SagaIdempotencyKey)
+        business_key: Бизнес-ключ (например, ID заказа)
+    """
+    return (
+        insert(model)
+        .values(key_type=key_type, business_key=business_key)
+        .on_conflict_do_nothing(index_elements=[model.key_type, model.business_key])
+        .returning(model.id)
+    )
+
+
+def record_claim(key_type: str, claimed: bool) -> None:
+    """Учитывает результат claim в метриках."""
+    IDEMPOTENCY_KEY_CLAIMS.labels(key_type=key_type, result="claimed" if claimed else "duplicate").inc()
+
+
+class IdempotencyKeyStore:
+    """
+    Ключи идемпотентности саги в таблице сервиса.
+
+    Ключ занимается одним запросом (claim) в транзакции обработчика:
+    если обработка не удалась и транзакция откатилась, ключ не сохраняется.
+    """
+
+    def __init__(self, db: AsyncSession, model: type):
+        """
+        Args:
+            db: Сессия транзакции обработчика
+            model: ORM-модель таблицы ключей сервиса
+        """
+        self.db = db
+        self.model = model
+
+    async def claim(self, key_type: str, business_key: str) -> bool:
+        """
+        Занимает ключ.
+
+        Returns:
+            True, если ключ занят этим вызовом; False, если операция уже выполнялась
+        """
+        result = await self.db.execute(claim_statement(self.model, key_type, business_key))
+        claimed = result.scalar_one_or_none() is not None
+        record_claim(key_type, claimed)
+        return claimed
+
+    async def release(self, key_type: str, business_key: str) -> None:
+        """Освобождает ключ, занятый в этой транзакции, если операцию выполнить не удалось."""
+        await self.db.execute(
+            delete(self.model).where(
+                self.model.key_type == key_type,
+                self.model.business_key == business_key,
+            )
+        )
+
+
+async def prune_idempotency_keys(
+        session_maker: async_sessionmaker[AsyncSession],
+        model: type,
+        retention: timedelta,
+        batch_size: int,
+) -> int:
+    """
+    Удаляет ключи старше retention пачками по batch_size, каждая пачка - отдельная транзакция.
+
+    Повторы событий саги приходят в пределах минут, поэтому ключ за окном
+    хранения уже ничего не защищает. Короткие транзакции не держат блокировки
+    и не мешают claim в обработчиках.
+
+    Returns:
+        Количество удалённых ключей
+    """
+    total = 0
+    while True:
+        expired = (
+            select(model.id)
+            # Явный CAST: иначе asyncpg выводит тип параметра `now() - $1` как timestamptz
+            .where(model.created_at < func.now() - cast(retention, Interval))
+            .order_by(model.id)
+            .limit(batch_size)
+        )
+        async with session_maker() as session:
+            result = await session.execute(delete(model).where(model.id.in_(expired)))
+            await session.commit()
+        deleted = result.rowcount or 0
+        total += deleted
+        IDEMPOTENCY_KEYS_PRUNED.inc(deleted)
+        if deleted < batch_size:
+            return total
+
+
+async def collect_idempotency_table_stats(
+        session_maker: async_sessionmaker[AsyncSession],
+        model: type,
+) -> None:
+    """Обновляет метрики размера таблицы по статистике Postgres, без COUNT(*) по таблице."""
+    async with session_maker() as session:
+        result = await session.execute(
+            text(
+                "SELECT reltuples::bigint AS rows, pg_total_relation_size(oid) AS bytes "
+                "FROM pg_class WHERE oid = to_regclass(:table_name)"
+            ),
+            {"table_name": model.__tablename__},
+        )
+        row = result.one_or_none()
+    if row is not None:
+        # reltuples = -1, пока таблицу ни разу не анализировали
+        IDEMPOTENCY_KEYS_ROWS.set(max(row.rows, 0))
+        IDEMPOTENCY_KEYS_BYTES.set(row.bytes)
+
+
+async def run_idempotency_key_maintenance(
+        session_maker: async_sessionmaker[AsyncSession],
+        model: type,
+        settings: IdempotencySettings | None = None,
+) -> None:
+    """
+    Фоновая задача lifespan: раз в IDEMPOTENCY_KEY_PRUNE_INTERVAL_SECONDS удаляет
+    просроченные ключи и обновляет метрики таблицы. Ошибки логируются, задача продолжает работу.
+    """
+    settings = settings or IdempotencySettings()
+    retention = timedelta(days=settings.IDEMPOTENCY_KEY_RETENTION_DAYS)
+    while True:
+        try:
+            pruned = await prune_idempotency_keys(
+                session_maker, model, retention, settings.IDEMPOTENCY_KEY_PRUNE_BATCH_SIZE
+            )
+            if pruned:
+                logger.info(f"Pruned {pruned} idempotency keys older than {retention.days} days")
+            await collect_idempotency_table_stats(session_maker, model)
+        except Exception as e:
+            logger.error(f"Idempotency key maintenance failed: {e}", exc_info=True)
+        await asyncio.sleep(settings.IDEMPOTENCY_KEY_PRUNE_INTERVAL_SECONDS)
@@ -1,9 +1,10 @@
 from dependency_injector import containers, providers
+from shared.idempotency import IdempotencyKeyStore
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.unit_of_work_factory import UnitOfWorkFactory
+from app.models.idempotency import IdempotencyKey
 from app.repositories.users_repository import UsersRepository
-from app.repositories.idempotency_key_repository import IdempotencyKeyRepository
 from app.services.auth_service import AuthService
 from app.services.user_service import UserService
 from app.services.balance_reservation_service import BalanceReservationService
@@ -19,9 +20,10 @@ class Container(containers.DeclarativeContainer):
         db=db
     )
 
-    idempotency_key_repository = providers.Factory(
-        IdempotencyKeyRepository,
-        db=db
+    idempotency_keys = providers.Factory(
+        IdempotencyKeyStore,
+        db=db,
+        model=IdempotencyKey
     )
 
     uow_factory = providers.Factory(
@@ -44,6 +46,6 @@ class Container(containers.DeclarativeContainer):
 
     balance_reservation_service = providers.Factory(
         BalanceReservationService,
-        idempotency_key_repository=idempotency_key_repository,
+        idempotency_keys=idempotency_keys,
         users_repository=users_repository,
     )
\ No newline at end of file
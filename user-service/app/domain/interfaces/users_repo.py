@@ -2,6 +2,8 @@ from typing import Protocol
 
 from pydantic import EmailStr
 
+from shared import ReserveBalanceResult
+
 from app.domain.entities.users import UserItem
 
 
@@ -27,6 +29,15 @@ class IUsersRepository(Protocol):
     async def decrease_balance(self, user_id: int, cost: int) -> int | None:
         ...
 
+    async def reserve_balance(
+            self,
+            user_id: int,
+            cost: int,
+            key_type: str,
+            business_key: str,
+    ) -> ReserveBalanceResult:
+        ...
+
     async def increase_balance(self, user_id: int, amount: int) -> None:
         ...
 
@@ -1,11 +1,14 @@
 from typing import Optional
 
 from pydantic import EmailStr
-from sqlalchemy import select, update
+from shared import ReserveBalanceResult
+from shared.idempotency import claim_statement, record_claim
+from sqlalchemy import delete, exists, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.domain.entities.users import UserItem
 from app.domain.mappers.user import UserMapper
+from app.models.idempotency import IdempotencyKey
 from app.models.users import Users
 
 
@@ -159,6 +162,74 @@ class UsersRepository:
         )
         return result.scalar_one_or_none()
 
+    async def reserve_balance(
+            self,
+            user_id: int,
+            cost: int,
+            key_type: str,
+            business_key: str,
+    ) -> ReserveBalanceResult:
+        """
+        Списывает стоимость заказа один раз на ключ идемпотентности - одним запросом.
+
+        В одном statement:
+        - `INSERT INTO idempotency_keys ... ON CONFLICT DO NOTHING RETURNING id` занимает ключ;
+          параллельная доставка того же события ждёт на уникальном индексе и получает конфликт;
+        - `UPDATE users SET balance = balance - :cost WHERE id = :uid AND balance >= :cost
+          RETURNING balance` выполняется, только если ключ занят этим запросом;
+          конкурирующие списания с одного баланса перепроверяют условие на свежей версии строки.
+
+        Если списать не удалось, ключ удаляется (второй запрос только на этом пути),
+        чтобы повторная доставка события не приняла неудачу за выполненную резервацию.
+
+        Args:
+            user_id: Идентификатор пользователя.
+            cost: Сумма списания (стоимость заказа), должна быть > 0
+            key_type: Тип ключа идемпотентности
+            business_key: Бизнес-ключ (ID заказа)
+
+        Returns:
+            Результат резервации
+        """
+        if cost <= 0:
+            raise ValueError("Сумма списания должна быть больше нуля")
+
+        claimed = claim_statement(IdempotencyKey, key_type, business_key).cte("claimed")
+        debited = (
+            update(Users)
+            .where(
+                Users.id == user_id,
+                Users.balance >= cost,
+                exists(select(claimed.c.id)),
+            )
+            .values(balance=Users.balance - cost)
+            .returning(Users.balance)
+            .cte("debited")
+        )
+        result = await self.db.execute(
+            select(
+                exists(select(claimed.c.id)).label("claimed"),
+                exists(select(debited.c.balance)).label("debited"),
+                exists(select(Users.id).where(Users.id == user_id)).label("user_exists"),
+            )
+        )
+        row = result.one()
+        record_claim(key_type, row.claimed)
+        if not row.claimed:
+            return ReserveBalanceResult.ALREADY_DONE
+        if row.debited:
+            return ReserveBalanceResult.SUCCESS
+
+        await self.db.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.key_type == key_type,
+                IdempotencyKey.business_key == business_key,
+            )
+        )
+        if not row.user_exists:
+            return ReserveBalanceResult.USER_NOT_FOUND
+        return ReserveBalanceResult.INSUFFICIENT_BALANCE
+
     async def increase_balance(self, user_id: int, amount: int) -> None:
         """
         Возвращает указанную сумму на баланс пользователя (компенсация).
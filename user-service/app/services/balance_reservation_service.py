@@ -1,6 +1,6 @@
 from shared import ReserveBalanceResult, SagaIdempotencyKey, get_logger
+from shared.idempotency import IdempotencyKeyStore
 
-from app.repositories.idempotency_key_repository import IdempotencyKeyRepository
 from app.repositories.users_repository import UsersRepository
 
 logger = get_logger(__name__)
@@ -11,32 +11,27 @@ class BalanceReservationService:
 
     def __init__(
         self,
-        idempotency_key_repository: IdempotencyKeyRepository,
+        idempotency_keys: IdempotencyKeyStore,
         users_repository: UsersRepository,
     ):
-        self.idempotency_key_repository = idempotency_key_repository
+        self.idempotency_keys = idempotency_keys
         self.users_repository = users_repository
 
     async def reserve_balance(self, order_id: int, user_id: int, total_cost: int) -> ReserveBalanceResult:
         """
         Резервирует баланс для заказа.
-        """
-        if await self.idempotency_key_repository.exists(
-            SagaIdempotencyKey.ORDER_PROCESSING, str(order_id)
-        ):
-            return ReserveBalanceResult.ALREADY_DONE
-
-        balance = await self.users_repository.get_balance_with_lock(user_id)
-        if balance is None:
-            return ReserveBalanceResult.USER_NOT_FOUND
-        if balance < total_cost:
-            return ReserveBalanceResult.INSUFFICIENT_BALANCE
 
-        await self.users_repository.decrease_balance(user_id, total_cost)
-        await self.idempotency_key_repository.add(
-            SagaIdempotencyKey.ORDER_PROCESSING, str(order_id)
+        Ключ идемпотентности и условное списание выполняются одним запросом
+        (см. UsersRepository.reserve_balance).
+        """
+        result = await self.users_repository.reserve_balance(
+            user_id,
+            total_cost,
+            SagaIdempotencyKey.ORDER_PROCESSING,
+            str(order_id),
         )
-        return ReserveBalanceResult.SUCCESS
+        logger.debug(f"Balance reservation for order {order_id}, user {user_id}: {result}")
+        return result
 
     async def record_balance_compensation(
         self, order_id: int, user_id: int, amount: int
@@ -47,12 +42,9 @@ class BalanceReservationService:
         Returns: True если операция выполнена, False если уже была выполнена.
 
         """
-        if await self.idempotency_key_repository.exists(
+        if not await self.idempotency_keys.claim(
             SagaIdempotencyKey.COMPENSATION_BALANCE, str(order_id)
         ):
             return False
-        await self.idempotency_key_repository.add(
-            SagaIdempotencyKey.COMPENSATION_BALANCE, str(order_id)
-        )
         await self.users_repository.increase_balance(user_id, amount)
         return True
@@ -0,0 +1,119 @@
+import asyncio
+from collections import Counter
+
+import pytest
+from shared import ReserveBalanceResult, SagaIdempotencyKey
+from shared.idempotency import IdempotencyKeyStore
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.security import get_password_hash
+from app.domain.entities.users import UserItem
+from app.models.idempotency import IdempotencyKey
+from app.repositories.users_repository import UsersRepository
+from app.services.balance_reservation_service import BalanceReservationService
+
+
+class TestBalanceReservationServiceReserveBalance:
+    """Юнит-тесты для метода reserve_balance BalanceReservationService"""
+
+    @pytest.fixture
+    def mock_users_repository(self, mocker):
+        return mocker.AsyncMock()
+
+    @pytest.fixture
+    def service(self, mock_users_repository, mocker):
+        return BalanceReservationService(
+            idempotency_keys=mocker.AsyncMock(),
+            users_repository=mock_users_repository
+        )
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("result", list(ReserveBalanceResult))
+    async def test_reserve_balance_single_repository_call(
+        self,
+        service: BalanceReservationService,
+        mock_users_repository,
+        mocker,
+        result
+    ):
+        """Тест: резервация - один вызов репозитория с ключом идемпотентности заказа"""
+        mock_users_repository.reserve_balance = mocker.AsyncMock(return_value=result)
+
+        assert await service.reserve_balance(order_id=7, user_id=1, total_cost=500) == result
+        mock_users_repository.reserve_balance.assert_awaited_once_with(
+            1, 500, SagaIdempotencyKey.ORDER_PROCESSING, "7"
+        )
+
+
+class TestBalanceReservationConcurrency:
+    """Нагрузочный тест резервации баланса на тестовой БД"""
+
+    @pytest.fixture
+    async def user_id(self, test_db_session: AsyncSession):
+        await test_db_session.execute(text("TRUNCATE TABLE idempotency_keys RESTART IDENTITY"))
+        user = await UsersRepository(test_db_session).create_user(UserItem(
+            email="test@example.com",
+            hashed_password=get_password_hash("password123"),
+            balance=1000
+        ))
+        await test_db_session.commit()
+        yield user.id
+        await test_db_session.execute(text("TRUNCATE TABLE idempotency_keys RESTART IDENTITY"))
+        await test_db_session.commit()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_reservations_never_overdraw_or_double_debit(
+        self,
+        test_engine,
+        test_db_session: AsyncSession,
+        user_id: int
+    ):
+        """Тест: 30 заказов по 50, каждый доставлен дважды, баланс 1000 - ровно 20 списаний"""
+        session_maker = async_sessionmaker(bind=test_engine, class_=AsyncSession, expire_on_commit=False)
+        order_ids = [order_id for order_id in range(1, 31) for _ in range(2)]
+
+        async def reserve(order_id: int) -> tuple[int, ReserveBalanceResult]:
+            async with session_maker() as session:
+                service = BalanceReservationService(
+                    idempotency_keys=IdempotencyKeyStore(session, IdempotencyKey),
+                    users_repository=UsersRepository(session)
+                )
+                result = await service.reserve_balance(order_id, user_id, 50)
+                await session.commit()
+                return order_id, result
+
+        results = await asyncio.gather(*(reserve(order_id) for order_id in order_ids))
+
+        successes = Counter(order_id for order_id, result in results if result == ReserveBalanceResult.SUCCESS)
+        assert len(successes) == 20
+        assert all(count == 1 for count in successes.values())
+
+        user = await UsersRepository(test_db_session).get_user_by_id(user_id)
+        assert user.balance == 0
+        keys = await test_db_session.execute(
+            select(func.count(IdempotencyKey.id))
+            .where(IdempotencyKey.key_type == SagaIdempotencyKey.ORDER_PROCESSING)
+        )
+        assert keys.scalar_one() == len(successes)
+
+
+class TestBalanceReservationServiceRecordBalanceCompensation:
+    """Юнит-тесты для метода record_balance_compensation BalanceReservationService"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("claimed", [True, False])
+    async def test_record_balance_compensation_once(self, mocker, claimed):
+        """Тест: баланс возвращается, только если ключ компенсации занят этим вызовом"""
+        idempotency_keys = mocker.AsyncMock()
+        idempotency_keys.claim = mocker.AsyncMock(return_value=claimed)
+        users_repository = mocker.AsyncMock()
+        service = BalanceReservationService(
+            idempotency_keys=idempotency_keys,
+            users_repository=users_repository
+        )
+
+        assert await service.record_balance_compensation(order_id=7, user_id=1, amount=500) == claimed
+
+        idempotency_keys.claim.assert_awaited_once_with(SagaIdempotencyKey.COMPENSATION_BALANCE, "7")
+        assert users_repository.increase_balance.await_count == int(claimed)